@@ -0,0 +1,8 @@
+# server/api/app.py
+from fastapi import FastAPI
+
+from .prediction_endpoints import lifespan, router
+
+# 예측 API 애플리케이션 (lifespan 에서 DB 풀과 서비스 싱글톤을 시작/종료)
+app = FastAPI(title="Prediction API", lifespan=lifespan)
+app.include_router(router)
@@ -1,16 +1,33 @@
 # server/api/prediction_endpoints.py
 from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
 from pydantic import BaseModel, Field
 import asyncio
+import functools
+import json
 import logging
+import os
+import time
+import uuid
+from contextlib import aclosing, asynccontextmanager
 
 from ..services.advanced_prediction_service import AdvancedPredictionService
 from ..services.market_sentiment_service import MarketSentimentService
 from ..services.real_time_data_service import RealTimeDataService
+from ..services.batch_prediction import BatchPredictionEngine
+from ..services.model_evaluation_executor import ModelEvaluationExecutor
+from ..services.prediction_cache import PredictionCache
+from ..services.service_registry import ServiceRegistry
+from ..services.single_flight import SingleFlight
+from ..services.websocket_broadcaster import Broadcaster, SnapshotDeltaEncoder
+from ..database.database_manager import (
+    db_manager, external_data_manager, prediction_data_manager, sentiment_data_manager
+)
 from ..models.prediction_models import (
-    PredictionRequest, PredictionResponse, 
+    ModelType, PredictionRequest, PredictionResponse, 
+    BatchPredictionRequest, BatchPredictionResponse,
     SentimentAnalysisRequest, SentimentAnalysisResponse,
     MarketEventResponse, ABTestRequest, ABTestResponse
 )
@@ -18,74 +35,255 @@ from ..models.prediction_models import (
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# 애플리케이션 수명 동안 공유되는 서비스 싱글톤
+service_registry = ServiceRegistry()
+
 # Dependency injection
 def get_prediction_service() -> AdvancedPredictionService:
-    return AdvancedPredictionService()
+    return service_registry.get('prediction', AdvancedPredictionService)
 
 def get_sentiment_service() -> MarketSentimentService:
-    return MarketSentimentService()
+    return service_registry.get('sentiment', MarketSentimentService)
 
 def get_realtime_service() -> RealTimeDataService:
-    return RealTimeDataService()
+    return service_registry.get('realtime', RealTimeDataService)
+
+@asynccontextmanager
+async def lifespan(app):
+    """애플리케이션 수명 주기 (api/app.py 에서 FastAPI(lifespan=lifespan) 로 등록)
+    
+    시작 시 DB 풀과 서비스 싱글톤을 만들어 첫 요청이 초기화 비용을 치르지 않게 한다.
+    ModelType 별 모델 사전 로드/워밍업과 무중단 교체는 아직 없다. AdvancedPredictionService 에
+    모델 단위 로드 인터페이스가 없어서, 모델은 서비스 내부에서 관리된다.
+    """
+    await db_manager.initialize()
+    await service_registry.startup({
+        'prediction': AdvancedPredictionService,
+        'sentiment': MarketSentimentService,
+        'realtime': RealTimeDataService
+    })
+    try:
+        yield
+    finally:
+        model_evaluation_executor.shutdown()
+        await service_registry.shutdown()
+        await db_manager.close()
+
+def timed_endpoint(label: str):
+    """엔드포인트 처리 시간을 정상 상태 지연 지표로 기록"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                service_registry.observe_request(label, (time.perf_counter() - start) * 1000)
+        return wrapper
+    return decorator
+
+# 다중 변수 예측 결과 캐시 (PREDICTION_CACHE_DB=true 이면 prediction_results 를 2차 캐시로 사용)
+prediction_cache = PredictionCache(
+    max_size=int(os.getenv('PREDICTION_CACHE_SIZE', '1024')),
+    ttl=float(os.getenv('PREDICTION_CACHE_TTL', '300')),
+    stale_ttl=float(os.getenv('PREDICTION_CACHE_STALE_TTL', '1800')),
+    store=prediction_data_manager if os.getenv('PREDICTION_CACHE_DB', 'false').lower() == 'true' else None
+)
+
+# 고비용 엔드포인트 동일 요청 병합
+request_coalescer = SingleFlight()
+
+# 모델 비교용 프로세스 풀 (요청 처리 이벤트 루프와 분리)
+model_evaluation_executor = ModelEvaluationExecutor(
+    timeout=float(os.getenv('MODEL_EVALUATION_TIMEOUT', '120')),
+    ranking_metric=os.getenv('MODEL_RANKING_METRIC', 'rmse')
+)
+
+# 다중 화주 일괄 예측 엔진
+batch_prediction_engine = BatchPredictionEngine(external_data_manager, prediction_data_manager)
+
+# 웹소켓 전송 제한 시간 (초과한 느린 클라이언트는 연결 종료)
+WEBSOCKET_SEND_TIMEOUT = 10.0
+
+async def _produce_prediction_update(shipper_id: str) -> str:
+    prediction_update = await get_prediction_service().get_real_time_prediction(shipper_id)
+    return json.dumps(prediction_update, separators=(",", ":"), default=str)
+
+# 화주별 실시간 예측 공유 발행자 (구독자 수와 무관하게 화주당 1회 계산)
+prediction_broadcaster = Broadcaster(_produce_prediction_update, interval=30)
+
+_sentiment_encoder = SnapshotDeltaEncoder()
+
+async def _produce_sentiment_frame(_key: str):
+    sentiment_update = await get_sentiment_service().get_real_time_sentiment()
+    return _sentiment_encoder.encode(sentiment_update)
+
+# 실시간 감정 분석 공유 발행자 (전체 스냅샷은 접속 시 1회, 이후 델타만 전송)
+sentiment_broadcaster = Broadcaster(_produce_sentiment_frame, interval=60)
 
 # ============= 예측 모델 API 엔드포인트 =============
 
 @router.post("/predictions/multi-variable", response_model=PredictionResponse)
+@timed_endpoint("predictions.multi_variable")
 async def create_multi_variable_prediction(
     request: PredictionRequest,
     prediction_service: AdvancedPredictionService = Depends(get_prediction_service)
 ):
-    """다중 변수 예측 생성"""
+    """다중 변수 예측 생성 (동일 요청은 캐시에서 응답)"""
     try:
-        result = await prediction_service.predict_multi_variable(
-            shipper_id=request.shipper_id,
-            variables=request.variables,
-            prediction_horizon=request.prediction_horizon,
-            confidence_level=request.confidence_level
+        result = await prediction_cache.get_or_compute(
+            request,
+            lambda: prediction_service.predict_multi_variable(
+                shipper_id=request.shipper_id,
+                variables=request.variables,
+                prediction_horizon=request.prediction_horizon,
+                confidence_level=request.confidence_level
+            )
         )
         return PredictionResponse(**result)
     except Exception as e:
         logger.error(f"Multi-variable prediction error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# 시나리오 분석 동시 실행 수
+SCENARIO_CONCURRENCY = 4
+
+async def _run_scenarios(
+    prediction_service: AdvancedPredictionService,
+    request: PredictionRequest,
+    scenarios: List[Dict[str, Any]]
+):
+    """시나리오를 제한된 동시성으로 실행하고 완료 순서대로 (index, result, error) 를 반환
+    
+    기준 변수 피처는 아직 공유되지 않는다. 피처 계산은 AdvancedPredictionService.scenario_analysis
+    내부에서 이루어지고, 준비된 기준 피처를 받는 인터페이스가 없다. 그래서 시나리오마다
+    request.variables 로부터 다시 계산된다.
+    """
+    semaphore = asyncio.Semaphore(SCENARIO_CONCURRENCY)
+    
+    async def run(index: int, scenario: Dict[str, Any]):
+        async with semaphore:
+            try:
+                result = await prediction_service.scenario_analysis(
+                    shipper_id=request.shipper_id,
+                    scenario_params=scenario,
+                    base_variables=request.variables
+                )
+                return index, PredictionResponse(**result), None
+            except Exception as e:
+                return index, None, e
+    
+    tasks = [asyncio.ensure_future(run(i, scenario)) for i, scenario in enumerate(scenarios)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
 @router.post("/predictions/scenario-analysis", response_model=List[PredictionResponse])
+@timed_endpoint("predictions.scenario_analysis")
 async def run_scenario_analysis(
     request: PredictionRequest,
     scenarios: List[Dict[str, Any]],
+    stream: bool = False,
     prediction_service: AdvancedPredictionService = Depends(get_prediction_service)
 ):
-    """시나리오 분석 실행"""
+    """시나리오 분석 실행
+    
+    시나리오들은 동시에 실행된다. stream=true 이면 완료되는 순서대로
+    {"scenario_index", "result" | "error"} 를 NDJSON 으로 보낸다.
+    """
+    if stream:
+        async def ndjson_lines():
+            async with aclosing(_run_scenarios(prediction_service, request, scenarios)) as outcomes:
+                async for index, result, error in outcomes:
+                    if error is not None:
+                        logger.error(f"Scenario analysis error (scenario {index}): {error}")
+                        line = {'scenario_index': index, 'error': str(error)}
+                    else:
+                        line = {'scenario_index': index, 'result': json.loads(result.json())}
+                    yield json.dumps(line) + "\n"
+        
+        return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+    
     try:
-        results = []
-        for scenario in scenarios:
-            result = await prediction_service.scenario_analysis(
-                shipper_id=request.shipper_id,
-                scenario_params=scenario,
-                base_variables=request.variables
-            )
-            results.append(PredictionResponse(**result))
+        results: List[Optional[PredictionResponse]] = [None] * len(scenarios)
+        # 첫 실패에서 빠져나갈 때 남은 시나리오 태스크가 바로 취소되도록 제너레이터를 닫는다
+        async with aclosing(_run_scenarios(prediction_service, request, scenarios)) as outcomes:
+            async for index, result, error in outcomes:
+                if error is not None:
+                    raise error
+                results[index] = result
         return results
     except Exception as e:
         logger.error(f"Scenario analysis error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/predictions/model-comparison/{shipper_id}")
+@timed_endpoint("predictions.model_comparison")
 async def compare_prediction_models(
     shipper_id: str,
-    models: List[str] = ["lstm", "arima", "prophet", "xgboost"],
-    prediction_service: AdvancedPredictionService = Depends(get_prediction_service)
+    models: List[str] = ["lstm", "arima", "prophet", "xgboost"]
 ):
-    """예측 모델 성능 비교"""
+    """예측 모델 성능 비교 (모델별 병렬 평가 후 순위·최적 모델은 한 번에 계산)"""
     try:
-        comparison = await prediction_service.compare_models(
-            shipper_id=shipper_id,
-            models=models
+        comparison = await request_coalescer.do(
+            ("model-comparison", shipper_id, tuple(models)),
+            lambda: model_evaluation_executor.compare(
+                shipper_id=shipper_id,
+                models=models
+            )
         )
         return comparison
     except Exception as e:
         logger.error(f"Model comparison error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/predictions/jobs")
+async def enqueue_prediction_job(request: PredictionRequest):
+    """예측 작업 큐 등록 (prediction_worker 프로세스가 처리)"""
+    try:
+        job_id = await prediction_data_manager.create_prediction_job({
+            'shipper_id': request.shipper_id,
+            'job_name': f"prediction:{request.shipper_id}",
+            'model_type': (request.model_type or ModelType.ENSEMBLE).value,
+            'prediction_horizon': request.prediction_horizon,
+            'confidence_level': request.confidence_level,
+            'variables': [
+                {**var.dict(), 'type': var.type.value} for var in request.variables
+            ]
+        })
+        return {'job_id': job_id, 'status': 'pending'}
+    except Exception as e:
+        logger.error(f"Prediction job enqueue error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/predictions/batch", response_model=BatchPredictionResponse)
+@timed_endpoint("predictions.batch")
+async def batch_predict(request: BatchPredictionRequest):
+    """다중 화주 일괄 예측 (화주별 결과는 /predictions/jobs/{job_id} 로 조회)
+    
+    다중 변수 예측과 다른 선형 추세 모델로 계산되며, 결과 작업은 model_version 으로 구분된다.
+    """
+    try:
+        return await batch_prediction_engine.run(request)
+    except Exception as e:
+        logger.error(f"Batch prediction error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/predictions/jobs/{job_id}")
+async def get_prediction_job_status(job_id: str, columnar: bool = False):
+    """예측 작업 상태 및 결과 조회"""
+    try:
+        job = await prediction_data_manager.get_prediction_job(job_id, columnar=columnar)
+    except Exception as e:
+        logger.error(f"Prediction job lookup error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Prediction job not found")
+    return job
+
 @router.post("/predictions/ab-test", response_model=ABTestResponse)
 async def create_ab_test(
     request: ABTestRequest,
@@ -129,13 +327,41 @@ async def get_ab_test_results(
 
 # ============= 감정 분석 API 엔드포인트 =============
 
+# 원본 결과 대신 롤업으로 집계하는 감정 분석 구간
+ROLLUP_ANALYSIS_RANGES = ('7d', '30d')
+
 @router.post("/sentiment/analyze", response_model=SentimentAnalysisResponse)
+@timed_endpoint("sentiment.analyze")
 async def analyze_market_sentiment(
     request: SentimentAnalysisRequest,
     sentiment_service: MarketSentimentService = Depends(get_sentiment_service)
 ):
-    """시장 감정 분석 실행"""
+    """시장 감정 분석 실행
+    
+    7d/30d 구간의 전체·소스별 점수와 트렌드는 롤업에서 계산하고, 주요 토픽·게시물·감정 분포는
+    최근 24시간 분석 결과를 사용한다. 구간 내 롤업이 비어 있으면(백필 전 등) 원본 결과로 분석한다.
+    """
     try:
+        if request.time_range in ROLLUP_ANALYSIS_RANGES:
+            summary = await sentiment_data_manager.get_sentiment_summary(
+                time_range=request.time_range,
+                keywords=request.keywords,
+                sources=[getattr(source, 'value', source) for source in request.sources]
+            )
+            if summary['volume'] > 0:
+                result = await sentiment_service.analyze_sentiment(
+                    keywords=request.keywords,
+                    sources=request.sources,
+                    time_range='24h',
+                    language=request.language
+                )
+                result.update({
+                    'overall_sentiment': summary['overall_sentiment'],
+                    'sentiment_by_source': summary['sentiment_by_source'],
+                    'sentiment_trend': summary['sentiment_trend']
+                })
+                return SentimentAnalysisResponse(**result)
+        
         result = await sentiment_service.analyze_sentiment(
             keywords=request.keywords,
             sources=request.sources,
@@ -194,14 +420,18 @@ async def detect_market_events(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/sentiment/emotion-index")
+@timed_endpoint("sentiment.emotion_index")
 async def get_market_emotion_index(
     time_range: str = "24h",
     sentiment_service: MarketSentimentService = Depends(get_sentiment_service)
 ):
     """시장 감정 지수 조회"""
     try:
-        emotion_index = await sentiment_service.calculate_emotion_index(
-            time_range=time_range
+        emotion_index = await request_coalescer.do(
+            ("emotion-index", time_range),
+            lambda: sentiment_service.calculate_emotion_index(
+                time_range=time_range
+            )
         )
         return emotion_index
     except Exception as e:
@@ -213,10 +443,55 @@ async def get_market_emotion_index(
 @router.get("/realtime/external-data")
 async def get_external_data_feed(
     data_types: List[str] = ["weather", "oil_prices", "exchange_rates"],
+    source_name: Optional[str] = None,
+    data_key: Optional[str] = None,
+    stream: bool = False,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    before_timestamp: Optional[datetime] = None,
+    before_id: Optional[str] = None,
+    limit: int = 100,
     realtime_service: RealTimeDataService = Depends(get_realtime_service)
 ):
-    """외부 데이터 피드 조회"""
+    """외부 데이터 피드 조회
+    
+    source_name 을 지정하면 저장된 이력을 조회한다. stream=true 이면 since~until 구간을
+    NDJSON 으로 스트리밍하고, 아니면 before_timestamp/before_id 커서로 최신순 페이지를 반환한다.
+    """
+    if source_name and stream:
+        async def ndjson_lines():
+            # 클라이언트가 끊어도 커서의 연결/트랜잭션이 바로 반환되도록 제너레이터를 닫는다
+            rows = external_data_manager.stream_data(
+                source_name, data_key=data_key, since=since, until=until
+            )
+            async with aclosing(rows):
+                async for row in rows:
+                    row['data_value'] = json.loads(row['data_value'])
+                    yield json.dumps(row, default=str) + "\n"
+        
+        return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+    
+    if before_id is not None:
+        try:
+            uuid.UUID(before_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="before_id must be a UUID")
+    
     try:
+        if source_name:
+            before = (before_timestamp, before_id) if before_timestamp and before_id else None
+            items = await external_data_manager.get_latest_data(
+                source_name, data_key=data_key, limit=limit, before=before
+            )
+            next_cursor = None
+            if len(items) == limit:
+                last = items[-1]
+                next_cursor = {
+                    'before_timestamp': last['data_timestamp'],
+                    'before_id': str(last['id'])
+                }
+            return {'items': items, 'next_cursor': next_cursor}
+        
         data_feed = await realtime_service.get_external_data(data_types)
         return data_feed
     except Exception as e:
@@ -262,34 +537,50 @@ async def check_data_quality(
 @router.websocket("/ws/predictions/{shipper_id}")
 async def websocket_predictions(
     websocket,
-    shipper_id: str,
-    prediction_service: AdvancedPredictionService = Depends(get_prediction_service)
+    shipper_id: str
 ):
     """실시간 예측 업데이트 웹소켓"""
     await websocket.accept()
     try:
-        while True:
-            # 실시간 예측 업데이트 전송
-            prediction_update = await prediction_service.get_real_time_prediction(shipper_id)
-            await websocket.send_json(prediction_update)
-            await asyncio.sleep(30)  # 30초마다 업데이트
+        async with prediction_broadcaster.subscribe(shipper_id) as updates:
+            while True:
+                # 30초마다 공유 발행자가 계산한 예측 업데이트 전송
+                prediction_update = await updates.get()
+                if isinstance(prediction_update, Exception):
+                    raise prediction_update
+                await asyncio.wait_for(
+                    websocket.send_text(prediction_update), WEBSOCKET_SEND_TIMEOUT
+                )
     except Exception as e:
         logger.error(f"WebSocket prediction error: {e}")
         await websocket.close()
 
 @router.websocket("/ws/sentiment")
 async def websocket_sentiment(
-    websocket,
-    sentiment_service: MarketSentimentService = Depends(get_sentiment_service)
+    websocket
 ):
-    """실시간 감정 분석 웹소켓"""
+    """실시간 감정 분석 웹소켓
+    
+    첫 메시지는 {"type": "snapshot"}, 이후에는 변경이 있을 때만 JSON Patch 형식의
+    {"type": "delta", "base_version", "ops"} 를 보낸다. 중간 프레임을 놓친 경우 스냅샷을 다시 보낸다.
+    """
     await websocket.accept()
     try:
-        while True:
-            # 실시간 감정 분석 업데이트 전송
-            sentiment_update = await sentiment_service.get_real_time_sentiment()
-            await websocket.send_json(sentiment_update)
-            await asyncio.sleep(60)  # 1분마다 업데이트
+        last_version = None
+        async with sentiment_broadcaster.subscribe("sentiment") as frames:
+            while True:
+                frame = await frames.get()
+                if isinstance(frame, Exception):
+                    raise frame
+                if frame.version == last_version:
+                    continue
+                
+                if last_version is not None and frame.base_version == last_version:
+                    message = frame.delta
+                else:
+                    message = frame.snapshot
+                await asyncio.wait_for(websocket.send_text(message), WEBSOCKET_SEND_TIMEOUT)
+                last_version = frame.version
     except Exception as e:
         logger.error(f"WebSocket sentiment error: {e}")
         await websocket.close()
@@ -308,6 +599,31 @@ async def prediction_health_check(
         logger.error(f"Prediction health check error: {e}")
         raise HTTPException(status_code=503, detail="Prediction service unavailable")
 
+@router.get("/health/services")
+async def services_health_check():
+    """서비스 시작 비용과 정상 상태 요청 지연 조회"""
+    return {
+        **service_registry.snapshot(),
+        'request_coalescing': {
+            **request_coalescer.stats,
+            'inflight': request_coalescer.inflight_count()
+        }
+    }
+
+@router.get("/health/prediction-cache")
+async def prediction_cache_stats():
+    """예측 결과 캐시 적중/미스 통계"""
+    return prediction_cache.snapshot()
+
+@router.get("/health/database")
+async def database_metrics():
+    """데이터베이스 연결 풀 및 쿼리 지표 조회"""
+    try:
+        return db_manager.metrics_snapshot()
+    except Exception as e:
+        logger.error(f"Database metrics error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/health/sentiment")
 async def sentiment_health_check(
     sentiment_service: MarketSentimentService = Depends(get_sentiment_service)
@@ -1,13 +1,19 @@
 # server/database/database_manager.py
 import asyncio
 import asyncpg
+import bisect
+import functools
 import logging
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Union, AsyncIterator, Callable, Tuple
 from datetime import datetime, timedelta
 from contextlib import asynccontextmanager
 import json
 import os
-from dataclasses import dataclass
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import itertools
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +28,182 @@ class DatabaseConfig:
     min_connections: int = int(os.getenv('DB_MIN_CONNECTIONS', '5'))
     max_connections: int = int(os.getenv('DB_MAX_CONNECTIONS', '20'))
     ssl: str = os.getenv('DB_SSL', 'prefer')
+    listener_reconnect_delay: float = float(os.getenv('DB_LISTENER_RECONNECT_DELAY', '5'))
+    # 읽기 전용 복제본 ("host[:port]" 콤마 구분)
+    replica_hosts: List[str] = field(default_factory=lambda: [
+        h.strip() for h in os.getenv('DB_REPLICA_HOSTS', '').split(',') if h.strip()
+    ])
+    replica_selection: str = os.getenv('DB_REPLICA_SELECTION', 'round_robin')  # round_robin | least_busy
+    replica_max_lag_seconds: float = float(os.getenv('DB_REPLICA_MAX_LAG_SECONDS', '5'))
+    replica_health_check_interval: float = float(os.getenv('DB_REPLICA_HEALTH_CHECK_INTERVAL', '10'))
+    slow_query_threshold_ms: float = float(os.getenv('DB_SLOW_QUERY_THRESHOLD_MS', '500'))
+
+@dataclass
+class ReplicaPool:
+    """읽기 복제본 연결 풀 상태"""
+    host: str
+    port: int
+    pool: Optional[asyncpg.Pool] = None
+    healthy: bool = False
+    lag_seconds: Optional[float] = None
+
+    @property
+    def in_use(self) -> int:
+        return self.pool.get_size() - self.pool.get_idle_size() if self.pool else 0
+
+class TTLCache:
+    """크기/TTL 제한 인메모리 캐시
+    
+    가득 차면 가장 오래 사용되지 않은 항목부터 축출한다. invalidate() 는 세대를 올려서,
+    무효화 이전에 시작된 조회 결과가 set(..., generation=...) 으로 다시 저장되지 않게 한다.
+    """
+    
+    def __init__(self, max_size: int = 128, ttl: float = 60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.generation = 0
+        self._data: OrderedDict = OrderedDict()
+    
+    def get(self, key: Any) -> Optional[Any]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+    
+    def set(self, key: Any, value: Any, generation: Optional[int] = None):
+        if generation is not None and generation != self.generation:
+            return
+        self._data[key] = (value, time.monotonic() + self.ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+    
+    def invalidate(self):
+        self._data.clear()
+        self.generation += 1
+    
+    def __len__(self) -> int:
+        return len(self._data)
+
+class Histogram:
+    """고정 버킷 히스토그램 (버킷별 카운트는 누적하지 않음)"""
+    
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+    
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+    
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [str(b) for b in self.buckets] + ['+Inf']
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 3),
+            'buckets': dict(zip(labels, self.counts))
+        }
+
+class DatabaseMetrics:
+    """연결 풀 대기 및 쿼리 지연/행 수 지표"""
+    
+    LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+    ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+    
+    def __init__(self, slow_query_threshold_ms: float):
+        self.slow_query_threshold_ms = slow_query_threshold_ms
+        self.acquire_wait_ms = Histogram(self.LATENCY_BUCKETS_MS)
+        self.query_latency_ms: Dict[str, Histogram] = {}
+        self.query_rows: Dict[str, Histogram] = {}
+        self.query_errors: Dict[str, int] = {}
+        self.slow_queries = 0
+    
+    def observe_acquire(self, wait_ms: float):
+        self.acquire_wait_ms.observe(wait_ms)
+    
+    def observe_query(self, label: str, latency_ms: float, rows: Optional[int], error: bool = False):
+        latency = self.query_latency_ms.get(label)
+        if latency is None:
+            latency = self.query_latency_ms[label] = Histogram(self.LATENCY_BUCKETS_MS)
+            self.query_rows[label] = Histogram(self.ROW_BUCKETS)
+            self.query_errors[label] = 0
+        latency.observe(latency_ms)
+        if rows is not None:
+            self.query_rows[label].observe(rows)
+        if error:
+            self.query_errors[label] += 1
+        
+        if latency_ms >= self.slow_query_threshold_ms:
+            self.slow_queries += 1
+            rows_info = f" ({rows} rows)" if rows is not None else ""
+            logger.warning(f"Slow query {label}: {latency_ms:.1f}ms{rows_info}")
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'acquire_wait_ms': self.acquire_wait_ms.snapshot(),
+            'slow_query_threshold_ms': self.slow_query_threshold_ms,
+            'slow_queries': self.slow_queries,
+            'queries': {
+                label: {
+                    'latency_ms': histogram.snapshot(),
+                    'rows': self.query_rows[label].snapshot(),
+                    'errors': self.query_errors[label]
+                }
+                for label, histogram in self.query_latency_ms.items()
+            }
+        }
+
+# 현재 계측 중인 매니저 메서드 호출의 연결 대기 시간 누적
+_query_context: ContextVar[Optional[Dict[str, float]]] = ContextVar('_query_context', default=None)
+
+def _row_count(result: Any) -> Optional[int]:
+    """쓰기 메서드가 반환한 행 수 또는 조회 결과 목록의 길이 (그 외 반환값은 행 수 미기록)"""
+    if isinstance(result, int) and not isinstance(result, bool):
+        return result
+    if isinstance(result, (list, tuple)):
+        return len(result)
+    return None
+
+def instrumented(func):
+    """매니저 메서드 계측 데코레이터
+    
+    메서드 단위(예: ExternalDataManager.get_latest_data)로 쿼리 지연과 행 수를 기록한다.
+    행 수는 쓰기 메서드가 반환한 int 나 조회 결과 목록 길이로 기록하며, 단건 조회처럼
+    행 수를 알 수 없는 반환값은 지연 시간만 기록한다.
+    지연 시간에서 연결 풀 대기 시간은 제외되며, 대기 시간은 별도 히스토그램으로 집계된다.
+    """
+    label = func.__qualname__
+    
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        parent = _query_context.get()
+        context = {'acquire_ms': 0.0}
+        token = _query_context.set(context)
+        start = time.perf_counter()
+        result = None
+        error = False
+        try:
+            result = await func(self, *args, **kwargs)
+            return result
+        except Exception:
+            error = True
+            raise
+        finally:
+            _query_context.reset(token)
+            if parent is not None:
+                parent['acquire_ms'] += context['acquire_ms']
+            elapsed_ms = (time.perf_counter() - start) * 1000 - context['acquire_ms']
+            self.db.metrics.observe_query(label, elapsed_ms, _row_count(result), error)
+    
+    return wrapper
 
 class DatabaseManager:
     """데이터베이스 연결 및 쿼리 관리자"""
@@ -30,6 +212,24 @@ class DatabaseManager:
         self.config = config or DatabaseConfig()
         self.pool: Optional[asyncpg.Pool] = None
         self._initialized = False
+        self._listener_conn: Optional[asyncpg.Connection] = None
+        self._listener_lock = asyncio.Lock()
+        self._listener_reconnect_task: Optional[asyncio.Task] = None
+        self._channel_callbacks: Dict[str, List[Callable[[Optional[str]], Any]]] = {}
+        self.metrics = DatabaseMetrics(self.config.slow_query_threshold_ms)
+        self.replicas: List[ReplicaPool] = []
+        self._replica_counter = itertools.count()
+        self._replica_health_task: Optional[asyncio.Task] = None
+    
+    def _connect_kwargs(self) -> Dict[str, Any]:
+        return {
+            'host': self.config.host,
+            'port': self.config.port,
+            'database': self.config.database,
+            'user': self.config.username,
+            'password': self.config.password,
+            'ssl': self.config.ssl,
+        }
     
     async def initialize(self):
         """데이터베이스 연결 풀 초기화"""
@@ -38,14 +238,9 @@ class DatabaseManager:
         
         try:
             self.pool = await asyncpg.create_pool(
-                host=self.config.host,
-                port=self.config.port,
-                database=self.config.database,
-                user=self.config.username,
-                password=self.config.password,
+                **self._connect_kwargs(),
                 min_size=self.config.min_connections,
                 max_size=self.config.max_connections,
-                ssl=self.config.ssl,
                 command_timeout=60
             )
             self._initialized = True
@@ -53,9 +248,90 @@ class DatabaseManager:
         except Exception as e:
             logger.error(f"Failed to initialize database pool: {e}")
             raise
+        
+        if self.config.replica_hosts:
+            await self._initialize_replicas()
+    
+    async def _initialize_replicas(self):
+        """읽기 복제본 풀 생성 및 헬스체크 시작 (실패한 복제본은 제외 상태로 시작)"""
+        for replica_host in self.config.replica_hosts:
+            host, _, port = replica_host.partition(':')
+            replica = ReplicaPool(host=host, port=int(port) if port else self.config.port)
+            try:
+                replica.pool = await asyncpg.create_pool(
+                    **{**self._connect_kwargs(), 'host': replica.host, 'port': replica.port},
+                    min_size=self.config.min_connections,
+                    max_size=self.config.max_connections,
+                    command_timeout=60
+                )
+            except Exception as e:
+                logger.error(f"Failed to initialize replica pool {replica_host}: {e}")
+            self.replicas.append(replica)
+        
+        await self._check_replicas()
+        self._replica_health_task = asyncio.ensure_future(self._replica_health_loop())
+    
+    async def _replica_health_loop(self):
+        while True:
+            await asyncio.sleep(self.config.replica_health_check_interval)
+            try:
+                await self._check_replicas()
+            except Exception as e:
+                logger.error(f"Replica health check error: {e}")
+    
+    async def _check_replicas(self):
+        """복제본 상태 및 복제 지연 확인, 지연 한도 초과 시 제외"""
+        for replica in self.replicas:
+            if replica.pool is None:
+                continue
+            try:
+                async with replica.pool.acquire() as conn:
+                    # 수신한 WAL 을 모두 재생했으면 마지막 재생 이후 시간이 지나도 지연은 0
+                    # (프라이머리에 쓰기가 없는 동안 정상 복제본이 제외되지 않도록)
+                    lag = await conn.fetchval("""
+                        SELECT CASE
+                            WHEN NOT pg_is_in_recovery() THEN 0
+                            WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                            ELSE COALESCE(EXTRACT(EPOCH FROM NOW() - pg_last_xact_replay_timestamp()), 0)
+                            END
+                    """)
+                replica.lag_seconds = float(lag)
+                healthy = replica.lag_seconds <= self.config.replica_max_lag_seconds
+            except Exception as e:
+                logger.warning(f"Replica {replica.host}:{replica.port} health check failed: {e}")
+                replica.lag_seconds = None
+                healthy = False
+            
+            if healthy != replica.healthy:
+                logger.info(
+                    f"Replica {replica.host}:{replica.port} "
+                    f"{'restored' if healthy else 'ejected'} (lag: {replica.lag_seconds})"
+                )
+            replica.healthy = healthy
+    
+    def _select_replica(self) -> Optional[ReplicaPool]:
+        candidates = [r for r in self.replicas if r.healthy]
+        if not candidates:
+            return None
+        if self.config.replica_selection == 'least_busy':
+            return min(candidates, key=lambda r: r.in_use)
+        return candidates[next(self._replica_counter) % len(candidates)]
     
     async def close(self):
         """데이터베이스 연결 풀 종료"""
+        if self._replica_health_task:
+            self._replica_health_task.cancel()
+            self._replica_health_task = None
+        for replica in self.replicas:
+            if replica.pool:
+                await replica.pool.close()
+        self.replicas = []
+        if self._listener_reconnect_task:
+            self._listener_reconnect_task.cancel()
+            self._listener_reconnect_task = None
+        if self._listener_conn:
+            listener_conn, self._listener_conn = self._listener_conn, None
+            await listener_conn.close()
         if self.pool:
             await self.pool.close()
             self._initialized = False
@@ -67,15 +343,222 @@ class DatabaseManager:
         if not self._initialized:
             await self.initialize()
         
+        start = time.perf_counter()
         async with self.pool.acquire() as connection:
+            self._record_acquire(start)
             yield connection
     
+    def _record_acquire(self, start: float):
+        wait_ms = (time.perf_counter() - start) * 1000
+        self.metrics.observe_acquire(wait_ms)
+        context = _query_context.get()
+        if context is not None:
+            context['acquire_ms'] += wait_ms
+    
+    def pool_stats(self) -> Dict[str, Any]:
+        """연결 풀 크기/유휴/사용 중 연결 수"""
+        def stats(pool: Optional[asyncpg.Pool]) -> Dict[str, int]:
+            if pool is None:
+                return {'size': 0, 'idle': 0, 'in_use': 0}
+            size, idle = pool.get_size(), pool.get_idle_size()
+            return {'size': size, 'idle': idle, 'in_use': size - idle}
+        
+        return {
+            'primary': {
+                **stats(self.pool),
+                'min_size': self.config.min_connections,
+                'max_size': self.config.max_connections
+            },
+            'replicas': [
+                {
+                    'host': f"{replica.host}:{replica.port}",
+                    'healthy': replica.healthy,
+                    'lag_seconds': replica.lag_seconds,
+                    **stats(replica.pool)
+                }
+                for replica in self.replicas
+            ]
+        }
+    
+    def metrics_snapshot(self) -> Dict[str, Any]:
+        """풀 상태와 쿼리 지표 스냅샷"""
+        return {
+            'initialized': self._initialized,
+            'pools': self.pool_stats(),
+            **self.metrics.snapshot()
+        }
+    
+    @asynccontextmanager
+    async def get_read_connection(self):
+        """읽기 전용 연결 컨텍스트 매니저
+        
+        정상 복제본이 있으면 설정된 방식(round_robin/least_busy)으로 골라 사용하고,
+        없거나 연결 획득에 실패하면 프라이머리로 대체한다.
+        """
+        if not self._initialized:
+            await self.initialize()
+        
+        replica = self._select_replica()
+        connection = None
+        if replica is not None:
+            start = time.perf_counter()
+            try:
+                connection = await replica.pool.acquire()
+                self._record_acquire(start)
+            except Exception as e:
+                logger.warning(f"Replica {replica.host}:{replica.port} acquire failed, using primary: {e}")
+                replica.healthy = False
+        
+        if connection is None:
+            async with self.get_connection() as connection:
+                yield connection
+            return
+        
+        try:
+            yield connection
+        finally:
+            await replica.pool.release(connection)
+    
     @asynccontextmanager
     async def get_transaction(self):
         """트랜잭션 컨텍스트 매니저"""
         async with self.get_connection() as conn:
             async with conn.transaction():
                 yield conn
+    
+    @property
+    def listener_connected(self) -> bool:
+        """LISTEN 전용 연결이 살아 있는지 여부"""
+        return self._listener_conn is not None and not self._listener_conn.is_closed()
+    
+    async def listen(self, channel: str, callback: Callable[[Optional[str]], Any]):
+        """NOTIFY 채널 구독
+        
+        구독은 전용 연결 하나에서 처리된다. 채널마다 LISTEN 은 한 번만 등록되고
+        알림은 등록된 callback 들에 나눠 전달된다. callback 은 알림 payload 로 호출되며,
+        연결이 끊겨 알림을 놓쳤을 수 있을 때는 None 으로 호출된다.
+        """
+        async with self._listener_lock:
+            callbacks = self._channel_callbacks.setdefault(channel, [])
+            callbacks.append(callback)
+            if self.listener_connected:
+                if len(callbacks) == 1:
+                    try:
+                        await self._listener_conn.add_listener(channel, self._dispatch_notification)
+                    except Exception:
+                        del self._channel_callbacks[channel]
+                        raise
+                return
+            try:
+                await self._connect_listener()
+            except Exception:
+                self._schedule_listener_reconnect()
+                raise
+    
+    async def notify(self, conn: asyncpg.Connection, channel: str, payload: str = ''):
+        """NOTIFY 발행 (트랜잭션 안에서 호출하면 커밋 시점에 전달된다)"""
+        await conn.execute("SELECT pg_notify($1, $2)", channel, payload)
+    
+    async def _connect_listener(self):
+        conn = await asyncpg.connect(**self._connect_kwargs())
+        conn.add_termination_listener(self._on_listener_terminated)
+        for channel in self._channel_callbacks:
+            await conn.add_listener(channel, self._dispatch_notification)
+        self._listener_conn = conn
+        logger.info(f"Notification listener connected: {list(self._channel_callbacks)}")
+    
+    def _dispatch_notification(self, connection, pid, channel: str, payload: Optional[str]):
+        for callback in self._channel_callbacks.get(channel, []):
+            try:
+                callback(payload)
+            except Exception as e:
+                logger.error(f"Notification callback error on {channel}: {e}")
+    
+    def _on_listener_terminated(self, connection):
+        if connection is not self._listener_conn:
+            return
+        
+        logger.warning("Notification listener connection lost, reconnecting")
+        self._listener_conn = None
+        # 끊긴 동안의 알림은 유실될 수 있으므로 구독자에게 알린다
+        for channel in self._channel_callbacks:
+            self._dispatch_notification(connection, None, channel, None)
+        
+        self._schedule_listener_reconnect()
+    
+    def _schedule_listener_reconnect(self):
+        if not self._listener_reconnect_task or self._listener_reconnect_task.done():
+            self._listener_reconnect_task = asyncio.ensure_future(self._reconnect_listener())
+    
+    async def _reconnect_listener(self):
+        while self._channel_callbacks and not self.listener_connected:
+            await asyncio.sleep(self.config.listener_reconnect_delay)
+            try:
+                async with self._listener_lock:
+                    if not self.listener_connected:
+                        await self._connect_listener()
+            except Exception as e:
+                logger.error(f"Notification listener reconnect failed: {e}")
+    
+    async def bulk_write(
+        self,
+        conn: asyncpg.Connection,
+        table: str,
+        columns: List[str],
+        records: List[tuple],
+        conflict_columns: Optional[List[str]] = None,
+        update_columns: Optional[List[str]] = None
+    ) -> int:
+        """COPY 기반 대량 쓰기 (충돌 키가 있으면 스테이징 테이블 경유 upsert)
+        
+        conflict_columns 가 없으면 대상 테이블에 바로 COPY 한다.
+        있으면 세션 임시 스테이징 테이블에 COPY 후 단일 INSERT ... ON CONFLICT 로 병합하며,
+        update_columns 가 없으면 DO NOTHING, 있으면 DO UPDATE 로 처리한다.
+        반환값은 실제로 삽입/갱신된 행 수.
+        """
+        if not records:
+            return 0
+        
+        if not conflict_columns:
+            await conn.copy_records_to_table(table, records=records, columns=columns)
+            return len(records)
+        
+        if not conn.is_in_transaction():
+            async with conn.transaction():
+                return await self.bulk_write(
+                    conn, table, columns, records, conflict_columns, update_columns
+                )
+        
+        # 스테이징 테이블은 세션에 유지되어 재사용되고, 커밋 시 비워진다
+        stage = f"_bulk_stage_{table}"
+        column_list = ", ".join(columns)
+        conflict_list = ", ".join(conflict_columns)
+        await conn.execute(f"""
+            CREATE TEMP TABLE IF NOT EXISTS {stage}
+                (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS;
+            TRUNCATE {stage};
+        """)
+        await conn.copy_records_to_table(stage, records=records, columns=columns)
+        
+        # 배치 내 중복 키는 기존 행 단위 루프와 같은 결과가 되도록 정리
+        # (DO UPDATE 는 마지막 행, DO NOTHING 은 첫 행이 남는다)
+        if update_columns:
+            order = "DESC"
+            action = "DO UPDATE SET " + ", ".join(
+                f"{col} = EXCLUDED.{col}" for col in update_columns
+            )
+        else:
+            order = "ASC"
+            action = "DO NOTHING"
+        
+        status = await conn.execute(f"""
+            INSERT INTO {table} ({column_list})
+            SELECT DISTINCT ON ({conflict_list}) {column_list}
+            FROM {stage}
+            ORDER BY {conflict_list}, ctid {order}
+            ON CONFLICT ({conflict_list}) {action}
+        """)
+        return int(status.split()[-1])
 
 class PredictionDataManager:
     """예측 데이터 관리자"""
@@ -83,6 +566,7 @@ class PredictionDataManager:
     def __init__(self, db_manager: DatabaseManager):
         self.db = db_manager
     
+    @instrumented
     async def create_prediction_job(self, job_data: Dict[str, Any]) -> str:
         """예측 작업 생성"""
         async with self.db.get_transaction() as conn:
@@ -99,104 +583,381 @@ class PredictionDataManager:
                 job_data['model_type'],
                 job_data['prediction_horizon'],
                 job_data['confidence_level'],
-                'pending'
+                job_data.get('status', 'pending')
             )
             
             # 예측 변수들 저장
             if 'variables' in job_data:
-                for var in job_data['variables']:
-                    await conn.execute("""
-                        INSERT INTO prediction_variables (
-                            job_id, variable_name, variable_type, weight, 
-                            data_source, update_frequency
-                        ) VALUES ($1, $2, $3, $4, $5, $6)
-                    """,
-                        job_id, var['name'], var['type'], var['weight'],
-                        var['data_source'], var['update_frequency']
-                    )
+                await self.db.bulk_write(
+                    conn, 'prediction_variables',
+                    ['job_id', 'variable_name', 'variable_type', 'weight',
+                     'data_source', 'update_frequency'],
+                    [
+                        (job_id, var['name'], var['type'], var['weight'],
+                         var['data_source'], var['update_frequency'])
+                        for var in job_data['variables']
+                    ]
+                )
             
             return str(job_id)
     
-    async def save_prediction_results(self, job_id: str, results: List[Dict[str, Any]]):
+    @instrumented
+    async def save_prediction_results(self, job_id: str, results: List[Dict[str, Any]]) -> int:
         """예측 결과 저장"""
         async with self.db.get_transaction() as conn:
-            for result in results:
-                await conn.execute("""
-                    INSERT INTO prediction_results (
-                        job_id, prediction_date, predicted_value,
-                        confidence_lower, confidence_upper, confidence_level,
-                        model_accuracy
-                    ) VALUES ($1, $2, $3, $4, $5, $6, $7)
-                    ON CONFLICT (job_id, prediction_date) 
-                    DO UPDATE SET
-                        predicted_value = EXCLUDED.predicted_value,
-                        confidence_lower = EXCLUDED.confidence_lower,
-                        confidence_upper = EXCLUDED.confidence_upper,
-                        model_accuracy = EXCLUDED.model_accuracy
-                """,
-                    job_id, result['date'], result['predicted_value'],
-                    result['confidence_lower'], result['confidence_upper'],
-                    result['confidence_level'], result.get('model_accuracy')
-                )
+            return await self.db.bulk_write(
+                conn, 'prediction_results',
+                ['job_id', 'prediction_date', 'predicted_value',
+                 'confidence_lower', 'confidence_upper', 'confidence_level',
+                 'model_accuracy'],
+                [
+                    (job_id, result['date'], result['predicted_value'],
+                     result['confidence_lower'], result['confidence_upper'],
+                     result['confidence_level'], result.get('model_accuracy'))
+                    for result in results
+                ],
+                conflict_columns=['job_id', 'prediction_date'],
+                update_columns=['predicted_value', 'confidence_lower',
+                                'confidence_upper', 'model_accuracy']
+            )
     
-    async def save_feature_importance(self, job_id: str, features: Dict[str, float]):
+    @instrumented
+    async def save_feature_importance(self, job_id: str, features: Dict[str, float]) -> int:
         """특성 중요도 저장"""
-        async with self.db.get_connection() as conn:
+        async with self.db.get_transaction() as conn:
             # 기존 특성 중요도 삭제
             await conn.execute("DELETE FROM feature_importance WHERE job_id = $1", job_id)
             
             # 새로운 특성 중요도 저장
             sorted_features = sorted(features.items(), key=lambda x: x[1], reverse=True)
-            for rank, (feature_name, importance) in enumerate(sorted_features, 1):
-                await conn.execute("""
-                    INSERT INTO feature_importance (
-                        job_id, feature_name, importance_score, rank
-                    ) VALUES ($1, $2, $3, $4)
-                """, job_id, feature_name, importance, rank)
-    
-    async def get_prediction_job(self, job_id: str) -> Optional[Dict[str, Any]]:
-        """예측 작업 조회"""
-        async with self.db.get_connection() as conn:
-            job = await conn.fetchrow("""
-                SELECT * FROM prediction_jobs WHERE id = $1
-            """, job_id)
-            
-            if not job:
-                return None
-            
-            # 변수들 조회
-            variables = await conn.fetch("""
-                SELECT * FROM prediction_variables WHERE job_id = $1
-            """, job_id)
-            
-            # 결과들 조회
-            results = await conn.fetch("""
-                SELECT * FROM prediction_results WHERE job_id = $1
-                ORDER BY prediction_date
-            """, job_id)
-            
-            # 특성 중요도 조회
-            features = await conn.fetch("""
-                SELECT feature_name, importance_score 
-                FROM feature_importance WHERE job_id = $1
-                ORDER BY rank
+            return await self.db.bulk_write(
+                conn, 'feature_importance',
+                ['job_id', 'feature_name', 'importance_score', 'rank'],
+                [
+                    (job_id, feature_name, importance, rank)
+                    for rank, (feature_name, importance) in enumerate(sorted_features, 1)
+                ]
+            )
+    
+    VARIABLE_COLUMNS = [
+        'id', 'job_id', 'variable_name', 'variable_type', 'weight',
+        'data_source', 'update_frequency', 'created_at'
+    ]
+    RESULT_COLUMNS = [
+        'id', 'job_id', 'prediction_date', 'predicted_value', 'confidence_lower',
+        'confidence_upper', 'confidence_level', 'model_accuracy', 'created_at'
+    ]
+    # 컬럼형 응답 키 -> prediction_results 컬럼
+    COLUMNAR_RESULT_COLUMNS = {
+        'dates': 'prediction_date',
+        'values': 'predicted_value',
+        'lower': 'confidence_lower',
+        'upper': 'confidence_upper'
+    }
+    
+    @instrumented
+    async def get_prediction_job(self, job_id: str, columnar: bool = False,
+                                 primary: bool = False) -> Optional[Dict[str, Any]]:
+        """예측 작업 조회
+        
+        작업, 변수, 결과, 특성 중요도를 컬럼별 array_agg 를 쓰는 단일 쿼리로 가져온다.
+        columnar=True 이면 results 를 {'dates', 'values', 'lower', 'upper'} 배열로 반환한다.
+        방금 쓴 작업을 읽어야 하면 primary=True 로 복제 지연 없이 프라이머리에서 읽는다.
+        """
+        result_columns = (
+            list(self.COLUMNAR_RESULT_COLUMNS.values()) if columnar else self.RESULT_COLUMNS
+        )
+        variable_aggs = ", ".join(
+            f"array_agg({col} ORDER BY created_at, id) AS {col}" for col in self.VARIABLE_COLUMNS
+        )
+        result_aggs = ", ".join(
+            f"array_agg({col} ORDER BY prediction_date) AS {col}" for col in result_columns
+        )
+        variable_select = ", ".join(f"pv.{col} AS pv_{col}" for col in self.VARIABLE_COLUMNS)
+        result_select = ", ".join(f"pr.{col} AS pr_{col}" for col in result_columns)
+        
+        connection = self.db.get_connection() if primary else self.db.get_read_connection()
+        async with connection as conn:
+            row = await conn.fetchrow(f"""
+                SELECT pj.*,
+                       {variable_select}, {result_select},
+                       fi.feature_names AS fi_feature_names,
+                       fi.importance_scores AS fi_importance_scores
+                FROM prediction_jobs pj
+                LEFT JOIN LATERAL (
+                    SELECT {variable_aggs}
+                    FROM prediction_variables WHERE job_id = pj.id
+                ) pv ON true
+                LEFT JOIN LATERAL (
+                    SELECT {result_aggs}
+                    FROM prediction_results WHERE job_id = pj.id
+                ) pr ON true
+                LEFT JOIN LATERAL (
+                    SELECT array_agg(feature_name ORDER BY rank) AS feature_names,
+                           array_agg(importance_score ORDER BY rank) AS importance_scores
+                    FROM feature_importance WHERE job_id = pj.id
+                ) fi ON true
+                WHERE pj.id = $1
             """, job_id)
-            
-            return {
-                'job': dict(job),
-                'variables': [dict(var) for var in variables],
-                'results': [dict(result) for result in results],
-                'feature_importance': {f['feature_name']: f['importance_score'] for f in features}
+        
+        if not row:
+            return None
+        
+        job = {}
+        variable_arrays = {}
+        result_arrays = {}
+        for key, value in row.items():
+            if key.startswith('pv_'):
+                variable_arrays[key[3:]] = value or []
+            elif key.startswith('pr_'):
+                result_arrays[key[3:]] = value or []
+            elif not key.startswith('fi_'):
+                job[key] = value
+        
+        variables = [
+            dict(zip(self.VARIABLE_COLUMNS, values))
+            for values in zip(*(variable_arrays[col] for col in self.VARIABLE_COLUMNS))
+        ]
+        
+        if columnar:
+            results = {
+                name: result_arrays[col]
+                for name, col in self.COLUMNAR_RESULT_COLUMNS.items()
             }
+        else:
+            results = [
+                dict(zip(self.RESULT_COLUMNS, values))
+                for values in zip(*(result_arrays[col] for col in self.RESULT_COLUMNS))
+            ]
+        
+        return {
+            'job': job,
+            'variables': variables,
+            'results': results,
+            'feature_importance': dict(zip(
+                row['fi_feature_names'] or [], row['fi_importance_scores'] or []
+            ))
+        }
     
-    async def update_job_status(self, job_id: str, status: str, error_message: str = None):
+    @instrumented
+    async def update_job_status(self, job_id: str, status: str, error_message: str = None) -> int:
         """작업 상태 업데이트"""
         async with self.db.get_connection() as conn:
-            await conn.execute("""
+            result = await conn.execute("""
                 UPDATE prediction_jobs 
                 SET status = $2, error_message = $3, updated_at = NOW()
                 WHERE id = $1
             """, job_id, status, error_message)
+            return int(result.split()[-1])
+    
+    @instrumented
+    async def save_prediction_response(self, job_id: str, response: Dict[str, Any]) -> int:
+        """PredictionResponse 형식 결과의 예측 포인트와 특성 중요도 저장"""
+        rows = await self.save_prediction_results(job_id, [
+            {
+                'date': point['date'],
+                'predicted_value': point['predicted_value'],
+                'confidence_lower': point['confidence_interval']['lower_bound'],
+                'confidence_upper': point['confidence_interval']['upper_bound'],
+                'confidence_level': point['confidence_interval']['confidence_level'],
+                'model_accuracy': response.get('model_accuracy')
+            }
+            for point in response.get('predictions', [])
+        ])
+        if response.get('feature_importance'):
+            rows += await self.save_feature_importance(job_id, response['feature_importance'])
+        return rows
+    
+    @instrumented
+    async def save_batch_predictions(
+        self,
+        jobs: List[Dict[str, Any]],
+        results: List[tuple],
+        features: List[tuple]
+    ) -> int:
+        """일괄 예측 결과 저장 (작업/결과/특성 중요도를 한 트랜잭션에서 COPY)
+        
+        jobs 는 id 와 model_version 이 지정된 완료 작업, results 는 RESULT_COLUMNS 에서 id/created_at 을 뺀
+        순서의 튜플, features 는 (job_id, feature_name, importance_score, rank) 튜플이다.
+        """
+        now = datetime.now().astimezone()
+        async with self.db.get_transaction() as conn:
+            await self.db.bulk_write(
+                conn, 'prediction_jobs',
+                ['id', 'shipper_id', 'job_name', 'model_type', 'model_version',
+                 'prediction_horizon', 'confidence_level', 'status', 'completed_at'],
+                [
+                    (job['id'], job['shipper_id'], job['job_name'], job['model_type'],
+                     job['model_version'], job['prediction_horizon'], job['confidence_level'],
+                     'completed', now)
+                    for job in jobs
+                ]
+            )
+            await self.db.bulk_write(
+                conn, 'prediction_results',
+                ['job_id', 'prediction_date', 'predicted_value', 'confidence_lower',
+                 'confidence_upper', 'confidence_level', 'model_accuracy'],
+                results
+            )
+            await self.db.bulk_write(
+                conn, 'feature_importance',
+                ['job_id', 'feature_name', 'importance_score', 'rank'],
+                features
+            )
+        return len(jobs)
+    
+    @instrumented
+    async def save_cached_prediction(self, job_data: Dict[str, Any], response: Dict[str, Any]) -> str:
+        """예측 캐시 항목 저장
+        
+        job_name(캐시 키)당 한 행을 'cached' 상태로 upsert 하고 결과와 특성 중요도를 같은
+        트랜잭션에서 교체한다. 'cached' 작업은 작업 큐와 prediction_performance_summary 에서 제외된다.
+        """
+        async with self.db.get_transaction() as conn:
+            job_id = await conn.fetchval("""
+                INSERT INTO prediction_jobs (
+                    shipper_id, job_name, model_type, prediction_horizon,
+                    confidence_level, status, completed_at
+                ) VALUES ($1, $2, $3, $4, $5, 'cached', NOW())
+                ON CONFLICT (job_name) WHERE status = 'cached' DO UPDATE SET
+                    shipper_id = EXCLUDED.shipper_id,
+                    model_type = EXCLUDED.model_type,
+                    prediction_horizon = EXCLUDED.prediction_horizon,
+                    confidence_level = EXCLUDED.confidence_level,
+                    created_at = NOW(), updated_at = NOW(), completed_at = NOW()
+                RETURNING id
+            """,
+                job_data['shipper_id'], job_data['job_name'], job_data['model_type'],
+                job_data['prediction_horizon'], job_data['confidence_level']
+            )
+            await conn.execute("DELETE FROM prediction_results WHERE job_id = $1", job_id)
+            await conn.execute("DELETE FROM feature_importance WHERE job_id = $1", job_id)
+            
+            await self.db.bulk_write(
+                conn, 'prediction_results',
+                ['job_id', 'prediction_date', 'predicted_value', 'confidence_lower',
+                 'confidence_upper', 'confidence_level', 'model_accuracy'],
+                [
+                    (job_id, point['date'], point['predicted_value'],
+                     point['confidence_interval']['lower_bound'],
+                     point['confidence_interval']['upper_bound'],
+                     point['confidence_interval']['confidence_level'],
+                     response.get('model_accuracy'))
+                    for point in response.get('predictions', [])
+                ]
+            )
+            sorted_features = sorted(
+                (response.get('feature_importance') or {}).items(),
+                key=lambda x: x[1], reverse=True
+            )
+            await self.db.bulk_write(
+                conn, 'feature_importance',
+                ['job_id', 'feature_name', 'importance_score', 'rank'],
+                [
+                    (job_id, feature_name, importance, rank)
+                    for rank, (feature_name, importance) in enumerate(sorted_features, 1)
+                ]
+            )
+            
+            return str(job_id)
+    
+    @instrumented
+    async def purge_cached_predictions(self, max_age: timedelta) -> int:
+        """max_age 동안 갱신되지 않은 예측 캐시 항목 삭제 (결과는 CASCADE 로 함께 삭제)"""
+        async with self.db.get_connection() as conn:
+            status = await conn.execute("""
+                DELETE FROM prediction_jobs
+                WHERE status = 'cached' AND updated_at < NOW() - $1::interval
+            """, max_age)
+            return int(status.split()[-1])
+    
+    # ============= 작업 큐 =============
+    
+    @instrumented
+    async def claim_pending_jobs(self, worker_id: str, limit: int,
+                                 lease: timedelta) -> List[Dict[str, Any]]:
+        """실행 가능한 대기 작업을 FOR UPDATE SKIP LOCKED 로 선점하고 임대 설정"""
+        async with self.db.get_connection() as conn:
+            jobs = await conn.fetch("""
+                UPDATE prediction_jobs pj
+                SET status = 'running', locked_by = $1, attempts = pj.attempts + 1,
+                    lease_expires_at = NOW() + $3::interval, error_message = NULL,
+                    updated_at = NOW()
+                FROM (
+                    SELECT id FROM prediction_jobs
+                    WHERE status = 'pending' AND next_run_at <= NOW()
+                    ORDER BY next_run_at, created_at
+                    LIMIT $2
+                    FOR UPDATE SKIP LOCKED
+                ) claimable
+                WHERE pj.id = claimable.id
+                RETURNING pj.*
+            """, worker_id, limit, lease)
+            return [dict(job) for job in jobs]
+    
+    @instrumented
+    async def renew_job_lease(self, job_id: str, worker_id: str, lease: timedelta) -> bool:
+        """작업 임대 연장 (다른 워커에게 넘어간 경우 False)"""
+        async with self.db.get_connection() as conn:
+            status = await conn.execute("""
+                UPDATE prediction_jobs SET lease_expires_at = NOW() + $3::interval
+                WHERE id = $1 AND locked_by = $2 AND status = 'running'
+            """, job_id, worker_id, lease)
+            return status.endswith(' 1')
+    
+    @instrumented
+    async def complete_job(self, job_id: str, worker_id: str) -> bool:
+        """임대 중인 작업 완료 처리"""
+        async with self.db.get_connection() as conn:
+            status = await conn.execute("""
+                UPDATE prediction_jobs
+                SET status = 'completed', locked_by = NULL, lease_expires_at = NULL,
+                    completed_at = NOW(), updated_at = NOW()
+                WHERE id = $1 AND locked_by = $2 AND status = 'running'
+            """, job_id, worker_id)
+            return status.endswith(' 1')
+    
+    @instrumented
+    async def fail_job(self, job_id: str, worker_id: str, error_message: str,
+                       retry_delay: timedelta) -> Optional[str]:
+        """작업 실패 처리 (재시도 횟수가 남으면 retry_delay 후 재시도), 변경된 상태 반환"""
+        async with self.db.get_connection() as conn:
+            return await conn.fetchval("""
+                UPDATE prediction_jobs
+                SET status = CASE WHEN attempts < max_attempts THEN 'pending' ELSE 'failed' END,
+                    next_run_at = NOW() + $4::interval,
+                    error_message = $3, locked_by = NULL, lease_expires_at = NULL,
+                    updated_at = NOW()
+                WHERE id = $1 AND locked_by = $2 AND status = 'running'
+                RETURNING status
+            """, job_id, worker_id, error_message, retry_delay)
+    
+    @instrumented
+    async def recover_stuck_jobs(self) -> int:
+        """임대가 만료된 실행 중 작업을 대기(또는 재시도 소진 시 실패) 상태로 복구"""
+        async with self.db.get_connection() as conn:
+            status = await conn.execute("""
+                UPDATE prediction_jobs
+                SET status = CASE WHEN attempts < max_attempts THEN 'pending' ELSE 'failed' END,
+                    error_message = 'lease expired (worker ' || COALESCE(locked_by, '?') || ')',
+                    locked_by = NULL, lease_expires_at = NULL, next_run_at = NOW(),
+                    updated_at = NOW()
+                WHERE status = 'running' AND lease_expires_at < NOW()
+            """)
+            return int(status.split()[-1])
+    
+    @instrumented
+    async def find_latest_job(self, job_name: str, max_age: timedelta,
+                              status: str = 'completed') -> Optional[str]:
+        """이름과 상태가 일치하는 max_age 이내의 최신 작업 ID 조회"""
+        async with self.db.get_read_connection() as conn:
+            job_id = await conn.fetchval("""
+                SELECT id FROM prediction_jobs
+                WHERE job_name = $1 AND status = $2 AND created_at >= NOW() - $3::interval
+                ORDER BY created_at DESC
+                LIMIT 1
+            """, job_name, status, max_age)
+            return str(job_id) if job_id else None
 
 class SentimentDataManager:
     """감정 분석 데이터 관리자"""
@@ -204,6 +965,7 @@ class SentimentDataManager:
     def __init__(self, db_manager: DatabaseManager):
         self.db = db_manager
     
+    @instrumented
     async def create_sentiment_job(self, job_data: Dict[str, Any]) -> str:
         """감정 분석 작업 생성"""
         async with self.db.get_connection() as conn:
@@ -223,83 +985,245 @@ class SentimentDataManager:
             
             return str(job_id)
     
-    async def save_sentiment_results(self, job_id: str, results: List[Dict[str, Any]]):
+    @instrumented
+    async def save_sentiment_results(self, job_id: str, results: List[Dict[str, Any]]) -> int:
         """감정 분석 결과 저장"""
         async with self.db.get_transaction() as conn:
-            for result in results:
-                await conn.execute("""
-                    INSERT INTO sentiment_analysis_results (
-                        job_id, source, positive_score, negative_score,
-                        neutral_score, compound_score, confidence
-                    ) VALUES ($1, $2, $3, $4, $5, $6, $7)
-                """,
-                    job_id, result['source'], result['positive_score'],
-                    result['negative_score'], result['neutral_score'],
-                    result['compound_score'], result['confidence']
-                )
+            rows = await self.db.bulk_write(
+                conn, 'sentiment_analysis_results',
+                ['job_id', 'source', 'positive_score', 'negative_score',
+                 'neutral_score', 'compound_score', 'confidence'],
+                [
+                    (job_id, result['source'], result['positive_score'],
+                     result['negative_score'], result['neutral_score'],
+                     result['compound_score'], result['confidence'])
+                    for result in results
+                ]
+            )
+            await self._update_sentiment_rollups(conn, job_id, results)
+            return rows
+    
+    async def _update_sentiment_rollups(self, conn: asyncpg.Connection, job_id: str,
+                                        results: List[Dict[str, Any]]):
+        """새 결과를 작업 키워드 집합/소스별 시간·일 단위 롤업에 누적
+        
+        같은 트랜잭션에서 저장된 결과는 analyzed_at 이 모두 NOW() 이므로 소스별 합계만
+        계산해 현재 버킷에 더한다. 결과는 키워드마다가 아니라 작업의 키워드 집합 행 하나에만
+        더해지므로, 여러 키워드로 조회해도 같은 결과가 한 번만 집계된다.
+        """
+        totals: Dict[str, List[float]] = {}
+        for result in results:
+            sums = totals.setdefault(result['source'], [0.0, 0.0, 0.0, 0.0, 0.0, 0])
+            sums[0] += float(result['positive_score'])
+            sums[1] += float(result['negative_score'])
+            sums[2] += float(result['neutral_score'])
+            sums[3] += float(result['compound_score'])
+            sums[4] += float(result['confidence'])
+            sums[5] += 1
+        if not totals:
+            return
+        
+        columns = list(zip(*totals.values()))
+        await conn.execute("""
+            INSERT INTO sentiment_rollups (
+                granularity, bucket, source, keywords, positive_sum, negative_sum,
+                neutral_sum, compound_sum, confidence_sum, volume
+            )
+            SELECT g.granularity,
+                   date_trunc(g.granularity, NOW() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+                   s.source, k.keywords, s.positive_sum, s.negative_sum, s.neutral_sum,
+                   s.compound_sum, s.confidence_sum, s.volume
+            FROM unnest($2::text[], $3::float8[], $4::float8[], $5::float8[],
+                        $6::float8[], $7::float8[], $8::int[])
+                AS s(source, positive_sum, negative_sum, neutral_sum,
+                     compound_sum, confidence_sum, volume)
+            CROSS JOIN (
+                SELECT ARRAY(
+                    SELECT DISTINCT jsonb_array_elements_text(keywords) ORDER BY 1
+                ) AS keywords
+                FROM sentiment_analysis_jobs WHERE id = $1
+            ) k
+            CROSS JOIN (VALUES ('hour'), ('day')) AS g(granularity)
+            ON CONFLICT (granularity, bucket, source, keywords) DO UPDATE SET
+                positive_sum = sentiment_rollups.positive_sum + EXCLUDED.positive_sum,
+                negative_sum = sentiment_rollups.negative_sum + EXCLUDED.negative_sum,
+                neutral_sum = sentiment_rollups.neutral_sum + EXCLUDED.neutral_sum,
+                compound_sum = sentiment_rollups.compound_sum + EXCLUDED.compound_sum,
+                confidence_sum = sentiment_rollups.confidence_sum + EXCLUDED.confidence_sum,
+                volume = sentiment_rollups.volume + EXCLUDED.volume
+        """, job_id, list(totals.keys()), *[list(column) for column in columns])
+    
+    # SentimentAnalysisRequest.time_range -> (롤업 단위, 조회 구간)
+    ROLLUP_TIME_RANGES = {
+        '1h': ('hour', timedelta(hours=1)),
+        '6h': ('hour', timedelta(hours=6)),
+        '12h': ('hour', timedelta(hours=12)),
+        '24h': ('hour', timedelta(hours=24)),
+        '7d': ('day', timedelta(days=7)),
+        '30d': ('day', timedelta(days=30)),
+    }
+    
+    @instrumented
+    async def get_sentiment_rollups(
+        self,
+        time_range: str = '24h',
+        keywords: Optional[List[str]] = None,
+        sources: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """롤업 기반 감정 집계 조회
+        
+        time_range 에 맞는 단위(시간/일)의 버킷만 읽으므로 조회 비용이 구간 길이와 무관하다.
+        버킷별·소스별 평균 점수와 volume 을 반환한다. 구간 시작은 버킷 경계로 내림된다.
+        keywords 를 지정하면 키워드 중 하나라도 포함한 작업의 결과를 각각 한 번씩 집계한다.
+        """
+        if time_range not in self.ROLLUP_TIME_RANGES:
+            raise ValueError(f"Unsupported time_range: {time_range}")
+        granularity, span = self.ROLLUP_TIME_RANGES[time_range]
+        
+        async with self.db.get_read_connection() as conn:
+            rows = await conn.fetch("""
+                SELECT bucket, source,
+                       SUM(positive_sum) / SUM(volume) AS positive_score,
+                       SUM(negative_sum) / SUM(volume) AS negative_score,
+                       SUM(neutral_sum) / SUM(volume) AS neutral_score,
+                       SUM(compound_sum) / SUM(volume) AS compound_score,
+                       SUM(confidence_sum) / SUM(volume) AS confidence,
+                       SUM(volume)::int AS volume
+                FROM sentiment_rollups
+                WHERE granularity = $1::text
+                  AND ($2::text[] IS NULL OR keywords && $2::text[])
+                  AND ($3::text[] IS NULL OR source = ANY($3::text[]))
+                  AND bucket >= date_trunc($1::text, (NOW() - $4::interval) AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'
+                GROUP BY bucket, source
+                HAVING SUM(volume) > 0
+                ORDER BY bucket, source
+            """, granularity, keywords or None, sources, span)
+            
+            return [dict(row) for row in rows]
+    
+    @staticmethod
+    def _weighted_sentiment(rows: List[Dict[str, Any]]) -> Tuple[Dict[str, float], int]:
+        """롤업 행들의 volume 가중 평균 점수 (SentimentScore 형식)"""
+        volume = sum(row['volume'] for row in rows)
+        if not volume:
+            return {'positive': 0.0, 'negative': 0.0, 'neutral': 0.0, 'compound': 0.0}, 0
+        return {
+            name: round(sum(row[f'{name}_score'] * row['volume'] for row in rows) / volume, 4)
+            for name in ('positive', 'negative', 'neutral', 'compound')
+        }, volume
     
-    async def save_sentiment_trends(self, job_id: str, trends: List[Dict[str, Any]]):
+    async def get_sentiment_summary(
+        self,
+        time_range: str = '24h',
+        keywords: Optional[List[str]] = None,
+        sources: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """롤업 기반 감정 요약 (SentimentAnalysisResponse 의 전체/소스별 점수와 트렌드 형식)"""
+        rollups = await self.get_sentiment_rollups(time_range, keywords, sources)
+        
+        by_source: Dict[str, List[Dict[str, Any]]] = {}
+        by_bucket: Dict[datetime, List[Dict[str, Any]]] = {}
+        for row in rollups:
+            by_source.setdefault(row['source'], []).append(row)
+            by_bucket.setdefault(row['bucket'], []).append(row)
+        
+        overall, volume = self._weighted_sentiment(rollups)
+        trend = []
+        for bucket, rows in sorted(by_bucket.items()):
+            scores, bucket_volume = self._weighted_sentiment(rows)
+            trend.append({
+                'time_bucket': bucket,
+                **{f'{name}_score': score for name, score in scores.items()},
+                'volume': bucket_volume
+            })
+        
+        return {
+            'volume': volume,
+            'overall_sentiment': overall,
+            'sentiment_by_source': {
+                source: self._weighted_sentiment(rows)[0] for source, rows in by_source.items()
+            },
+            'sentiment_trend': trend
+        }
+    
+    @instrumented
+    async def save_sentiment_trends(self, job_id: str, trends: List[Dict[str, Any]]) -> int:
         """감정 트렌드 저장"""
         async with self.db.get_transaction() as conn:
-            for trend in trends:
-                await conn.execute("""
-                    INSERT INTO sentiment_trends (
-                        job_id, time_bucket, positive_score, negative_score,
-                        neutral_score, compound_score, volume
-                    ) VALUES ($1, $2, $3, $4, $5, $6, $7)
-                    ON CONFLICT (job_id, time_bucket)
-                    DO UPDATE SET
-                        positive_score = EXCLUDED.positive_score,
-                        negative_score = EXCLUDED.negative_score,
-                        neutral_score = EXCLUDED.neutral_score,
-                        compound_score = EXCLUDED.compound_score,
-                        volume = EXCLUDED.volume
-                """,
-                    job_id, trend['time_bucket'], trend['positive_score'],
-                    trend['negative_score'], trend['neutral_score'],
-                    trend['compound_score'], trend['volume']
-                )
+            return await self.db.bulk_write(
+                conn, 'sentiment_trends',
+                ['job_id', 'time_bucket', 'positive_score', 'negative_score',
+                 'neutral_score', 'compound_score', 'volume'],
+                [
+                    (job_id, trend['time_bucket'], trend['positive_score'],
+                     trend['negative_score'], trend['neutral_score'],
+                     trend['compound_score'], trend['volume'])
+                    for trend in trends
+                ],
+                conflict_columns=['job_id', 'time_bucket'],
+                update_columns=['positive_score', 'negative_score',
+                                'neutral_score', 'compound_score', 'volume']
+            )
     
-    async def save_key_topics(self, job_id: str, topics: List[Dict[str, Any]]):
+    @instrumented
+    async def save_key_topics(self, job_id: str, topics: List[Dict[str, Any]]) -> int:
         """주요 토픽 저장"""
-        async with self.db.get_connection() as conn:
+        async with self.db.get_transaction() as conn:
             # 기존 토픽 삭제
             await conn.execute("DELETE FROM key_topics WHERE job_id = $1", job_id)
             
             # 새로운 토픽 저장
-            for topic in topics:
-                await conn.execute("""
-                    INSERT INTO key_topics (
-                        job_id, topic, relevance_score, frequency, sentiment_score
-                    ) VALUES ($1, $2, $3, $4, $5)
-                """,
-                    job_id, topic['topic'], topic['relevance_score'],
-                    topic['frequency'], topic['sentiment_score']
-                )
+            return await self.db.bulk_write(
+                conn, 'key_topics',
+                ['job_id', 'topic', 'relevance_score', 'frequency', 'sentiment_score'],
+                [
+                    (job_id, topic['topic'], topic['relevance_score'],
+                     topic['frequency'], topic['sentiment_score'])
+                    for topic in topics
+                ]
+            )
     
-    async def save_influential_posts(self, job_id: str, posts: List[Dict[str, Any]]):
+    @instrumented
+    async def save_influential_posts(self, job_id: str, posts: List[Dict[str, Any]]) -> int:
         """영향력 있는 게시물 저장"""
-        async with self.db.get_connection() as conn:
-            for post in posts:
-                await conn.execute("""
-                    INSERT INTO influential_posts (
-                        job_id, source, post_id, content, author,
-                        published_at, engagement_score, sentiment_score, influence_score
-                    ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
-                    ON CONFLICT (job_id, source, post_id) DO NOTHING
-                """,
-                    job_id, post['source'], post['post_id'], post['content'],
-                    post.get('author'), post.get('published_at'),
-                    post.get('engagement_score', 0), post['sentiment_score'],
-                    post['influence_score']
-                )
+        async with self.db.get_transaction() as conn:
+            return await self.db.bulk_write(
+                conn, 'influential_posts',
+                ['job_id', 'source', 'post_id', 'content', 'author',
+                 'published_at', 'engagement_score', 'sentiment_score', 'influence_score'],
+                [
+                    (job_id, post['source'], post['post_id'], post['content'],
+                     post.get('author'), post.get('published_at'),
+                     post.get('engagement_score', 0), post['sentiment_score'],
+                     post['influence_score'])
+                    for post in posts
+                ],
+                conflict_columns=['job_id', 'source', 'post_id']
+            )
 
 class MarketEventDataManager:
     """시장 이벤트 데이터 관리자"""
     
-    def __init__(self, db_manager: DatabaseManager):
+    EVENTS_CHANNEL = 'market_events_changed'
+    
+    def __init__(self, db_manager: DatabaseManager, cache_ttl: float = 30.0, cache_size: int = 32):
         self.db = db_manager
+        self._events_cache = TTLCache(max_size=cache_size, ttl=cache_ttl)
+        self._listening = False
+    
+    async def _ensure_listening(self):
+        if self._listening:
+            return
+        self._listening = True
+        try:
+            await self.db.listen(self.EVENTS_CHANNEL, self._on_events_changed)
+        except Exception as e:
+            logger.error(f"Failed to subscribe to {self.EVENTS_CHANNEL}: {e}")
     
+    def _on_events_changed(self, payload: Optional[str]):
+        self._events_cache.invalidate()
+    
+    @instrumented
     async def create_market_event(self, event_data: Dict[str, Any]) -> str:
         """시장 이벤트 생성"""
         async with self.db.get_transaction() as conn:
@@ -320,22 +1244,47 @@ class MarketEventDataManager:
             
             # 영향 저장
             if 'impacts' in event_data:
-                for impact in event_data['impacts']:
-                    await conn.execute("""
-                        INSERT INTO market_event_impacts (
-                            event_id, affected_entity, entity_type,
-                            impact_score, impact_description
-                        ) VALUES ($1, $2, $3, $4, $5)
-                    """,
-                        event_id, impact['affected_entity'], impact['entity_type'],
-                        impact['impact_score'], impact.get('impact_description')
-                    )
+                await self.db.bulk_write(
+                    conn, 'market_event_impacts',
+                    ['event_id', 'affected_entity', 'entity_type',
+                     'impact_score', 'impact_description'],
+                    [
+                        (event_id, impact['affected_entity'], impact['entity_type'],
+                         impact['impact_score'], impact.get('impact_description'))
+                        for impact in event_data['impacts']
+                    ]
+                )
             
-            return str(event_id)
+            await self.db.notify(conn, self.EVENTS_CHANNEL, str(event_id))
+        
+        # 커밋 직후 로컬 캐시 무효화 (다른 노드는 NOTIFY 로 무효화)
+        self._events_cache.invalidate()
+        return str(event_id)
     
+    @instrumented
     async def get_active_events(self, limit: int = 50) -> List[Dict[str, Any]]:
-        """활성 시장 이벤트 조회"""
-        async with self.db.get_connection() as conn:
+        """활성 시장 이벤트 조회
+        
+        결과는 limit 별로 캐시된다. 캐시에 저장할 결과는 복제 지연으로 무효화 이전 행이
+        다시 캐시되지 않도록 프라이머리에서 읽고, NOTIFY 구독이 끊겨 무효화를 보장할 수 없는
+        동안에는 캐시 없이 복제본에서 읽는다. 반환된 이벤트 dict 는 공유되므로 수정하지 않아야 한다.
+        """
+        await self._ensure_listening()
+        use_cache = self.db.listener_connected
+        if use_cache:
+            cached = self._events_cache.get(limit)
+            if cached is not None:
+                return list(cached)
+        
+        generation = self._events_cache.generation
+        events = await self._fetch_active_events(limit, primary=use_cache)
+        if use_cache:
+            self._events_cache.set(limit, events, generation=generation)
+        return list(events)
+    
+    async def _fetch_active_events(self, limit: int, primary: bool = False) -> List[Dict[str, Any]]:
+        connection = self.db.get_connection() if primary else self.db.get_read_connection()
+        async with connection as conn:
             events = await conn.fetch("""
                 SELECT me.*, 
                        COALESCE(
@@ -365,6 +1314,7 @@ class ExternalDataManager:
     def __init__(self, db_manager: DatabaseManager):
         self.db = db_manager
     
+    @instrumented
     async def register_data_source(self, source_data: Dict[str, Any]) -> str:
         """외부 데이터 소스 등록"""
         async with self.db.get_connection() as conn:
@@ -383,46 +1333,196 @@ class ExternalDataManager:
             
             return str(source_id)
     
-    async def save_external_data(self, source_id: str, data_entries: List[Dict[str, Any]]):
-        """외부 데이터 저장"""
+    @instrumented
+    async def get_active_sources(self, source_types: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """활성 외부 데이터 소스 목록 조회 (source_types 지정 시 해당 유형만)"""
+        async with self.db.get_read_connection() as conn:
+            rows = await conn.fetch("""
+                SELECT id, source_name, source_type, api_endpoint, update_frequency, data_format
+                FROM external_data_sources
+                WHERE is_active AND ($1::text[] IS NULL OR source_type = ANY($1::text[]))
+                ORDER BY source_name
+            """, source_types)
+            return [dict(row) for row in rows]
+    
+    EXTERNAL_DATA_COLUMNS = ['source_id', 'data_key', 'data_value', 'data_timestamp', 'quality_score']
+    EXTERNAL_DATA_CONFLICT = ['source_id', 'data_key', 'data_timestamp']
+    
+    def _external_data_records(self, source_id: str, data_entries: List[Dict[str, Any]]) -> List[tuple]:
+        """외부 데이터 엔트리를 COPY 레코드로 변환 (data_value 직렬화 포함)"""
+        return [
+            (source_id, entry['data_key'], json.dumps(entry['data_value']),
+             entry['data_timestamp'], entry.get('quality_score'))
+            for entry in data_entries
+        ]
+    
+    @instrumented
+    async def save_external_data(self, source_id: str, data_entries: List[Dict[str, Any]]) -> int:
+        """외부 데이터 저장 (삽입된 행 수 반환)"""
         async with self.db.get_transaction() as conn:
-            for entry in data_entries:
-                await conn.execute("""
-                    INSERT INTO external_data (
-                        source_id, data_key, data_value, data_timestamp, quality_score
-                    ) VALUES ($1, $2, $3, $4, $5)
-                    ON CONFLICT (source_id, data_key, data_timestamp) DO NOTHING
-                """,
-                    source_id, entry['data_key'], json.dumps(entry['data_value']),
-                    entry['data_timestamp'], entry.get('quality_score')
-                )
+            return await self.db.bulk_write(
+                conn, 'external_data', self.EXTERNAL_DATA_COLUMNS,
+                self._external_data_records(source_id, data_entries),
+                conflict_columns=self.EXTERNAL_DATA_CONFLICT
+            )
     
-    async def get_latest_data(self, source_name: str, data_key: str = None) -> List[Dict[str, Any]]:
-        """최신 외부 데이터 조회"""
-        async with self.db.get_connection() as conn:
-            if data_key:
-                data = await conn.fetch("""
-                    SELECT ed.* FROM external_data ed
-                    JOIN external_data_sources eds ON ed.source_id = eds.id
-                    WHERE eds.source_name = $1 AND ed.data_key = $2
-                    ORDER BY ed.data_timestamp DESC
-                    LIMIT 100
-                """, source_name, data_key)
-            else:
-                data = await conn.fetch("""
-                    SELECT ed.* FROM external_data ed
-                    JOIN external_data_sources eds ON ed.source_id = eds.id
-                    WHERE eds.source_name = $1
-                    ORDER BY ed.data_timestamp DESC
-                    LIMIT 100
-                """, source_name)
-            
+    async def ingest_external_data(
+        self,
+        source_id: str,
+        entries: AsyncIterator[Dict[str, Any]],
+        chunk_size: int = 1000,
+        on_progress: Optional[Callable[[Dict[str, int]], Any]] = None
+    ) -> Dict[str, int]:
+        """외부 데이터 스트리밍 적재
+        
+        비동기 이터레이터에서 chunk_size 만큼씩 모아 청크 단위 트랜잭션으로 커밋한다.
+        메모리에는 한 청크만 유지되며, 청크마다 on_progress(통계) 를 호출한다
+        (동기/비동기 콜백 모두 허용). ON CONFLICT DO NOTHING 으로 걸러진 행은
+        deduplicated 로 집계된다.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        
+        stats = {'received': 0, 'inserted': 0, 'deduplicated': 0, 'chunks': 0}
+        
+        async def flush(chunk: List[Dict[str, Any]]):
+            inserted = await self.save_external_data(source_id, chunk)
+            stats['received'] += len(chunk)
+            stats['inserted'] += inserted
+            stats['deduplicated'] += len(chunk) - inserted
+            stats['chunks'] += 1
+            if on_progress:
+                result = on_progress(dict(stats))
+                if asyncio.iscoroutine(result):
+                    await result
+        
+        chunk: List[Dict[str, Any]] = []
+        async for entry in entries:
+            chunk.append(entry)
+            if len(chunk) >= chunk_size:
+                await flush(chunk)
+                chunk = []
+        
+        if chunk:
+            await flush(chunk)
+        
+        logger.info(
+            f"External data ingest finished for source {source_id}: "
+            f"{stats['inserted']} inserted, {stats['deduplicated']} deduplicated "
+            f"in {stats['chunks']} chunks"
+        )
+        return stats
+    
+    def _external_data_query(
+        self,
+        source_name: str,
+        data_key: Optional[str] = None,
+        after: Optional[Tuple[datetime, str]] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        descending: bool = True,
+        limit: Optional[int] = None
+    ) -> Tuple[str, List[Any]]:
+        """(data_timestamp, id) 키셋 기준 외부 데이터 조회 쿼리 생성
+        
+        after 는 직전 페이지 마지막 행의 (data_timestamp, id) 로, 정렬 방향으로 그 다음 행부터 조회한다.
+        """
+        conditions = ["eds.source_name = $1"]
+        args: List[Any] = [source_name]
+        
+        def add(condition: str, *values):
+            placeholders = [f"${len(args) + i}" for i in range(1, len(values) + 1)]
+            conditions.append(condition.format(*placeholders))
+            args.extend(values)
+        
+        if data_key:
+            add("ed.data_key = {}", data_key)
+        if since:
+            add("ed.data_timestamp >= {}", since)
+        if until:
+            add("ed.data_timestamp < {}", until)
+        if after:
+            add("(ed.data_timestamp, ed.id) " + ("<" if descending else ">") + " ({}, {}::uuid)", *after)
+        
+        direction = "DESC" if descending else "ASC"
+        query = f"""
+            SELECT ed.* FROM external_data ed
+            JOIN external_data_sources eds ON ed.source_id = eds.id
+            WHERE {' AND '.join(conditions)}
+            ORDER BY ed.data_timestamp {direction}, ed.id {direction}
+        """
+        if limit is not None:
+            args.append(limit)
+            query += f" LIMIT ${len(args)}"
+        return query, args
+    
+    @instrumented
+    async def get_latest_data(
+        self,
+        source_name: str,
+        data_key: str = None,
+        limit: int = 100,
+        before: Optional[Tuple[datetime, str]] = None
+    ) -> List[Dict[str, Any]]:
+        """최신 외부 데이터 조회
+        
+        최신순으로 limit 건을 반환한다. 이전 페이지는 마지막 행의 (data_timestamp, id) 를
+        before 로 넘겨 조회한다 (OFFSET 미사용).
+        """
+        query, args = self._external_data_query(
+            source_name, data_key, after=before, descending=True, limit=limit
+        )
+        async with self.db.get_read_connection() as conn:
+            data = await conn.fetch(query, *args)
             return [dict(row) for row in data]
     
-    async def save_data_quality_metrics(self, source_id: str, metrics: Dict[str, float]):
+    async def stream_data(
+        self,
+        source_name: str,
+        data_key: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        descending: bool = False,
+        batch_size: int = 500
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """외부 데이터 스트리밍 조회 (서버 측 커서)
+        
+        batch_size 행씩 가져오므로 기간 길이와 무관하게 메모리 사용량이 일정하다.
+        기본은 시간순(오래된 것부터) 정렬이다.
+        """
+        query, args = self._external_data_query(
+            source_name, data_key, since=since, until=until, descending=descending
+        )
+        async with self.db.get_read_connection() as conn:
+            async with conn.transaction(readonly=True):
+                async for row in conn.cursor(query, *args, prefetch=batch_size):
+                    yield dict(row)
+    
+    @instrumented
+    async def get_series_batch(
+        self,
+        source_name: str,
+        data_keys: List[str],
+        since: datetime
+    ) -> List[Tuple[str, datetime, Any]]:
+        """여러 data_key 의 since 이후 시계열을 한 번에 조회 ((data_key, data_timestamp, 값) 목록)"""
+        async with self.db.get_read_connection() as conn:
+            rows = await conn.fetch("""
+                SELECT ed.data_key, ed.data_timestamp, ed.data_value
+                FROM external_data ed
+                JOIN external_data_sources eds ON ed.source_id = eds.id
+                WHERE eds.source_name = $1
+                  AND ed.data_key = ANY($2::text[])
+                  AND ed.data_timestamp >= $3
+                ORDER BY ed.data_key, ed.data_timestamp
+            """, source_name, data_keys, since)
+            return [(row[0], row[1], json.loads(row[2])) for row in rows]
+    
+    @instrumented
+    async def save_data_quality_metrics(self, source_id: str, metrics: Dict[str, float]) -> int:
         """데이터 품질 지표 저장"""
         async with self.db.get_connection() as conn:
-            await conn.execute("""
+            status = await conn.execute("""
                 INSERT INTO data_quality_metrics (
                     source_id, completeness, accuracy, consistency,
                     timeliness, validity, overall_score
@@ -432,6 +1532,7 @@ class ExternalDataManager:
                 metrics['consistency'], metrics['timeliness'], metrics['validity'],
                 metrics['overall_score']
             )
+            return int(status.split()[-1])
 
 class ABTestDataManager:
     """A/B 테스트 데이터 관리자"""
@@ -439,6 +1540,7 @@ class ABTestDataManager:
     def __init__(self, db_manager: DatabaseManager):
         self.db = db_manager
     
+    @instrumented
     async def create_ab_test(self, test_data: Dict[str, Any]) -> str:
         """A/B 테스트 생성"""
         async with self.db.get_connection() as conn:
@@ -457,18 +1559,21 @@ class ABTestDataManager:
             
             return str(test_id)
     
-    async def assign_participant(self, test_id: str, shipper_id: str, group_type: str):
+    @instrumented
+    async def assign_participant(self, test_id: str, shipper_id: str, group_type: str) -> int:
         """A/B 테스트 참가자 할당"""
         async with self.db.get_connection() as conn:
-            await conn.execute("""
+            status = await conn.execute("""
                 INSERT INTO ab_test_participants (test_id, shipper_id, group_type)
                 VALUES ($1, $2, $3)
                 ON CONFLICT (test_id, shipper_id) DO NOTHING
             """, test_id, shipper_id, group_type)
+            return int(status.split()[-1])
     
+    @instrumented
     async def get_test_results(self, test_id: str) -> Dict[str, Any]:
         """A/B 테스트 결과 조회"""
-        async with self.db.get_connection() as conn:
+        async with self.db.get_read_connection() as conn:
             test = await conn.fetchrow("""
                 SELECT * FROM ab_tests WHERE id = $1
             """, test_id)
@@ -9,6 +9,7 @@ CREATE TABLE prediction_jobs (
     shipper_id VARCHAR(255) NOT NULL,
     job_name VARCHAR(255) NOT NULL,
     model_type VARCHAR(50) NOT NULL,
+    model_version VARCHAR(50), -- 예측 서비스 밖 모델(예: 일괄 예측)의 결과 구분, 서비스 모델은 NULL
     status VARCHAR(50) NOT NULL DEFAULT 'pending',
     prediction_horizon INTEGER NOT NULL,
     confidence_level DECIMAL(3,2) NOT NULL,
@@ -16,13 +17,25 @@ CREATE TABLE prediction_jobs (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     completed_at TIMESTAMP WITH TIME ZONE,
     error_message TEXT,
+    -- 작업 큐 (워커 임대/재시도)
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    next_run_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    locked_by VARCHAR(255),
+    lease_expires_at TIMESTAMP WITH TIME ZONE,
     
     -- 인덱스
     INDEX idx_prediction_jobs_shipper_id (shipper_id),
+    INDEX idx_prediction_jobs_queue (status, next_run_at),
+    INDEX idx_prediction_jobs_lease (status, lease_expires_at),
     INDEX idx_prediction_jobs_status (status),
-    INDEX idx_prediction_jobs_created_at (created_at)
+    INDEX idx_prediction_jobs_created_at (created_at),
+    INDEX idx_prediction_jobs_job_name (job_name, created_at)
 );
 
+-- 예측 결과 캐시 항목 ('cached' 상태, 캐시 키(job_name)당 한 행)
+CREATE UNIQUE INDEX idx_prediction_jobs_cache_key ON prediction_jobs (job_name) WHERE status = 'cached';
+
 -- 예측 변수 테이블
 CREATE TABLE prediction_variables (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
@@ -164,6 +177,22 @@ CREATE TABLE sentiment_trends (
     UNIQUE INDEX idx_sentiment_trends_job_time (job_id, time_bucket)
 );
 
+-- 감정 롤업 테이블 (작업 키워드 집합/소스별 시간·일 단위 누적, 결과는 한 행에만 집계)
+CREATE TABLE sentiment_rollups (
+    granularity VARCHAR(10) NOT NULL, -- 'hour' or 'day'
+    bucket TIMESTAMP WITH TIME ZONE NOT NULL,
+    source VARCHAR(100) NOT NULL,
+    keywords TEXT[] NOT NULL, -- 정렬·중복 제거된 작업 키워드
+    positive_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    negative_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    neutral_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    compound_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    confidence_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    volume INTEGER NOT NULL DEFAULT 0,
+    
+    PRIMARY KEY (granularity, bucket, source, keywords)
+);
+
 -- 주요 토픽 테이블
 CREATE TABLE key_topics (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
@@ -196,7 +225,8 @@ CREATE TABLE influential_posts (
     -- 인덱스
     INDEX idx_influential_posts_job_id (job_id),
     INDEX idx_influential_posts_influence (influence_score DESC),
-    INDEX idx_influential_posts_published (published_at)
+    INDEX idx_influential_posts_published (published_at),
+    UNIQUE INDEX idx_influential_posts_unique (job_id, source, post_id)
 );
 
 -- ============= 시장 이벤트 관련 테이블 =============
@@ -274,6 +304,7 @@ CREATE TABLE external_data (
     INDEX idx_external_data_key (data_key),
     INDEX idx_external_data_timestamp (data_timestamp),
     INDEX idx_external_data_value USING GIN (data_value),
+    INDEX idx_external_data_source_keyset (source_id, data_timestamp DESC, id DESC),
     UNIQUE INDEX idx_external_data_unique (source_id, data_key, data_timestamp)
 );
 
@@ -400,6 +431,7 @@ CREATE VIEW prediction_performance_summary AS
 SELECT 
     pj.shipper_id,
     pj.model_type,
+    pj.model_version,
     COUNT(*) as total_predictions,
     AVG(pr.model_accuracy) as avg_accuracy,
     MIN(pr.model_accuracy) as min_accuracy,
@@ -408,7 +440,7 @@ SELECT
 FROM prediction_jobs pj
 JOIN prediction_results pr ON pj.id = pr.job_id
 WHERE pj.status = 'completed'
-GROUP BY pj.shipper_id, pj.model_type;
+GROUP BY pj.shipper_id, pj.model_type, pj.model_version;
 
 -- 감정 분석 트렌드 요약 뷰
 CREATE VIEW sentiment_trend_summary AS
@@ -530,4 +562,25 @@ $$ LANGUAGE plpgsql;
 CREATE TRIGGER trigger_calculate_data_quality_score
     BEFORE INSERT OR UPDATE ON data_quality_metrics
     FOR EACH ROW
-    EXECUTE FUNCTION calculate_data_quality_score();
\ No newline at end of file
+    EXECUTE FUNCTION calculate_data_quality_score();
+
+-- 감정 롤업 백필 (기존 sentiment_analysis_results 로 롤업 재구성, 여러 번 실행해도 같은 결과)
+-- 동시 저장이 롤업에 더하는 값과 겹치지 않도록 테이블을 잠근 뒤 전체를 다시 계산한다
+BEGIN;
+LOCK TABLE sentiment_rollups IN EXCLUSIVE MODE;
+DELETE FROM sentiment_rollups;
+INSERT INTO sentiment_rollups (
+    granularity, bucket, source, keywords, positive_sum, negative_sum,
+    neutral_sum, compound_sum, confidence_sum, volume
+)
+SELECT g.granularity,
+       date_trunc(g.granularity, sar.analyzed_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+       sar.source,
+       ARRAY(SELECT DISTINCT jsonb_array_elements_text(saj.keywords) ORDER BY 1),
+       SUM(sar.positive_score), SUM(sar.negative_score), SUM(sar.neutral_score),
+       SUM(sar.compound_score), SUM(sar.confidence), COUNT(*)
+FROM sentiment_analysis_results sar
+JOIN sentiment_analysis_jobs saj ON saj.id = sar.job_id
+CROSS JOIN (VALUES ('hour'), ('day')) AS g(granularity)
+GROUP BY 1, 2, 3, 4;
+COMMIT;
@@ -0,0 +1,191 @@
+"""
+얼굴 표정 인식 추론 백엔드
+EMOTION_BACKEND 설정으로 선택
+    - fer: FER 라이브러리 (MTCNN 얼굴 검출 + Keras 표정 분류기, TensorFlow 필요)
+    - opencv: OpenCV 얼굴 검출 (DNN 또는 Haar) + ONNX 표정 분류기 (export_emotion_model.py 로 생성)
+"""
+
+import os
+import threading
+from abc import ABC, abstractmethod
+
+import cv2
+import numpy as np
+
+# 표정 분류기 출력 순서 (FER 모델과 동일)
+EMOTION_LABELS = {
+    0: 'angry',
+    1: 'disgust',
+    2: 'fear',
+    3: 'happy',
+    4: 'sad',
+    5: 'surprise',
+    6: 'neutral'
+}
+
+# 분류기 입력 크기 (흑백, [-1, 1] 정규화)
+EMOTION_INPUT_SIZE = (64, 64)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+class EmotionBackend(ABC):
+    """추론 백엔드 인터페이스
+
+    find_faces 는 BGR 이미지에서 (x, y, w, h) 얼굴 박스 목록을, classify 는 전처리된 얼굴 텐서
+    (n, 64, 64, 1) 에 대해 EMOTION_LABELS 순서의 확률 (n, 7) 을 반환한다.
+    classify 는 추론 큐 스레드에서만 호출되고, find_faces 는 여러 요청 스레드에서 동시에 호출된다.
+    """
+
+    name = 'base'
+    description = ''
+
+    def load(self):
+        pass
+
+    @abstractmethod
+    def find_faces(self, image_np):
+        pass
+
+    @abstractmethod
+    def classify(self, faces):
+        pass
+
+class FERBackend(EmotionBackend):
+    """FER 라이브러리 백엔드 (기존 동작)"""
+
+    name = 'fer'
+
+    def __init__(self, mtcnn=True):
+        self.mtcnn = mtcnn
+        self.description = 'FER with MTCNN' if mtcnn else 'FER with Haar cascade'
+        self._fer = None
+
+    def load(self):
+        # TensorFlow 는 이 백엔드를 선택한 경우에만 임포트
+        from fer import FER
+        self._fer = FER(mtcnn=self.mtcnn)
+
+    def find_faces(self, image_np):
+        return self._fer.find_faces(image_np, bgr=True)
+
+    def classify(self, faces):
+        return np.asarray(self._fer._classify_emotions(faces))
+
+class OpenCVBackend(EmotionBackend):
+    """OpenCV 얼굴 검출 + ONNX 표정 분류기 경량 CPU 백엔드
+
+    face_model/face_config 가 주어지면 OpenCV DNN (SSD) 얼굴 검출기를, 없으면 OpenCV 에 포함된
+    Haar cascade 를 사용한다. 분류기는 onnxruntime 이 설치되어 있으면 onnxruntime 으로
+    (int8 양자화 모델 지원), 아니면 cv2.dnn 으로 실행한다.
+    """
+
+    name = 'opencv'
+
+    def __init__(self, classifier_path, face_model=None, face_config=None,
+                 face_confidence=0.5, min_face_size=50, runtime='auto', num_threads=1):
+        self.classifier_path = classifier_path
+        self.face_model = face_model
+        self.face_config = face_config
+        self.face_confidence = face_confidence
+        self.min_face_size = min_face_size
+        self.runtime = runtime
+        self.num_threads = num_threads
+        self.description = ''
+        self._session = None
+        self._net = None
+        self._input_name = None
+        # 검출기 객체는 스레드 안전하지 않으므로 요청 스레드마다 따로 생성
+        self._local = threading.local()
+
+    def load(self):
+        runtime = self.runtime
+        if runtime == 'auto':
+            try:
+                import onnxruntime  # noqa: F401
+                runtime = 'onnxruntime'
+            except ImportError:
+                runtime = 'opencv'
+
+        if runtime == 'onnxruntime':
+            import onnxruntime
+            options = onnxruntime.SessionOptions()
+            options.intra_op_num_threads = self.num_threads
+            options.inter_op_num_threads = 1
+            self._session = onnxruntime.InferenceSession(
+                self.classifier_path, options, providers=['CPUExecutionProvider']
+            )
+            self._input_name = self._session.get_inputs()[0].name
+        elif runtime == 'opencv':
+            self._net = cv2.dnn.readNetFromONNX(self.classifier_path)
+        else:
+            raise ValueError(f'Unknown classifier runtime: {runtime}')
+
+        self._face_detector()
+        detector_name = 'OpenCV DNN' if self.face_model else 'Haar cascade'
+        self.description = f'{detector_name} + ONNX classifier ({runtime})'
+
+    def _face_detector(self):
+        detector = getattr(self._local, 'detector', None)
+        if detector is None:
+            if self.face_model:
+                detector = cv2.dnn.readNet(self.face_model, self.face_config)
+            else:
+                detector = cv2.CascadeClassifier(
+                    cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+                )
+            self._local.detector = detector
+        return detector
+
+    def find_faces(self, image_np):
+        detector = self._face_detector()
+        if not self.face_model:
+            gray_img = cv2.cvtColor(image_np, cv2.COLOR_BGR2GRAY) if len(image_np.shape) == 3 else image_np
+            faces = detector.detectMultiScale(
+                gray_img,
+                scaleFactor=1.1,
+                minNeighbors=5,
+                flags=cv2.CASCADE_SCALE_IMAGE,
+                minSize=(self.min_face_size, self.min_face_size)
+            )
+            return [tuple(int(v) for v in face) for face in faces]
+
+        # SSD 얼굴 검출기 (res10_300x300) 입력/출력 형식
+        height, width = image_np.shape[:2]
+        if len(image_np.shape) == 2:
+            image_np = cv2.cvtColor(image_np, cv2.COLOR_GRAY2BGR)
+        blob = cv2.dnn.blobFromImage(image_np, 1.0, (300, 300), (104.0, 177.0, 123.0))
+        detector.setInput(blob)
+        detections = detector.forward()[0, 0]
+
+        faces = []
+        for detection in detections[detections[:, 2] >= self.face_confidence]:
+            x1, y1, x2, y2 = (detection[3:7] * [width, height, width, height]).astype(int)
+            if x2 - x1 >= self.min_face_size and y2 - y1 >= self.min_face_size:
+                faces.append((int(x1), int(y1), int(x2 - x1), int(y2 - y1)))
+        return faces
+
+    def classify(self, faces):
+        faces = np.ascontiguousarray(faces, dtype=np.float32)
+        if self._session is not None:
+            return self._session.run(None, {self._input_name: faces})[0]
+        self._net.setInput(faces)
+        return self._net.forward()
+
+def create_backend(name=None):
+    """설정(환경 변수)에 따라 추론 백엔드 생성 (모델 로드는 load() 에서)"""
+    name = name or os.getenv('EMOTION_BACKEND', 'fer')
+    if name == 'fer':
+        return FERBackend(mtcnn=os.getenv('EMOTION_FER_MTCNN', 'true').lower() == 'true')
+    if name == 'opencv':
+        return OpenCVBackend(
+            classifier_path=os.getenv(
+                'EMOTION_CLASSIFIER_MODEL', os.path.join(BASE_DIR, 'emotion_model.int8.onnx')
+            ),
+            face_model=os.getenv('EMOTION_FACE_MODEL') or None,
+            face_config=os.getenv('EMOTION_FACE_CONFIG') or None,
+            face_confidence=float(os.getenv('EMOTION_FACE_CONFIDENCE', '0.5')),
+            min_face_size=int(os.getenv('EMOTION_MIN_FACE_SIZE', '50')),
+            runtime=os.getenv('EMOTION_CLASSIFIER_RUNTIME', 'auto'),
+            num_threads=int(os.getenv('EMOTION_ONNX_THREADS', '1'))
+        )
+    raise ValueError(f'Unknown emotion backend: {name}')
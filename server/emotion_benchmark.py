@@ -0,0 +1,303 @@
+"""
+얼굴 표정 인식 서버 벤치마크
+파이프라인 단계별 시간, 동시 요청 처리량/지연 백분위, 첫 추론까지 시작 시간, 최대 RSS 를 측정해 JSON 으로 출력
+
+    python emotion_benchmark.py --output bench.json
+    python emotion_benchmark.py --images ./samples --resolutions 640x480,1280x720 --concurrency 1,4,16
+    python emotion_benchmark.py --url http://localhost:5000   # 실행 중인 서버 대상 동시성 측정
+"""
+
+import argparse
+import base64
+import glob
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from io import BytesIO
+
+import cv2
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def percentiles(samples_ms):
+    """지연 시간 요약 (ms)"""
+    if not samples_ms:
+        return {}
+    ordered = sorted(samples_ms)
+
+    def pick(q):
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+
+    return {
+        'count': len(ordered),
+        'mean': round(statistics.fmean(ordered), 3),
+        'min': round(ordered[0], 3),
+        'p50': pick(0.50),
+        'p90': pick(0.90),
+        'p99': pick(0.99),
+        'max': round(ordered[-1], 3)
+    }
+
+def synthetic_face(width, height, seed=0):
+    """정면 얼굴 형태를 그린 합성 이미지 (BGR)"""
+    rng = np.random.default_rng(seed)
+    image = (rng.normal(90, 20, (height, width, 3))).clip(0, 255).astype(np.uint8)
+    cx, cy = width // 2, height // 2
+    size = min(width, height) // 3
+    cv2.ellipse(image, (cx, cy), (int(size * 0.8), size), 0, 0, 360, (150, 180, 220), -1)
+    for dx in (-1, 1):
+        eye = (cx + dx * size // 3, cy - size // 4)
+        cv2.ellipse(image, eye, (size // 7, size // 12), 0, 0, 360, (255, 255, 255), -1)
+        cv2.circle(image, eye, size // 16, (40, 30, 20), -1)
+        cv2.line(image, (eye[0] - size // 7, eye[1] - size // 6), (eye[0] + size // 7, eye[1] - size // 5), (60, 50, 40), 3)
+    cv2.line(image, (cx, cy - size // 10), (cx - size // 12, cy + size // 6), (120, 140, 180), 2)
+    cv2.ellipse(image, (cx, cy + size // 2), (size // 3, size // 8), 0, 0, 180, (80, 80, 160), 3)
+    return cv2.GaussianBlur(image, (3, 3), 0)
+
+def load_images(image_dir, resolutions):
+    """(이름, BGR 이미지) 목록: 해상도별 합성 얼굴 + 샘플 디렉터리 이미지 (해상도별로 리사이즈)"""
+    images = [(f"synthetic_{w}x{h}", synthetic_face(w, h)) for w, h in resolutions]
+    if image_dir:
+        for path in sorted(glob.glob(os.path.join(image_dir, '*'))):
+            image = cv2.imread(path, cv2.IMREAD_COLOR)
+            if image is None:
+                continue
+            name = os.path.splitext(os.path.basename(path))[0]
+            for w, h in resolutions:
+                images.append((f"{name}_{w}x{h}", cv2.resize(image, (w, h), interpolation=cv2.INTER_AREA)))
+    return images
+
+def timed(fn, repeat):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return result, percentiles(samples)
+
+def benchmark_stages(ed, name, image, repeat):
+    """단계별 시간: 기존 base64/PIL 경로, imdecode 경로, 얼굴 검출, 전처리, 분류"""
+    jpeg = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes()
+    encoded = base64.b64encode(jpeg).decode()
+    stages = {}
+
+    image_bytes, stages['base64_decode'] = timed(lambda: base64.b64decode(encoded), repeat)
+    try:
+        from PIL import Image
+        pil_image, stages['pil_open'] = timed(lambda: Image.open(BytesIO(image_bytes)).convert('RGB'), repeat)
+        rgb, stages['numpy_array'] = timed(lambda: np.array(pil_image), repeat)
+        _, stages['cvt_color'] = timed(lambda: cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR), repeat)
+    except ImportError:
+        pass
+    bgr, stages['imdecode'] = timed(lambda: ed.decode_image_bytes(image_bytes), repeat)
+
+    faces, stages['detect'] = timed(lambda: ed.detector.find_faces(bgr), repeat)
+    gray = ed.to_gray(bgr)
+    height, width = gray.shape[:2]
+    # 얼굴이 검출되지 않으면 중앙 정사각형으로 전처리/분류 비용 측정
+    box = tuple(faces[0]) if len(faces) else (width // 2 - height // 4, height // 4, height // 2, height // 2)
+    face, stages['preprocess'] = timed(lambda: ed.crop_face(gray, box), repeat)
+
+    batch = face[np.newaxis]
+    _, stages['classify'] = timed(lambda: ed.detector.classify(batch), repeat)
+    for batch_size in (8, 32):
+        stacked = np.repeat(batch, batch_size, axis=0)
+        _, summary = timed(lambda: ed.detector.classify(stacked), max(1, repeat // 4))
+        summary['per_face_mean'] = round(summary['mean'] / batch_size, 3)
+        stages[f'classify_batch_{batch_size}'] = summary
+
+    return {
+        'image': name,
+        'resolution': f"{width}x{height}",
+        'jpeg_bytes': len(jpeg),
+        'base64_bytes': len(encoded),
+        'faces_detected': len(faces),
+        'stages': stages
+    }
+
+def check_payloads(send, names, payloads):
+    """부하 측정 전 이미지별로 한 번 요청해 200 + emotion 응답인지 확인
+
+    (확인 결과, 통과한 payload 목록) 반환. 얼굴이 검출되지 않는 이미지는 400 경로만 측정하게
+    되므로 부하 측정에서 제외한다.
+    """
+    results = {}
+    valid = []
+    for name, payload in zip(names, payloads):
+        status, body = send(payload)
+        try:
+            emotion = json.loads(body).get('emotion')
+        except (ValueError, AttributeError):
+            emotion = None
+        results[name] = {'status': status, 'emotion': emotion}
+        if status == 200 and emotion:
+            valid.append(payload)
+    return results, valid
+
+def run_load(send, payloads, concurrency, requests):
+    """동시 요청 부하 (send(payload) -> (HTTP 상태 코드, 본문))
+
+    latency_ms 는 200 응답만, error_latency_ms 는 그 외 응답의 지연을 집계한다.
+    """
+    def one(i):
+        start = time.perf_counter()
+        status, _ = send(payloads[i % len(payloads)])
+        return status, (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(one, range(requests)))
+    elapsed = time.perf_counter() - start
+
+    statuses = {}
+    for status, _ in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return {
+        'concurrency': concurrency,
+        'requests': requests,
+        'elapsed_seconds': round(elapsed, 3),
+        'throughput_rps': round(requests / elapsed, 2),
+        'status_codes': statuses,
+        'latency_ms': percentiles([latency for status, latency in results if status == 200]),
+        'error_latency_ms': percentiles([latency for status, latency in results if status != 200])
+    }
+
+def in_process_sender(ed):
+    client = ed.app.test_client()
+
+    def send(payload):
+        response = client.post('/api/analyze-emotion', data=payload, content_type='image/jpeg')
+        return response.status_code, response.get_data()
+
+    return send
+
+def http_sender(url):
+    endpoint = url.rstrip('/') + '/api/analyze-emotion'
+
+    def send(payload):
+        request = urllib.request.Request(endpoint, data=payload, headers={'Content-Type': 'image/jpeg'})
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+    return send
+
+STARTUP_SCRIPT = """
+import json, os, resource, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {base_dir!r})
+import emotion_detection as ed
+imported = time.perf_counter()
+ed.load_models()
+ready = time.perf_counter()
+print(json.dumps({{
+    'import_seconds': round(imported - start, 3),
+    'load_and_warmup_seconds': round(ready - imported, 3),
+    'time_to_first_inference_seconds': round(ready - start, 3),
+    'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+}}))
+"""
+
+def measure_startup():
+    """새 프로세스에서 임포트부터 워밍업 추론 완료까지 시간과 최대 RSS"""
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-c', STARTUP_SCRIPT.format(base_dir=BASE_DIR)],
+        capture_output=True, text=True, env=os.environ.copy()
+    )
+    wall = time.perf_counter() - start
+    if completed.returncode != 0:
+        return {'error': completed.stderr.strip().splitlines()[-1:] or ['startup failed']}
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result['process_wall_seconds'] = round(wall, 3)
+    return result
+
+def parse_resolutions(value):
+    return [tuple(int(part) for part in item.lower().split('x')) for item in value.split(',') if item]
+
+def main():
+    parser = argparse.ArgumentParser(description='Emotion detection benchmark')
+    parser.add_argument('--images', help='샘플 얼굴 이미지 디렉터리 (jpg/png)')
+    parser.add_argument('--resolutions', default='320x240,640x480,1280x720')
+    parser.add_argument('--repeat', type=int, default=20, help='단계별 반복 횟수')
+    parser.add_argument('--concurrency', default='1,4,16', help='동시성 수준 목록')
+    parser.add_argument('--requests', type=int, default=100, help='동시성 수준별 요청 수')
+    parser.add_argument('--url', help='실행 중인 서버 주소 (지정 시 HTTP 로 동시성 측정)')
+    parser.add_argument('--with-cache', action='store_true', help='perceptual hash 결과 캐시 사용')
+    parser.add_argument('--skip-startup', action='store_true', help='시작 시간 측정 생략')
+    parser.add_argument('--output', help='결과 JSON 파일 경로 (미지정 시 stdout)')
+    args = parser.parse_args()
+
+    if not args.with_cache:
+        os.environ['EMOTION_CACHE_SIZE'] = '0'
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'backend': os.getenv('EMOTION_BACKEND', 'fer'),
+            'opencv': cv2.__version__,
+            'numpy': np.__version__,
+            'cache': args.with_cache,
+            'args': vars(args)
+        }
+    }
+
+    if not args.skip_startup:
+        report['startup'] = measure_startup()
+
+    resolutions = parse_resolutions(args.resolutions)
+    images = load_images(args.images, resolutions)
+    payloads = [cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes() for _, image in images]
+
+    if args.url:
+        send = http_sender(args.url)
+    else:
+        sys.path.insert(0, BASE_DIR)
+        import emotion_detection as ed
+        ed.load_models()
+        report['meta']['model'] = ed.detector.description
+        report['stages'] = [benchmark_stages(ed, name, image, args.repeat) for name, image in images]
+        send = in_process_sender(ed)
+
+    report['fixture_check'], valid_payloads = check_payloads(send, [name for name, _ in images], payloads)
+    failed = [
+        name for name, result in report['fixture_check'].items()
+        if result['status'] != 200 or not result['emotion']
+    ]
+    if failed:
+        print(f"⚠️ No emotion detected, excluded from load test: {', '.join(failed)}", file=sys.stderr)
+    if not valid_payloads:
+        sys.exit('❌ No benchmark image returned 200 with an emotion; check the backend or pass --images')
+
+    report['concurrency'] = [
+        run_load(send, valid_payloads, int(level), args.requests)
+        for level in args.concurrency.split(',') if level
+    ]
+    report['peak_rss_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f"✅ Benchmark written to {args.output}")
+    else:
+        print(output)
+
+if __name__ == '__main__':
+    main()
@@ -1,22 +1,53 @@
 """
 얼굴 표정 인식 서버
-FER (Facial Expression Recognition) 라이브러리 사용
+FER (Facial Expression Recognition) 라이브러리 또는 경량 OpenCV/ONNX 백엔드 사용 (emotion_backends.py)
 """
 
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 import cv2
 import numpy as np
-from fer import FER
+import argparse
+import asyncio
 import base64
-from io import BytesIO
-from PIL import Image
+import functools
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from emotion_backends import EMOTION_INPUT_SIZE, EMOTION_LABELS, create_backend
 
 app = Flask(__name__)
 CORS(app)  # CORS 허용
 
-# FER 감정 인식 모델 초기화
-detector = FER(mtcnn=True)
+# 감정 인식 추론 백엔드 (load_models() 에서 프로세스마다 한 번 로드)
+detector = None
+model_ready = threading.Event()
+model_state = {'status': 'not_loaded', 'error': None, 'load_seconds': None}
+_model_lock = threading.Lock()
+
+# 서빙 설정 (동시 처리 수, 대기열 초과 시 503)
+MAX_CONCURRENCY = int(os.getenv('EMOTION_MAX_CONCURRENCY', '8'))
+MAX_QUEUE_DEPTH = int(os.getenv('EMOTION_MAX_QUEUE_DEPTH', '32'))
+
+# 마이크로배치 설정
+MAX_BATCH_SIZE = int(os.getenv('EMOTION_MAX_BATCH_SIZE', '32'))
+MAX_BATCH_WAIT_MS = float(os.getenv('EMOTION_MAX_BATCH_WAIT_MS', '5'))
+MAX_FRAMES_PER_REQUEST = int(os.getenv('EMOTION_MAX_FRAMES_PER_REQUEST', '64'))
+
+# 얼굴 perceptual hash 결과 캐시 설정 (크기 0 이면 비활성)
+CACHE_SIZE = int(os.getenv('EMOTION_CACHE_SIZE', '512'))
+CACHE_MAX_DISTANCE = int(os.getenv('EMOTION_CACHE_MAX_DISTANCE', '4'))
+CACHE_TTL = float(os.getenv('EMOTION_CACHE_TTL', '10'))
+
+# 분류기 입력 전처리 (FER.detect_emotions 와 동일)
+FACE_OFFSETS = (10, 10)
+FACE_PADDING = 40
 
 # 감정 매핑 (영어 -> 한국어)
 EMOTION_MAP_KO = {
@@ -40,13 +71,558 @@ EMOTION_CATEGORY = {
     'disgust': 'negative'
 }
 
+class InferenceBatcher:
+    """동시 요청의 얼굴 이미지를 마이크로배치로 묶어 분류하는 추론 큐
+    
+    요청 스레드는 전처리된 얼굴 텐서를 제출하고 결과를 기다린다. 전용 스레드가 첫 항목을
+    받은 뒤 max_wait_ms 동안 (또는 max_batch_size 가 찰 때까지) 모은 얼굴들을 한 번의
+    분류기 호출로 처리하고 결과를 요청별로 나눠 돌려준다.
+    """
+    
+    def __init__(self, classify, max_batch_size=32, max_wait_ms=5.0):
+        self.classify = classify
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.stats = {'batches': 0, 'faces': 0, 'requests': 0, 'max_batch': 0}
+    
+    def predict(self, faces, timeout=None):
+        """얼굴 텐서 (n, h, w, 1) 분류 결과 (n, 7) 반환"""
+        future = Future()
+        self._ensure_started()
+        self._queue.put((faces, future))
+        return future.result(timeout)
+    
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name='emotion-batcher', daemon=True)
+                    self._thread.start()
+    
+    def _collect(self):
+        batch = [self._queue.get()]
+        size = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch, size
+    
+    def _run(self):
+        while True:
+            batch, size = self._collect()
+            try:
+                predictions = np.asarray(self.classify(np.concatenate([faces for faces, _ in batch])))
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            
+            offset = 0
+            for faces, future in batch:
+                future.set_result(predictions[offset:offset + len(faces)])
+                offset += len(faces)
+            
+            self.stats['batches'] += 1
+            self.stats['faces'] += size
+            self.stats['requests'] += len(batch)
+            self.stats['max_batch'] = max(self.stats['max_batch'], size)
+
+def classify_batch(faces):
+    return detector.classify(faces)
+
+inference_batcher = InferenceBatcher(classify_batch, MAX_BATCH_SIZE, MAX_BATCH_WAIT_MS)
+
+def load_models():
+    """감정 인식 모델 로드 및 워밍업 추론 (프로세스당 한 번, 완료 후 model_ready 설정)
+    
+    TensorFlow 는 fork 이후 안전하지 않으므로 모듈 임포트 시점이 아니라 워커 프로세스가
+    시작된 뒤에 호출한다.
+    """
+    global detector
+    with _model_lock:
+        if model_ready.is_set():
+            return
+        model_state['status'] = 'loading'
+        start = time.monotonic()
+        try:
+            backend = create_backend()
+            backend.load()
+            detector = backend
+            detector.find_faces(np.zeros((240, 320, 3), dtype=np.uint8))
+            inference_batcher.predict(np.zeros((1, *EMOTION_INPUT_SIZE, 1), dtype=np.float32))
+        except Exception as e:
+            model_state.update(status='failed', error=str(e))
+            print(f"Model load error: {str(e)}")
+            raise
+        model_state.update(status='ready', error=None, load_seconds=round(time.monotonic() - start, 3))
+        model_ready.set()
+
+def start_model_loading():
+    """백그라운드 스레드에서 모델 로드 시작 (로드 중에도 /api/health 응답 가능)"""
+    thread = threading.Thread(target=load_models, name='emotion-model-loader', daemon=True)
+    thread.start()
+    return thread
+
+# 요청 본문을 그대로 이미지로 받는 Content-Type
+RAW_IMAGE_TYPES = ('image/jpeg', 'image/png', 'image/webp', 'application/octet-stream')
+
+def decode_image_bytes(image_bytes):
+    """인코딩된 이미지 바이트를 복사 없이 cv2.imdecode 로 BGR numpy 배열로 변환"""
+    buffer = np.frombuffer(memoryview(image_bytes), dtype=np.uint8)
+    image_np = cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+    if image_np is None:
+        raise ValueError('Invalid image data')
+    return image_np
+
+def decode_base64_image(image_data):
+    """base64 (data URL 허용) 이미지를 BGR numpy 배열로 변환"""
+    image_data = image_data.split(',')[1] if ',' in image_data else image_data
+    return decode_image_bytes(base64.b64decode(image_data))
+
+def read_request_images(json_field, file_field):
+    """요청에서 이미지 목록 추출 (원본 바이너리 본문, multipart 파일, base64 JSON 순)"""
+    if request.mimetype in RAW_IMAGE_TYPES:
+        body = request.get_data(cache=False)
+        return [decode_image_bytes(body)] if body else []
+    
+    if request.mimetype == 'multipart/form-data':
+        return [decode_image_bytes(upload.read()) for upload in request.files.getlist(file_field)]
+    
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        raise ValueError('JSON body must be an object')
+    images = data.get(json_field) or []
+    if isinstance(images, str):
+        images = [images]
+    if not isinstance(images, list) or not all(isinstance(image, str) for image in images):
+        raise ValueError(f'{json_field} must be a base64 string or a list of base64 strings')
+    return [decode_base64_image(image_data) for image_data in images]
+
+def to_gray(image_np):
+    if len(image_np.shape) == 3:
+        return cv2.cvtColor(image_np, cv2.COLOR_BGR2GRAY)
+    return image_np
+
+def to_square(box):
+    """짧은 변을 늘려 정사각형 박스로 변환 (FER.tosquare 와 동일)"""
+    x, y, w, h = box
+    if h > w:
+        diff = h - w
+        x -= diff // 2
+        w += diff
+    elif w > h:
+        diff = w - h
+        y -= diff // 2
+        h += diff
+    return x, y, w, h
+
+def crop_face(gray_img, box):
+    """얼굴 영역을 분류기 입력 텐서 (h, w, 1) 로 전처리
+    
+    FER 처럼 이미지 전체를 패딩하지 않고 잘라낸 영역에만 같은 값으로 테두리를 채운다.
+    """
+    height, width = gray_img.shape[:2]
+    x, y, w, h = to_square(box)
+    x1 = max(x - FACE_OFFSETS[0], -FACE_PADDING)
+    y1 = max(y - FACE_OFFSETS[1], -FACE_PADDING)
+    x2 = min(x + w + FACE_OFFSETS[0], width + FACE_PADDING)
+    y2 = min(y + h + FACE_OFFSETS[1], height + FACE_PADDING)
+    
+    if x2 <= x1 or y2 <= y1:
+        return None
+    
+    gray_face = gray_img[max(y1, 0):max(y2, 0), max(x1, 0):max(x2, 0)]
+    top, left = max(0, -y1), max(0, -x1)
+    bottom, right = max(0, y2 - height), max(0, x2 - width)
+    if gray_face.size == 0:
+        # 패딩 영역에만 걸친 박스는 FER 와 같이 채움 값만으로 된 얼굴
+        fill = cv2.mean(gray_img[height - 2:height, :])[0]
+        gray_face = np.full((y2 - y1, x2 - x1), np.rint(fill), dtype=gray_img.dtype)
+    elif top or bottom or left or right:
+        fill = cv2.mean(gray_img[height - 2:height, :])[0]
+        gray_face = cv2.copyMakeBorder(
+            gray_face, top, bottom, left, right, cv2.BORDER_CONSTANT, value=fill
+        )
+    
+    gray_face = cv2.resize(gray_face, EMOTION_INPUT_SIZE).astype('float32')
+    gray_face = (gray_face / 255.0 - 0.5) * 2.0
+    return gray_face[..., np.newaxis]
+
+def find_first_face(image_np, gray_img=None):
+    """첫 번째 얼굴의 (박스, 분류기 입력 텐서) 반환 (얼굴이 없으면 (None, None))"""
+    face_rectangles = detector.find_faces(image_np)
+    if not len(face_rectangles):
+        return None, None
+    
+    gray_img = to_gray(image_np) if gray_img is None else gray_img
+    for face_coordinates in face_rectangles:
+        face = crop_face(gray_img, face_coordinates)
+        if face is not None:
+            return tuple(int(v) for v in face_coordinates), face
+    return None, None
+
+def extract_face(image_np):
+    """첫 번째 얼굴을 찾아 분류기 입력 텐서 (h, w, 1) 로 전처리 (얼굴이 없으면 None)"""
+    return find_first_face(image_np)[1]
+
+class PerceptualHashCache:
+    """얼굴 영역 perceptual hash (dHash) 기반 감정 점수 LRU 캐시
+    
+    해밍 거리가 max_distance 이하인 해시를 같은 얼굴 상태로 보고, ttl 이내의 캐시된 감정 점수를
+    재사용한다. 미스 시 측정한 분류 비용으로 적중으로 절약된 시간을 추정한다.
+    """
+    
+    def __init__(self, max_size=512, max_distance=4, ttl=10.0):
+        self.max_size = max_size
+        self.max_distance = max_distance
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._miss_cost_ms = None
+        self.stats = {'hits': 0, 'misses': 0, 'saved_ms': 0.0}
+    
+    @staticmethod
+    def hash_face(face):
+        """전처리된 얼굴 텐서의 64비트 dHash (9x8 축소 후 가로 인접 픽셀 밝기 비교)"""
+        small = cv2.resize(face[..., 0], (9, 8), interpolation=cv2.INTER_AREA)
+        bits = (small[:, 1:] > small[:, :-1]).flatten()
+        return int(np.packbits(bits).view('>u8')[0])
+    
+    def get(self, face_hash):
+        with self._lock:
+            now = time.monotonic()
+            key = face_hash if face_hash in self._entries else None
+            if key is None and self.max_distance > 0:
+                for candidate in reversed(self._entries):
+                    if bin(candidate ^ face_hash).count('1') <= self.max_distance:
+                        key = candidate
+                        break
+            
+            if key is not None:
+                emotions, stored_at = self._entries[key]
+                if now - stored_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    self.stats['saved_ms'] += self._miss_cost_ms or 0.0
+                    return emotions
+                del self._entries[key]
+            
+            self.stats['misses'] += 1
+            return None
+    
+    def put(self, face_hash, emotions, cost_ms):
+        with self._lock:
+            self._entries[face_hash] = (emotions, time.monotonic())
+            self._entries.move_to_end(face_hash)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            # 분류 비용 지수 이동 평균
+            if self._miss_cost_ms is None:
+                self._miss_cost_ms = cost_ms
+            else:
+                self._miss_cost_ms = 0.9 * self._miss_cost_ms + 0.1 * cost_ms
+    
+    def snapshot(self):
+        lookups = self.stats['hits'] + self.stats['misses']
+        return {
+            'hits': self.stats['hits'],
+            'misses': self.stats['misses'],
+            'hit_ratio': round(self.stats['hits'] / lookups, 4) if lookups else 0.0,
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'max_distance': self.max_distance,
+            'ttl': self.ttl,
+            'avg_miss_ms': round(self._miss_cost_ms, 3) if self._miss_cost_ms is not None else None,
+            'estimated_saved_ms': round(self.stats['saved_ms'], 3)
+        }
+
+emotion_cache = PerceptualHashCache(CACHE_SIZE, CACHE_MAX_DISTANCE, CACHE_TTL) if CACHE_SIZE > 0 else None
+
+def predict_emotions(faces):
+    """전처리된 얼굴 목록을 추론 큐로 분류해 감정 점수 dict 목록 반환"""
+    predictions = inference_batcher.predict(np.stack(faces))
+    return [
+        {EMOTION_LABELS[idx]: round(float(score), 2) for idx, score in enumerate(scores)}
+        for scores in predictions
+    ]
+
+def classify_faces(faces):
+    """캐시를 거쳐 얼굴 감정 점수 dict 목록 반환 (캐시 미스만 분류)"""
+    if emotion_cache is None:
+        return predict_emotions(faces)
+    
+    hashes = [PerceptualHashCache.hash_face(face) for face in faces]
+    results = [emotion_cache.get(face_hash) for face_hash in hashes]
+    missing = [i for i, emotions in enumerate(results) if emotions is None]
+    if missing:
+        start = time.perf_counter()
+        predicted = predict_emotions([faces[i] for i in missing])
+        cost_ms = (time.perf_counter() - start) * 1000 / len(missing)
+        for i, emotions in zip(missing, predicted):
+            emotion_cache.put(hashes[i], emotions, cost_ms)
+            results[i] = emotions
+    return results
+
+def build_emotion_result(emotions):
+    """감정 점수로 API 응답 본문 구성"""
+    # 주요 감정 찾기
+    dominant_emotion = max(emotions, key=emotions.get)
+    dominant_score = emotions[dominant_emotion]
+    
+    # 카테고리 분류 (긍정/중립/부정)
+    category = EMOTION_CATEGORY.get(dominant_emotion, 'neutral')
+    
+    # 긍정/부정 점수 계산
+    positive_score = emotions.get('happy', 0) + emotions.get('surprise', 0)
+    negative_score = emotions.get('sad', 0) + emotions.get('angry', 0) + \
+                    emotions.get('fear', 0) + emotions.get('disgust', 0)
+    neutral_score = emotions.get('neutral', 0)
+    
+    # 정규화된 얼굴 표정 점수 (0-1)
+    # 긍정적일수록 1에 가까움
+    facial_score = (positive_score - negative_score + 1) / 2
+    facial_score = max(0, min(1, facial_score))  # 0-1 범위로 제한
+    
+    # 신뢰도 계산
+    confidence = dominant_score
+    
+    # 한국어 감정 레이블
+    emotions_ko = {EMOTION_MAP_KO[k]: v for k, v in emotions.items()}
+    
+    return {
+        'success': True,
+        'emotion': category,
+        'confidence': float(confidence),
+        'facial_score': float(facial_score),
+        'details': {
+            'dominant_emotion': dominant_emotion,
+            'dominant_emotion_ko': EMOTION_MAP_KO[dominant_emotion],
+            'dominant_score': float(dominant_score),
+            'all_emotions': emotions,
+            'all_emotions_ko': emotions_ko,
+            'positive_score': float(positive_score),
+            'negative_score': float(negative_score),
+            'neutral_score': float(neutral_score)
+        },
+        'analysis': generate_analysis(category, facial_score, dominant_emotion)
+    }
+
+NO_FACE_RESPONSE = {
+    'error': 'No face detected',
+    'message': '얼굴이 감지되지 않았습니다. 카메라를 정면으로 향해주세요.'
+}
+
+# ============= 영상 세션 모드 =============
+
+SESSION_TTL = float(os.getenv('EMOTION_SESSION_TTL', '300'))
+SESSION_MAX_COUNT = int(os.getenv('EMOTION_SESSION_MAX_COUNT', '1000'))
+SESSION_REDETECT_INTERVAL = int(os.getenv('EMOTION_SESSION_REDETECT_INTERVAL', '10'))
+SESSION_DUPLICATE_THRESHOLD = float(os.getenv('EMOTION_SESSION_DUPLICATE_THRESHOLD', '2.0'))
+SESSION_SMOOTHING = float(os.getenv('EMOTION_SESSION_SMOOTHING', '0.4'))
+SESSION_THUMBNAIL_SIZE = (32, 32)
+
+class FaceTracker:
+    """템플릿 매칭 기반 경량 얼굴 추적기
+    
+    직전 얼굴 영역을 템플릿으로 두고 주변 탐색 영역에서 가장 비슷한 위치를 찾는다.
+    유사도가 min_score 미만이면 추적 실패로 보고 None 을 반환한다.
+    """
+    
+    def __init__(self, min_score=0.6, search_margin=0.5):
+        self.min_score = min_score
+        self.search_margin = search_margin
+        self.box = None
+        self._template = None
+    
+    def start(self, gray_img, box):
+        height, width = gray_img.shape[:2]
+        x, y, w, h = box
+        x, y = max(0, x), max(0, y)
+        w, h = min(w, width - x), min(h, height - y)
+        if w <= 0 or h <= 0:
+            self.reset()
+            return
+        self.box = (x, y, w, h)
+        self._template = gray_img[y:y + h, x:x + w].copy()
+    
+    def reset(self):
+        self.box = None
+        self._template = None
+    
+    def update(self, gray_img):
+        if self.box is None:
+            return None
+        height, width = gray_img.shape[:2]
+        x, y, w, h = self.box
+        margin_x, margin_y = int(w * self.search_margin), int(h * self.search_margin)
+        sx1, sy1 = max(0, x - margin_x), max(0, y - margin_y)
+        sx2, sy2 = min(width, x + w + margin_x), min(height, y + h + margin_y)
+        region = gray_img[sy1:sy2, sx1:sx2]
+        if region.shape[0] < h or region.shape[1] < w:
+            self.reset()
+            return None
+        
+        result = cv2.matchTemplate(region, self._template, cv2.TM_CCOEFF_NORMED)
+        _, score, _, location = cv2.minMaxLoc(result)
+        if score < self.min_score:
+            self.reset()
+            return None
+        
+        self.start(gray_img, (sx1 + location[0], sy1 + location[1], w, h))
+        return self.box
+
+class EmotionSession:
+    """웹캠 세션별 상태 (추적 중인 얼굴, 직전 프레임, 평활화된 감정 점수)"""
+    
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.lock = threading.Lock()
+        self.tracker = FaceTracker()
+        self.last_seen = time.monotonic()
+        self.frames_since_detect = 0
+        self.thumbnail = None
+        self.smoothed = None
+        self.last_result = None
+        self.stats = {'frames': 0, 'skipped': 0, 'detections': 0, 'tracked': 0}
+    
+    def process(self, image_np):
+        """프레임 분석 (얼굴이 없으면 None)
+        
+        직전 분석 프레임과 거의 같으면 이전 결과를 그대로 반환하고, 얼굴은 추적기로 따라가다
+        SESSION_REDETECT_INTERVAL 프레임마다 또는 추적 실패 시에만 다시 검출한다.
+        """
+        self.stats['frames'] += 1
+        gray_img = to_gray(image_np)
+        thumbnail = cv2.resize(gray_img, SESSION_THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
+        
+        if self.last_result is not None and self.thumbnail is not None and \
+                cv2.norm(thumbnail, self.thumbnail, cv2.NORM_L1) / thumbnail.size < SESSION_DUPLICATE_THRESHOLD:
+            self.stats['skipped'] += 1
+            return self._with_session(self.last_result, skipped=True, tracked=True)
+        
+        box, face = None, None
+        if self.frames_since_detect < SESSION_REDETECT_INTERVAL:
+            box = self.tracker.update(gray_img)
+            if box is not None:
+                face = crop_face(gray_img, box)
+        
+        tracked = face is not None
+        if tracked:
+            self.frames_since_detect += 1
+            self.stats['tracked'] += 1
+        else:
+            self.stats['detections'] += 1
+            self.frames_since_detect = 0
+            box, face = find_first_face(image_np, gray_img)
+            if face is None:
+                self.tracker.reset()
+                self.thumbnail = None
+                self.last_result = None
+                return None
+            self.tracker.start(gray_img, box)
+        
+        emotions = classify_faces([face])[0]
+        if self.smoothed is None:
+            self.smoothed = dict(emotions)
+        else:
+            self.smoothed = {
+                k: SESSION_SMOOTHING * v + (1 - SESSION_SMOOTHING) * self.smoothed.get(k, v)
+                for k, v in emotions.items()
+            }
+        
+        result = build_emotion_result({k: round(v, 2) for k, v in self.smoothed.items()})
+        result['details']['raw_emotions'] = emotions
+        result['box'] = list(box)
+        self.thumbnail = thumbnail
+        self.last_result = result
+        return self._with_session(result, skipped=False, tracked=tracked)
+    
+    def _with_session(self, result, skipped, tracked):
+        return {
+            **result,
+            'session': {
+                'session_id': self.session_id,
+                'frame': self.stats['frames'],
+                'skipped': skipped,
+                'tracked': tracked
+            }
+        }
+
+class SessionStore:
+    """유휴 TTL 이 지나면 만료되는 세션 보관소"""
+    
+    def __init__(self, ttl, max_count):
+        self.ttl = ttl
+        self.max_count = max_count
+        self._sessions = {}
+        self._lock = threading.Lock()
+    
+    def create(self):
+        with self._lock:
+            self._expire()
+            if len(self._sessions) >= self.max_count:
+                return None
+            session = EmotionSession(uuid.uuid4().hex)
+            self._sessions[session.session_id] = session
+            return session
+    
+    def get(self, session_id):
+        with self._lock:
+            self._expire()
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.last_seen = time.monotonic()
+            return session
+    
+    def remove(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None)
+    
+    def __len__(self):
+        return len(self._sessions)
+    
+    def _expire(self):
+        cutoff = time.monotonic() - self.ttl
+        for session_id in [sid for sid, session in self._sessions.items() if session.last_seen < cutoff]:
+            del self._sessions[session_id]
+
+emotion_sessions = SessionStore(SESSION_TTL, SESSION_MAX_COUNT)
+
+MODEL_ENDPOINTS = {
+    'analyze_emotion', 'analyze_emotion_batch', 'create_emotion_session', 'analyze_session_frame'
+}
+
+@app.before_request
+def require_model():
+    """모델 워밍업 완료 전에는 분석 요청을 503 으로 거절"""
+    if request.endpoint in MODEL_ENDPOINTS and not model_ready.is_set():
+        response = jsonify({
+            'error': 'Model not ready',
+            'message': '모델을 불러오는 중입니다. 잠시 후 다시 시도해주세요.'
+        })
+        response.headers['Retry-After'] = '5'
+        return response, 503
+
 @app.route('/api/analyze-emotion', methods=['POST'])
 def analyze_emotion():
     """
     얼굴 표정 분석 API
     
     Request:
-        - image: base64 인코딩된 이미지
+        - image: base64 인코딩된 이미지 (JSON)
+        - 또는 image/jpeg, image/png 원본 바이너리 본문
+        - 또는 multipart/form-data 의 image 파일
         
     Response:
         - emotion: 주요 감정 (positive/neutral/negative)
@@ -55,77 +631,116 @@ def analyze_emotion():
         - facial_score: 얼굴 표정 점수 (0-1)
     """
     try:
-        data = request.json
-        image_data = data.get('image')
+        try:
+            images = read_request_images('image', 'image')
+        except ValueError as e:
+            return jsonify({'error': 'Invalid image', 'message': str(e)}), 400
         
-        if not image_data:
+        if not images:
             return jsonify({'error': 'No image provided'}), 400
         
-        # Base64 디코딩
-        image_data = image_data.split(',')[1] if ',' in image_data else image_data
-        image_bytes = base64.b64decode(image_data)
+        image_np = images[0]
         
-        # PIL Image로 변환
-        image = Image.open(BytesIO(image_bytes))
-        image_np = np.array(image)
+        # 얼굴 검출 후 추론 큐에서 표정 분류
+        face = extract_face(image_np)
+        if face is None:
+            return jsonify(NO_FACE_RESPONSE), 400
         
-        # RGB to BGR (OpenCV 형식)
-        if len(image_np.shape) == 3 and image_np.shape[2] == 3:
-            image_np = cv2.cvtColor(image_np, cv2.COLOR_RGB2BGR)
+        emotions = classify_faces([face])[0]
+        return jsonify(build_emotion_result(emotions))
         
-        # 얼굴 표정 분석
-        result = detector.detect_emotions(image_np)
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return jsonify({
+            'error': 'Analysis failed',
+            'message': f'분석 중 오류가 발생했습니다: {str(e)}'
+        }), 500
+
+@app.route('/api/analyze-emotion/batch', methods=['POST'])
+def analyze_emotion_batch():
+    """
+    여러 프레임 일괄 얼굴 표정 분석 API
+    
+    Request:
+        - images: base64 인코딩된 이미지 목록 (JSON)
+        - 또는 multipart/form-data 의 images 파일들
         
-        if not result or len(result) == 0:
+    Response:
+        - results: 프레임 순서대로 analyze-emotion 응답 (얼굴 미검출 프레임은 error)
+    """
+    try:
+        try:
+            images = read_request_images('images', 'images')
+        except ValueError as e:
+            return jsonify({'error': 'Invalid image', 'message': str(e)}), 400
+        
+        if not images:
+            return jsonify({'error': 'No images provided'}), 400
+        if len(images) > MAX_FRAMES_PER_REQUEST:
             return jsonify({
-                'error': 'No face detected',
-                'message': '얼굴이 감지되지 않았습니다. 카메라를 정면으로 향해주세요.'
+                'error': 'Too many images',
+                'message': f'한 번에 최대 {MAX_FRAMES_PER_REQUEST}장까지 분석할 수 있습니다.'
             }), 400
         
-        # 첫 번째 얼굴의 감정 분석
-        emotions = result[0]['emotions']
-        
-        # 주요 감정 찾기
-        dominant_emotion = max(emotions, key=emotions.get)
-        dominant_score = emotions[dominant_emotion]
+        faces = [extract_face(image_np) for image_np in images]
+        detected = [face for face in faces if face is not None]
+        emotions = iter(classify_faces(detected) if detected else [])
         
-        # 카테고리 분류 (긍정/중립/부정)
-        category = EMOTION_CATEGORY.get(dominant_emotion, 'neutral')
-        
-        # 긍정/부정 점수 계산
-        positive_score = emotions.get('happy', 0) + emotions.get('surprise', 0)
-        negative_score = emotions.get('sad', 0) + emotions.get('angry', 0) + \
-                        emotions.get('fear', 0) + emotions.get('disgust', 0)
-        neutral_score = emotions.get('neutral', 0)
+        return jsonify({
+            'success': True,
+            'results': [
+                build_emotion_result(next(emotions)) if face is not None else NO_FACE_RESPONSE
+                for face in faces
+            ]
+        })
         
-        # 정규화된 얼굴 표정 점수 (0-1)
-        # 긍정적일수록 1에 가까움
-        facial_score = (positive_score - negative_score + 1) / 2
-        facial_score = max(0, min(1, facial_score))  # 0-1 범위로 제한
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return jsonify({
+            'error': 'Analysis failed',
+            'message': f'분석 중 오류가 발생했습니다: {str(e)}'
+        }), 500
+
+@app.route('/api/emotion-sessions', methods=['POST'])
+def create_emotion_session():
+    """영상 세션 생성 (이후 프레임은 /api/emotion-sessions/<session_id>/frames 로 전송)"""
+    session = emotion_sessions.create()
+    if session is None:
+        return jsonify({
+            'error': 'Too many sessions',
+            'message': '활성 세션이 너무 많습니다. 잠시 후 다시 시도해주세요.'
+        }), 503
+    return jsonify({'success': True, 'session_id': session.session_id, 'ttl': SESSION_TTL})
+
+@app.route('/api/emotion-sessions/<session_id>/frames', methods=['POST'])
+def analyze_session_frame(session_id):
+    """
+    영상 세션 프레임 분석 API
+    
+    Request: /api/analyze-emotion 과 동일 (base64 JSON, 바이너리 본문, multipart)
+    
+    Response: /api/analyze-emotion 응답에 시간 평활화된 점수를 담고, details.raw_emotions 에
+    현재 프레임 점수, session 에 프레임 번호와 건너뜀/추적 여부를 추가
+    """
+    session = emotion_sessions.get(session_id)
+    if session is None:
+        return jsonify({'error': 'Session not found', 'message': '세션이 없거나 만료되었습니다.'}), 404
+    
+    try:
+        try:
+            images = read_request_images('image', 'image')
+        except ValueError as e:
+            return jsonify({'error': 'Invalid image', 'message': str(e)}), 400
         
-        # 신뢰도 계산
-        confidence = dominant_score
+        if not images:
+            return jsonify({'error': 'No image provided'}), 400
         
-        # 한국어 감정 레이블
-        emotions_ko = {EMOTION_MAP_KO[k]: v for k, v in emotions.items()}
+        with session.lock:
+            result = session.process(images[0])
         
-        return jsonify({
-            'success': True,
-            'emotion': category,
-            'confidence': float(confidence),
-            'facial_score': float(facial_score),
-            'details': {
-                'dominant_emotion': dominant_emotion,
-                'dominant_emotion_ko': EMOTION_MAP_KO[dominant_emotion],
-                'dominant_score': float(dominant_score),
-                'all_emotions': emotions,
-                'all_emotions_ko': emotions_ko,
-                'positive_score': float(positive_score),
-                'negative_score': float(negative_score),
-                'neutral_score': float(neutral_score)
-            },
-            'analysis': generate_analysis(category, facial_score, dominant_emotion)
-        })
+        if result is None:
+            return jsonify(NO_FACE_RESPONSE), 400
+        return jsonify(result)
         
     except Exception as e:
         print(f"Error: {str(e)}")
@@ -134,9 +749,20 @@ def analyze_emotion():
             'message': f'분석 중 오류가 발생했습니다: {str(e)}'
         }), 500
 
+@app.route('/api/emotion-sessions/<session_id>', methods=['DELETE'])
+def close_emotion_session(session_id):
+    """영상 세션 종료 및 세션 통계 반환"""
+    session = emotion_sessions.remove(session_id)
+    if session is None:
+        return jsonify({'error': 'Session not found'}), 404
+    return jsonify({'success': True, 'session_id': session_id, 'stats': session.stats})
+
 def generate_analysis(category, score, dominant_emotion):
-    """감정 분석 리포트 생성"""
-    
+    """감정 분석 리포트 생성 (점수를 반올림해 메모이제이션된 리포트 재사용)"""
+    return _generate_analysis(category, round(float(score), 3), dominant_emotion)
+
+@functools.lru_cache(maxsize=1024)
+def _generate_analysis(category, score, dominant_emotion):
     if category == 'positive':
         return {
             'ko': f"""분석 결과, 현재 긍정적인 감정 상태입니다.
@@ -185,16 +811,144 @@ Recommendation: Maintain your current state and proceed with planned tasks stead
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    """서버 상태 확인"""
+    """서버 상태 확인 (모델 워밍업 완료 전에는 503)"""
+    if not model_ready.is_set():
+        return jsonify({
+            'status': model_state['status'],
+            'message': 'Emotion detection model is not ready',
+            'error': model_state['error']
+        }), 503
+    
     return jsonify({
         'status': 'ok',
         'message': 'Emotion detection server is running',
-        'model': 'FER with MTCNN'
+        'pid': os.getpid(),
+        'model_load_seconds': model_state['load_seconds'],
+        'model': detector.description,
+        'backend': detector.name,
+        'batching': {
+            **inference_batcher.stats,
+            'max_batch_size': inference_batcher.max_batch_size,
+            'max_wait_ms': MAX_BATCH_WAIT_MS
+        },
+        'active_sessions': len(emotion_sessions),
+        'cache': emotion_cache.snapshot() if emotion_cache else None,
+        'analysis_cache': _generate_analysis.cache_info()._asdict(),
+        'admission': admission_control.snapshot() if admission_control else None
     })
 
+# ============= ASGI 프로덕션 서빙 =============
+
+class AdmissionControl:
+    """ASGI 입장 제어 미들웨어
+    
+    분석 요청의 동시 처리 수를 max_concurrency 로 제한하고, 대기 중인 요청이 max_queue_depth 를
+    넘으면 즉시 503 으로 거절한다. lifespan 시작 시 워커 프로세스 안에서 모델 로드를 시작한다.
+    """
+    
+    def __init__(self, wsgi_app, max_concurrency, max_queue_depth, path_prefixes=('/api/analyze-emotion', '/api/emotion-sessions')):
+        from a2wsgi import WSGIMiddleware
+        self.app = WSGIMiddleware(wsgi_app, workers=max_concurrency + 4)
+        self.max_concurrency = max_concurrency
+        self.max_queue_depth = max_queue_depth
+        self.path_prefixes = path_prefixes
+        self._semaphore = None
+        self.in_flight = 0
+        self.waiting = 0
+        self.stats = {'admitted': 0, 'shed': 0}
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+        if scope['type'] != 'http' or not scope['path'].startswith(self.path_prefixes):
+            return await self.app(scope, receive, send)
+        
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        if self._semaphore.locked() and self.waiting >= self.max_queue_depth:
+            self.stats['shed'] += 1
+            return await self._reject(send)
+        
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        
+        self.in_flight += 1
+        self.stats['admitted'] += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+    
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                start_model_loading()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    
+    async def _reject(self, send):
+        body = json.dumps({
+            'error': 'Server busy',
+            'message': '요청이 많습니다. 잠시 후 다시 시도해주세요.'
+        }).encode()
+        await send({
+            'type': 'http.response.start',
+            'status': 503,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode()),
+                (b'retry-after', b'1')
+            ]
+        })
+        await send({'type': 'http.response.body', 'body': body})
+    
+    def snapshot(self):
+        return {
+            **self.stats,
+            'in_flight': self.in_flight,
+            'waiting': self.waiting,
+            'max_concurrency': self.max_concurrency,
+            'max_queue_depth': self.max_queue_depth
+        }
+
+# ASGI 모드에서만 설정 (/api/health 에 입장 제어 통계 표시)
+admission_control = None
+
+def create_asgi_app():
+    global admission_control
+    admission_control = AdmissionControl(app, MAX_CONCURRENCY, MAX_QUEUE_DEPTH)
+    return admission_control
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Emotion detection server')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=int(os.getenv('EMOTION_WORKERS', '0')),
+                        help='ASGI 워커 프로세스 수 (0 이면 Flask 개발 서버)')
+    return parser.parse_args()
+
 if __name__ == '__main__':
+    args = parse_args()
     print("🎭 Emotion Detection Server Starting...")
-    print("📍 Server: http://localhost:5000")
-    print("🔧 Model: FER (Facial Expression Recognition)")
-    print("✅ Ready to analyze emotions!")
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    print(f"📍 Server: http://localhost:{args.port}")
+    print(f"🔧 Backend: {os.getenv('EMOTION_BACKEND', 'fer')}")
+    
+    if args.workers > 0:
+        import uvicorn
+        print(f"🚀 ASGI workers: {args.workers}")
+        # 워커는 spawn 으로 시작되어 각자 lifespan 시작 시 모델을 로드
+        uvicorn.run('emotion_detection:create_asgi_app', factory=True, host=args.host,
+                    port=args.port, workers=args.workers, lifespan='on')
+    else:
+        start_model_loading()
+        # 동시 요청이 추론 큐에서 함께 배치되도록 스레드 모드로 실행
+        # 리로더는 모델을 두 번 로드하므로 끄고, 디버그 모드는 EMOTION_DEBUG 로만 켠다
+        app.run(host=args.host, port=args.port, threaded=True, use_reloader=False,
+                debug=os.getenv('EMOTION_DEBUG', 'false').lower() == 'true')
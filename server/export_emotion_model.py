@@ -0,0 +1,49 @@
+"""
+FER 표정 분류 모델(emotion_model.hdf5)을 ONNX 로 변환하고 int8 양자화
+opencv 백엔드(emotion_backends.OpenCVBackend)에서 사용
+
+필요 패키지 (변환 시에만): fer, tensorflow, tf2onnx, onnxruntime
+    python export_emotion_model.py --output emotion_model.onnx
+"""
+
+import argparse
+import os
+
+from emotion_backends import EMOTION_INPUT_SIZE
+
+def export_onnx(output_path, opset=13):
+    """Keras 모델을 float32 ONNX 로 변환 (입력: input (n, 64, 64, 1))"""
+    import pkg_resources
+    import tensorflow as tf
+    import tf2onnx
+
+    model_path = pkg_resources.resource_filename('fer', 'data/emotion_model.hdf5')
+    model = tf.keras.models.load_model(model_path, compile=False)
+    signature = [tf.TensorSpec((None, *EMOTION_INPUT_SIZE, 1), tf.float32, name='input')]
+    tf2onnx.convert.from_keras(model, input_signature=signature, opset=opset, output_path=output_path)
+    return output_path
+
+def quantize_int8(input_path, output_path):
+    """가중치 int8 동적 양자화 (onnxruntime 런타임 전용, cv2.dnn 은 float32 모델 사용)"""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(input_path, output_path, weight_type=QuantType.QInt8)
+    return output_path
+
+def main():
+    parser = argparse.ArgumentParser(description='Export FER emotion model to ONNX')
+    parser.add_argument('--output', default='emotion_model.onnx')
+    parser.add_argument('--opset', type=int, default=13)
+    parser.add_argument('--no-quantize', action='store_true', help='int8 양자화 모델 생성 생략')
+    args = parser.parse_args()
+
+    export_onnx(args.output, args.opset)
+    print(f"✅ ONNX model: {args.output} ({os.path.getsize(args.output) / 1024:.0f} KB)")
+
+    if not args.no_quantize:
+        root, ext = os.path.splitext(args.output)
+        quantized = quantize_int8(args.output, f"{root}.int8{ext}")
+        print(f"✅ int8 model: {quantized} ({os.path.getsize(quantized) / 1024:.0f} KB)")
+
+if __name__ == '__main__':
+    main()
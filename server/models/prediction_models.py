@@ -72,6 +72,26 @@ class PredictionResponse(BaseModel):
     feature_importance: Dict[str, float] = Field(default_factory=dict, description="특성 중요도")
     risk_assessment: Dict[str, Any] = Field(default_factory=dict, description="위험 평가")
 
+class BatchPredictionRequest(BaseModel):
+    """다중 화주 일괄 예측 요청 모델"""
+    shipper_ids: List[str] = Field(..., min_items=1, max_items=10000, description="화주 ID 목록")
+    variables: List[PredictionVariable] = Field(..., description="공통 예측 변수들")
+    prediction_horizon: int = Field(default=30, ge=1, le=365, description="예측 기간(일)")
+    confidence_level: float = Field(default=0.95, ge=0.5, le=0.99, description="신뢰도 수준")
+    lookback_days: int = Field(default=90, ge=7, le=730, description="학습 이력 기간(일)")
+    history_source: str = Field(default="booking_history", description="화주별 이력 데이터 소스명")
+
+class BatchPredictionResponse(BaseModel):
+    """다중 화주 일괄 예측 응답 모델"""
+    batch_id: str = Field(..., description="일괄 작업 ID")
+    model_used: str = Field(..., description="사용된 모델")
+    model_version: str = Field(..., description="일괄 예측 모델 버전 (다중 변수 예측 결과와 비교 불가)")
+    created_at: datetime = Field(default_factory=datetime.now, description="생성 시간")
+    prediction_horizon: int = Field(..., description="예측 기간")
+    job_ids: Dict[str, str] = Field(..., description="화주별 예측 작업 ID")
+    failed: Dict[str, str] = Field(default_factory=dict, description="예측 실패 화주와 사유")
+    feature_importance: Dict[str, float] = Field(default_factory=dict, description="특성 중요도")
+
 # ============= A/B 테스트 모델 =============
 
 class ABTestRequest(BaseModel):
@@ -183,6 +203,18 @@ class PredictionRequest(PredictionRequest):
         
         return v
 
+class BatchPredictionRequest(BatchPredictionRequest):
+    @validator('variables')
+    def validate_variables(cls, v):
+        if not v:
+            raise ValueError('최소 하나의 예측 변수가 필요합니다')
+        
+        total_weight = sum(var.weight for var in v)
+        if abs(total_weight - 1.0) > 0.01:
+            raise ValueError('변수들의 가중치 합은 1.0이어야 합니다')
+        
+        return v
+
 class SentimentAnalysisRequest(SentimentAnalysisRequest):
     @validator('time_range')
     def validate_time_range(cls, v):
@@ -0,0 +1,201 @@
+# server/services/batch_prediction.py
+import asyncio
+import logging
+import uuid
+import warnings
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from statistics import NormalDist
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from ..database.database_manager import ExternalDataManager, PredictionDataManager
+from ..models.prediction_models import BatchPredictionRequest, PredictionVariable
+
+logger = logging.getLogger(__name__)
+
+# 일괄 예측 결과는 AdvancedPredictionService 모델 결과와 같은 테이블에 저장되므로
+# model_type/model_version 으로 구분한다 (서비스 모델 작업의 model_version 은 NULL)
+MODEL_NAME = 'batch_linear_trend'
+MODEL_VERSION = 'batch-v1'
+
+def _series_value(value: Any) -> float:
+    if isinstance(value, dict):
+        value = value.get('value')
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+def _daily_matrix(rows: List[Tuple[str, datetime, Any]], keys: List[str],
+                  start: date, days: int) -> np.ndarray:
+    """(data_key, 시각, 값) 행을 키 x 일 행렬로 집계 (일 평균, 결측은 NaN)"""
+    sums = np.zeros((len(keys), days))
+    counts = np.zeros((len(keys), days))
+    if rows:
+        index = {key: i for i, key in enumerate(keys)}
+        r = np.fromiter((index[key] for key, _, _ in rows), dtype=np.intp, count=len(rows))
+        c = np.fromiter(((ts.date() - start).days for _, ts, _ in rows), dtype=np.intp, count=len(rows))
+        v = np.fromiter((_series_value(value) for _, _, value in rows), dtype=float, count=len(rows))
+        valid = (c >= 0) & (c < days) & ~np.isnan(v)
+        np.add.at(sums, (r[valid], c[valid]), v[valid])
+        np.add.at(counts, (r[valid], c[valid]), 1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return sums / counts
+
+def _fill_missing(matrix: np.ndarray) -> np.ndarray:
+    """행별 직전 값으로 결측 채움 (앞쪽 결측은 행 평균, 전부 결측인 행은 NaN 유지)"""
+    if matrix.size == 0:
+        return matrix
+    mask = np.isnan(matrix)
+    index = np.where(~mask, np.arange(matrix.shape[1]), 0)
+    np.maximum.accumulate(index, axis=1, out=index)
+    filled = matrix[np.arange(matrix.shape[0])[:, None], index]
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        row_mean = np.nanmean(matrix, axis=1)
+    return np.where(np.isnan(filled), row_mean[:, None], filled)
+
+class BatchPredictionEngine:
+    """다중 화주 일괄 예측
+
+    화주 이력과 공통 변수 시계열을 소스별 한 번의 쿼리로 모아 화주 x 일 행렬을 만들고,
+    선형 추세 + 변수 조정 예측과 신뢰구간을 NumPy 로 전체 화주에 대해 한 번에 계산한 뒤
+    결과를 bulk COPY 로 저장한다.
+
+    다중 변수 예측(AdvancedPredictionService)과는 다른 모델이다. 화주 이력은 external_data 의
+    history_source 에서 data_key = 화주 ID 인 시계열을 쓰고, 변수는 화주 공통 조정 계수로만
+    반영된다. 따라서 결과는 다중 변수 예측과 직접 비교할 수 없으며, 작업은
+    job_name 'batch:<batch_id>', model_type MODEL_NAME, model_version MODEL_VERSION 으로 저장된다.
+    """
+
+    def __init__(self, external_data: ExternalDataManager, predictions: PredictionDataManager):
+        self.external_data = external_data
+        self.predictions = predictions
+
+    async def run(self, request: BatchPredictionRequest) -> Dict[str, Any]:
+        shipper_ids = list(dict.fromkeys(request.shipper_ids))
+        days = request.lookback_days
+        start = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+        since = datetime.combine(start, datetime.min.time(), tzinfo=timezone.utc)
+
+        history_rows = await self.external_data.get_series_batch(
+            request.history_source, shipper_ids, since
+        )
+        variable_rows = await self._load_variables(request.variables, since)
+
+        batch_id = str(uuid.uuid4())
+        jobs, results, features, summary = await asyncio.to_thread(
+            self._compute, batch_id, request, shipper_ids, history_rows, variable_rows, start
+        )
+        if jobs:
+            await self.predictions.save_batch_predictions(jobs, results, features)
+
+        logger.info(
+            f"Batch prediction {batch_id}: {len(jobs)} shippers predicted, "
+            f"{len(summary['failed'])} failed"
+        )
+        return summary
+
+    async def _load_variables(self, variables: List[PredictionVariable],
+                              since: datetime) -> Dict[str, List[Tuple[str, datetime, Any]]]:
+        """변수 시계열을 데이터 소스별로 한 번씩 조회"""
+        by_source: Dict[str, List[str]] = defaultdict(list)
+        for var in variables:
+            by_source[var.data_source].append(var.name)
+        loaded = await asyncio.gather(*(
+            self.external_data.get_series_batch(source, names, since)
+            for source, names in by_source.items()
+        ))
+        return dict(zip(by_source.keys(), loaded))
+
+    def _compute(self, batch_id: str, request: BatchPredictionRequest, shipper_ids: List[str],
+                 history_rows, variable_rows, start: date):
+        days = request.lookback_days
+        horizon = request.prediction_horizon
+
+        # 공통 변수 조정 계수: 변수별 최근값의 기간 평균 대비 변화율을 가중 합산
+        weights = np.array([var.weight for var in request.variables])
+        changes = np.zeros(len(request.variables))
+        for source, rows in variable_rows.items():
+            positions = [i for i, var in enumerate(request.variables) if var.data_source == source]
+            names = [request.variables[i].name for i in positions]
+            matrix = _fill_missing(_daily_matrix(rows, names, start, days))
+            mean = matrix.mean(axis=1)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                change = (matrix[:, -1] - mean) / np.abs(mean)
+            changes[positions] = np.nan_to_num(change, nan=0.0, posinf=0.0, neginf=0.0)
+        contributions = weights * changes
+        factor = float(np.clip(1.0 + contributions.sum(), 0.5, 1.5))
+
+        importance = np.abs(contributions)
+        if importance.sum() == 0:
+            importance = weights
+        importance = importance / importance.sum()
+        feature_importance = {
+            var.name: round(float(score), 6) for var, score in zip(request.variables, importance)
+        }
+
+        # 화주별 선형 추세 적합 (최소제곱 닫힌 해, 전체 화주 동시 계산)
+        history = _fill_missing(_daily_matrix(history_rows, shipper_ids, start, days))
+        has_history = ~np.isnan(history).any(axis=1)
+        H = history[has_history]
+        t = np.arange(days, dtype=float)
+        tc = t - t.mean()
+        level = H.mean(axis=1)
+        slope = (H - level[:, None]) @ tc / (tc @ tc)
+        residuals = H - (level[:, None] + slope[:, None] * tc)
+        sigma = residuals.std(axis=1, ddof=min(2, days - 1))
+
+        steps = np.arange(1, horizon + 1, dtype=float)
+        forecast = np.maximum((level[:, None] + slope[:, None] * (tc[-1] + steps)) * factor, 0.0)
+        z = NormalDist().inv_cdf((1 + request.confidence_level) / 2)
+        width = z * sigma[:, None] * np.sqrt(1 + steps / days) * factor
+        lower = np.maximum(forecast - width, 0.0)
+        upper = forecast + width
+        with np.errstate(invalid='ignore', divide='ignore'):
+            accuracy = 1 - np.abs(residuals).mean(axis=1) / np.abs(H).mean(axis=1)
+        accuracy = np.clip(np.nan_to_num(accuracy, nan=0.0), 0.0, 1.0)
+
+        # 저장용 레코드 구성
+        predicted_ids = [sid for sid, ok in zip(shipper_ids, has_history) if ok]
+        job_ids = {sid: str(uuid.uuid4()) for sid in predicted_ids}
+        today = datetime.now(timezone.utc).date()
+        dates = [today + timedelta(days=int(step)) for step in steps]
+        jobs = [
+            {
+                'id': job_ids[sid], 'shipper_id': sid, 'job_name': f"batch:{batch_id}",
+                'model_type': MODEL_NAME, 'model_version': MODEL_VERSION,
+                'prediction_horizon': horizon,
+                'confidence_level': request.confidence_level
+            }
+            for sid in predicted_ids
+        ]
+        results = []
+        for row, sid in enumerate(predicted_ids):
+            job_id, row_accuracy = job_ids[sid], round(float(accuracy[row]), 4)
+            results.extend(zip(
+                [job_id] * horizon, dates, forecast[row].tolist(), lower[row].tolist(),
+                upper[row].tolist(), [request.confidence_level] * horizon, [row_accuracy] * horizon
+            ))
+        ranked = sorted(feature_importance.items(), key=lambda item: item[1], reverse=True)
+        features = [
+            (job_ids[sid], name, score, rank)
+            for sid in predicted_ids
+            for rank, (name, score) in enumerate(ranked, 1)
+        ]
+
+        summary = {
+            'batch_id': batch_id,
+            'model_used': MODEL_NAME,
+            'model_version': MODEL_VERSION,
+            'created_at': datetime.now(),
+            'prediction_horizon': horizon,
+            'job_ids': job_ids,
+            'failed': {
+                sid: 'no history' for sid, ok in zip(shipper_ids, has_history) if not ok
+            },
+            'feature_importance': feature_importance
+        }
+        return jobs, results, features, summary
@@ -0,0 +1,188 @@
+# server/services/model_evaluation_executor.py
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# 워커 프로세스 전역 상태 (프로세스당 한 번 초기화)
+_worker_service = None
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def _initialize_worker(pid_queue):
+    """워커 프로세스 초기화: 예측 서비스와 모델 코드를 미리 로드하고 PID 를 부모에 알림"""
+    global _worker_service, _worker_loop
+    pid_queue.put(os.getpid())
+    from .advanced_prediction_service import AdvancedPredictionService
+    _worker_service = AdvancedPredictionService()
+    _worker_loop = asyncio.new_event_loop()
+
+def _evaluate_model(shipper_id: str, model: str) -> Any:
+    """워커 프로세스에서 단일 모델 평가 실행"""
+    return _worker_loop.run_until_complete(
+        _worker_service.compare_models(shipper_id=shipper_id, models=[model])
+    )
+
+def _find_metric(result: Any, metric: str) -> Optional[float]:
+    """모델 평가 결과에서 지표 값을 찾음 (중첩 dict 포함, 없으면 None)"""
+    if not isinstance(result, dict):
+        return None
+    value = result.get(metric)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    for nested in result.values():
+        found = _find_metric(nested, metric)
+        if found is not None:
+            return found
+    return None
+
+class ModelEvaluationExecutor:
+    """프로세스 풀 기반 모델 비교 실행기
+
+    모델별 적합/평가를 별도 프로세스(spawn)에서 병렬로 실행해 API 이벤트 루프를 막지 않는다.
+    워커는 모델별 결과만 반환하고, 모델 간 순위와 최적 모델은 부모에서 한 번 계산한다.
+    모델마다 제한 시간이 적용되며, 시간 초과 시 아직 시작되지 않은 작업은 취소된다.
+    실행 중인 적합이 시간 초과되면 그 풀은 퇴역시켜 새 요청은 새 풀에서 처리하고,
+    퇴역한 풀은 남은 평가가 끝나는 즉시 워커 프로세스를 종료해 멈춘 적합이 워커를 점유하지 않게 한다.
+    워커는 max_tasks_per_child 개의 평가 후 교체되어 적합 중 누적된 메모리를 반환한다.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        timeout: float = 120.0,
+        ranking_metric: str = 'rmse',
+        max_tasks_per_child: Optional[int] = 50
+    ):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.ranking_metric = ranking_metric
+        self.max_tasks_per_child = max_tasks_per_child
+        self._context = multiprocessing.get_context('spawn')
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # 풀별로 결과를 기다리는 중인 평가
+        self._pending: Dict[ProcessPoolExecutor, Set[asyncio.Future]] = {}
+        # 풀별 워커 PID 보고 큐 (퇴역 시 종료할 워커 식별)
+        self._pid_queues: Dict[ProcessPoolExecutor, Any] = {}
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            pid_queue = self._context.SimpleQueue()
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=self._context,
+                initializer=_initialize_worker,
+                initargs=(pid_queue,),
+                max_tasks_per_child=self.max_tasks_per_child
+            )
+            self._pid_queues[self._pool] = pid_queue
+        return self._pool
+
+    async def compare(
+        self,
+        shipper_id: str,
+        models: List[str],
+        timeouts: Optional[Dict[str, float]] = None
+    ) -> Dict[str, Any]:
+        """모델들을 병렬 평가 (모두 끝나거나 시간 초과되면 반환)
+
+        응답은 모델별 compare_models 결과(results), ranking_metric 오름차순 순위(ranking)와
+        최적 모델(best_model), 평가 상태를 나타내는 model_status ('ok' | 'timeout' | 'error'),
+        timed_out, errors 를 담는다. 지표가 없는 모델은 순위에서 제외된다.
+        """
+        timeouts = timeouts or {}
+        models = list(dict.fromkeys(models))
+        outcomes = await asyncio.gather(*(
+            self._evaluate(shipper_id, model, timeouts.get(model, self.timeout))
+            for model in models
+        ))
+
+        results: Dict[str, Any] = {}
+        model_status: Dict[str, str] = {}
+        timed_out: List[str] = []
+        errors: Dict[str, str] = {}
+        for model, (status, value) in zip(models, outcomes):
+            model_status[model] = status
+            if status == 'ok':
+                results[model] = value
+            elif status == 'timeout':
+                timed_out.append(model)
+            else:
+                errors[model] = value
+
+        scores = {
+            model: score for model, score in (
+                (model, _find_metric(result, self.ranking_metric)) for model, result in results.items()
+            ) if score is not None
+        }
+        ranking = sorted(scores, key=scores.get)
+        return {
+            'shipper_id': shipper_id,
+            'results': results,
+            'ranking_metric': self.ranking_metric,
+            'ranking': [{'model': model, self.ranking_metric: scores[model]} for model in ranking],
+            'best_model': ranking[0] if ranking else None,
+            'model_status': model_status,
+            'timed_out': timed_out,
+            'errors': errors
+        }
+
+    async def _evaluate(self, shipper_id: str, model: str, timeout: float):
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        future = loop.run_in_executor(pool, _evaluate_model, shipper_id, model)
+        pending = self._pending.setdefault(pool, set())
+        pending.add(future)
+        try:
+            return 'ok', await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Model evaluation timed out: {model} ({shipper_id}, {timeout}s)")
+            if self._pool is pool:
+                logger.warning("Retiring model evaluation pool with a hung fit")
+                self._pool = None
+            return 'timeout', None
+        except BrokenProcessPool as e:
+            logger.error(f"Model evaluation pool broken, recreating: {e}")
+            if self._pool is pool:
+                self._pool = None
+            return 'error', str(e)
+        except Exception as e:
+            logger.error(f"Model evaluation error: {model} ({shipper_id}): {e}")
+            return 'error', str(e)
+        finally:
+            pending.discard(future)
+            if not pending and pool is not self._pool:
+                self._pending.pop(pool, None)
+                self._terminate(pool)
+
+    def _terminate(self, pool: ProcessPoolExecutor):
+        """풀의 워커 프로세스를 강제 종료 (실행 중인 적합도 중단)"""
+        pool.shutdown(wait=False, cancel_futures=True)
+        pid_queue = self._pid_queues.pop(pool, None)
+        if pid_queue is None:
+            return
+        pids = set()
+        while not pid_queue.empty():
+            pids.add(pid_queue.get())
+        pid_queue.close()
+        # 살아 있는 자식 프로세스 중에서만 찾아 종료 (이미 끝난 워커의 PID 재사용에 안전)
+        for process in multiprocessing.active_children():
+            if process.pid in pids:
+                process.terminate()
+
+    def shutdown(self):
+        """프로세스 풀 종료 (대기 중 작업 취소, 퇴역 대기 중인 풀의 워커는 강제 종료)"""
+        for pool in list(self._pending):
+            if pool is not self._pool:
+                self._terminate(pool)
+        self._pending.clear()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            pid_queue = self._pid_queues.pop(self._pool, None)
+            if pid_queue is not None:
+                pid_queue.close()
+            self._pool = None
@@ -0,0 +1,196 @@
+# server/services/prediction_cache.py
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, time as dt_time
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from ..database.database_manager import PredictionDataManager
+from ..models.prediction_models import ModelType, PredictionRequest
+
+logger = logging.getLogger(__name__)
+
+def prediction_fingerprint(request: PredictionRequest) -> str:
+    """PredictionRequest 정규화 지문 (변수 순서와 무관)"""
+    payload = request.dict()
+    payload['variables'] = sorted(
+        payload['variables'], key=lambda var: (var['name'], str(var['type']))
+    )
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+class PredictionCache:
+    """예측 결과 캐시 (LRU + TTL, stale-while-revalidate)
+
+    ttl 이내 항목은 그대로 반환하고, ttl~stale_ttl 사이 항목은 즉시 반환하면서 백그라운드에서
+    키당 한 번만 다시 계산한다. store 가 주어지면 메모리 미스 시 prediction_results 에 저장된
+    최근 결과(2차 캐시)를 사용하며, 이때 contributing_factors 와 risk_assessment 는 복원되지 않는다.
+    2차 캐시는 캐시 키당 'cached' 상태 작업 한 행으로 유지되고, stale_ttl 동안 갱신되지 않은
+    항목은 ttl 간격으로 삭제된다.
+    """
+
+    JOB_NAME_PREFIX = 'cache:'
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl: float = 300.0,
+        stale_ttl: float = 1800.0,
+        store: Optional[PredictionDataManager] = None
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.store = store
+        self._entries: OrderedDict = OrderedDict()
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._background: Set[asyncio.Task] = set()
+        self._last_purge = 0.0
+        self.stats = {
+            'hits': 0, 'stale_hits': 0, 'misses': 0, 'store_hits': 0,
+            'refreshes': 0, 'refresh_errors': 0
+        }
+
+    async def get_or_compute(
+        self,
+        request: PredictionRequest,
+        compute: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        key = prediction_fingerprint(request)
+        entry = self._entries.get(key)
+        now = time.monotonic()
+
+        if entry is not None:
+            value, stored_at = entry
+            age = now - stored_at
+            if age < self.ttl:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return value
+            if age < self.stale_ttl:
+                self._entries.move_to_end(key)
+                self.stats['stale_hits'] += 1
+                self._refresh(key, request, compute)
+                return value
+            del self._entries[key]
+
+        self.stats['misses'] += 1
+        if self.store is not None:
+            stored = await self._load_from_store(key)
+            if stored is not None:
+                self.stats['store_hits'] += 1
+                self._put(key, stored)
+                return stored
+
+        value = await compute()
+        self._put(key, value)
+        self._persist(key, request, value)
+        return value
+
+    def snapshot(self) -> Dict[str, Any]:
+        lookups = self.stats['hits'] + self.stats['stale_hits'] + self.stats['misses']
+        return {
+            **self.stats,
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hit_ratio': round((self.stats['hits'] + self.stats['stale_hits']) / lookups, 4) if lookups else 0.0
+        }
+
+    def _put(self, key: str, value: Dict[str, Any]):
+        self._entries[key] = (value, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.ensure_future(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return task
+
+    def _refresh(self, key: str, request: PredictionRequest,
+                 compute: Callable[[], Awaitable[Dict[str, Any]]]):
+        if key in self._refreshing:
+            return
+
+        async def refresh():
+            try:
+                value = await compute()
+                self._put(key, value)
+                self.stats['refreshes'] += 1
+                self._persist(key, request, value)
+            except Exception as e:
+                self.stats['refresh_errors'] += 1
+                logger.error(f"Prediction cache refresh error: {e}")
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = self._spawn(refresh())
+
+    def _persist(self, key: str, request: PredictionRequest, value: Dict[str, Any]):
+        if self.store is not None:
+            self._spawn(self._save_to_store(key, request, value))
+
+    async def _load_from_store(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            job_id = await self.store.find_latest_job(
+                self.JOB_NAME_PREFIX + key, timedelta(seconds=self.ttl), status='cached'
+            )
+            if job_id is None:
+                return None
+            stored = await self.store.get_prediction_job(job_id)
+        except Exception as e:
+            logger.error(f"Prediction cache store lookup error: {e}")
+            return None
+
+        if not stored or not stored['results']:
+            return None
+        job = stored['job']
+        return {
+            'shipper_id': job['shipper_id'],
+            'prediction_id': str(job['id']),
+            'model_used': job['model_type'],
+            'created_at': job['created_at'],
+            'prediction_horizon': job['prediction_horizon'],
+            'predictions': [
+                {
+                    'date': datetime.combine(result['prediction_date'], dt_time.min),
+                    'predicted_value': float(result['predicted_value']),
+                    'confidence_interval': {
+                        'lower_bound': float(result['confidence_lower']),
+                        'upper_bound': float(result['confidence_upper']),
+                        'confidence_level': float(result['confidence_level'])
+                    }
+                }
+                for result in stored['results']
+            ],
+            'model_accuracy': float(stored['results'][0]['model_accuracy'] or 0.0),
+            'feature_importance': {
+                name: float(score) for name, score in stored['feature_importance'].items()
+            }
+        }
+
+    async def _save_to_store(self, key: str, request: PredictionRequest, value: Dict[str, Any]):
+        try:
+            await self.store.save_cached_prediction({
+                'shipper_id': request.shipper_id,
+                'job_name': self.JOB_NAME_PREFIX + key,
+                'model_type': value.get('model_used') or (request.model_type or ModelType.ENSEMBLE).value,
+                'prediction_horizon': request.prediction_horizon,
+                'confidence_level': request.confidence_level
+            }, value)
+        except Exception as e:
+            logger.error(f"Prediction cache store write error: {e}")
+            return
+
+        if time.monotonic() - self._last_purge >= self.ttl:
+            self._last_purge = time.monotonic()
+            try:
+                purged = await self.store.purge_cached_predictions(timedelta(seconds=self.stale_ttl))
+                if purged:
+                    logger.info(f"Purged {purged} expired prediction cache entries")
+            except Exception as e:
+                logger.error(f"Prediction cache store purge error: {e}")
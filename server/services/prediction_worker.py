@@ -0,0 +1,187 @@
+# server/services/prediction_worker.py
+import asyncio
+import logging
+import os
+import signal
+import socket
+import uuid
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from ..database.database_manager import PredictionDataManager, db_manager, prediction_data_manager
+from ..models.prediction_models import PredictionVariable
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+class PredictionJobWorker:
+    """prediction_jobs 큐 소비 워커
+
+    대기 작업을 FOR UPDATE SKIP LOCKED 로 선점하므로 여러 프로세스가 같은 큐를 안전하게 나눠
+    처리한다. 실행 중인 작업은 임대(lease)를 주기적으로 연장하고, 실패 시 지수 백오프로
+    재시도한다. 임대가 만료된 작업(죽은 워커의 작업)은 recovery 루프가 다시 대기 상태로 돌린다.
+    """
+
+    def __init__(
+        self,
+        data_manager: PredictionDataManager,
+        handler: JobHandler,
+        concurrency: int = 4,
+        lease_seconds: float = 60.0,
+        poll_interval: float = 2.0,
+        retry_base_delay: float = 5.0,
+        retry_max_delay: float = 300.0,
+        worker_id: Optional[str] = None
+    ):
+        self.data_manager = data_manager
+        self.handler = handler
+        self.concurrency = concurrency
+        self.lease = timedelta(seconds=lease_seconds)
+        self.poll_interval = poll_interval
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._active: Set[asyncio.Task] = set()
+        self._stopping = asyncio.Event()
+
+    async def run(self):
+        """중지 요청까지 작업을 선점·실행 (중지 시 실행 중 작업 완료를 기다림)"""
+        logger.info(f"Prediction worker {self.worker_id} started (concurrency={self.concurrency})")
+        recovery = asyncio.ensure_future(self._recovery_loop())
+        try:
+            while not self._stopping.is_set():
+                free = self.concurrency - len(self._active)
+                if free <= 0:
+                    await asyncio.wait(self._active, return_when=asyncio.FIRST_COMPLETED)
+                    continue
+
+                try:
+                    jobs = await self.data_manager.claim_pending_jobs(self.worker_id, free, self.lease)
+                except Exception as e:
+                    logger.error(f"Job claim error: {e}")
+                    jobs = []
+
+                for job in jobs:
+                    task = asyncio.ensure_future(self._process(job))
+                    self._active.add(task)
+                    task.add_done_callback(self._active.discard)
+
+                if not jobs:
+                    await self._wait_stop(self.poll_interval)
+        finally:
+            recovery.cancel()
+            if self._active:
+                await asyncio.wait(self._active)
+            logger.info(f"Prediction worker {self.worker_id} stopped")
+
+    def stop(self):
+        self._stopping.set()
+
+    async def _wait_stop(self, timeout: float):
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _process(self, job: Dict[str, Any]):
+        job_id = str(job['id'])
+        heartbeat = asyncio.ensure_future(self._heartbeat(job_id))
+        try:
+            await self.handler(job)
+        except Exception as e:
+            delay = min(self.retry_max_delay, self.retry_base_delay * 2 ** max(job['attempts'] - 1, 0))
+            logger.error(f"Prediction job {job_id} failed (attempt {job['attempts']}): {e}")
+            await self._finish(self.data_manager.fail_job(
+                job_id, self.worker_id, str(e), timedelta(seconds=delay)
+            ), job_id)
+        else:
+            if not await self._finish(self.data_manager.complete_job(job_id, self.worker_id), job_id):
+                logger.warning(f"Prediction job {job_id} finished after its lease was lost")
+        finally:
+            heartbeat.cancel()
+
+    async def _finish(self, update: Awaitable[Any], job_id: str) -> Any:
+        # 상태 갱신 실패 시 임대 만료 후 recovery 루프가 작업을 다시 대기 상태로 돌린다
+        try:
+            return await update
+        except Exception as e:
+            logger.error(f"Prediction job {job_id} status update error: {e}")
+            return None
+
+    async def _heartbeat(self, job_id: str):
+        interval = self.lease.total_seconds() / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if not await self.data_manager.renew_job_lease(job_id, self.worker_id, self.lease):
+                    logger.warning(f"Lease lost for prediction job {job_id}")
+                    return
+            except Exception as e:
+                logger.error(f"Lease renewal error for job {job_id}: {e}")
+
+    async def _recovery_loop(self):
+        while True:
+            try:
+                recovered = await self.data_manager.recover_stuck_jobs()
+                if recovered:
+                    logger.warning(f"Recovered {recovered} prediction jobs with expired leases")
+            except Exception as e:
+                logger.error(f"Stuck job recovery error: {e}")
+            await asyncio.sleep(self.lease.total_seconds())
+
+_prediction_service = None
+
+def _get_prediction_service():
+    global _prediction_service
+    if _prediction_service is None:
+        from .advanced_prediction_service import AdvancedPredictionService
+        _prediction_service = AdvancedPredictionService()
+    return _prediction_service
+
+async def run_prediction_job(job: Dict[str, Any]):
+    """큐 작업 처리: 저장된 변수로 다중 변수 예측을 실행하고 결과 저장"""
+    job_id = str(job['id'])
+    # 방금 등록된 작업의 변수가 복제본에 아직 없을 수 있으므로 프라이머리에서 읽는다
+    detail = await prediction_data_manager.get_prediction_job(job_id, primary=True)
+    if detail is None:
+        raise LookupError(f"Prediction job not found: {job_id}")
+    variables = [
+        PredictionVariable(
+            name=var['variable_name'],
+            type=var['variable_type'],
+            weight=float(var['weight']),
+            data_source=var['data_source'],
+            update_frequency=var['update_frequency']
+        )
+        for var in detail['variables']
+    ]
+    result = await _get_prediction_service().predict_multi_variable(
+        shipper_id=job['shipper_id'],
+        variables=variables,
+        prediction_horizon=job['prediction_horizon'],
+        confidence_level=float(job['confidence_level'])
+    )
+    await prediction_data_manager.save_prediction_response(job_id, result)
+
+async def main():
+    worker = PredictionJobWorker(
+        prediction_data_manager,
+        run_prediction_job,
+        concurrency=int(os.getenv('WORKER_CONCURRENCY', '4')),
+        lease_seconds=float(os.getenv('WORKER_LEASE_SECONDS', '60')),
+        poll_interval=float(os.getenv('WORKER_POLL_INTERVAL', '2'))
+    )
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+
+    await db_manager.initialize()
+    try:
+        await worker.run()
+    finally:
+        await db_manager.close()
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
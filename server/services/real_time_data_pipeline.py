@@ -1,15 +1,458 @@
 # server/services/real_time_data_pipeline.py
 import asyncio
-import aiohttp
-import logging
-from typing import Dict, List, Any, Optional, AsyncGenerator
-from datetime import datetime, timedelta
-import json
 import hashlib
-from dataclasses import dataclass, asdict
+import json
+import logging
+import os
+import signal
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from enum import Enum
-import feedparser
-import tweepy
-import praw
-import yfinance as yf
-from kafka import KafkaProducer, KafkaCon
\ No newline at end of file
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Union
+
+from ..database.database_manager import ExternalDataManager, Histogram, db_manager, external_data_manager
+
+logger = logging.getLogger(__name__)
+
+class PipelineState(Enum):
+    CREATED = "created"
+    RUNNING = "running"
+    DRAINING = "draining"
+    STOPPED = "stopped"
+
+@dataclass
+class DataEvent:
+    """파이프라인을 흐르는 외부 데이터 이벤트 (external_data 한 행)"""
+    source_id: str
+    data_key: str
+    data_value: Dict[str, Any]
+    data_timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    quality_score: Optional[float] = None
+
+    def fingerprint(self) -> str:
+        payload = json.dumps(self.data_value, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha1(
+            f"{self.source_id}|{self.data_key}|{self.data_timestamp.isoformat()}|{payload}".encode()
+        ).hexdigest()
+
+    def to_entry(self) -> Dict[str, Any]:
+        return {
+            'data_key': self.data_key,
+            'data_value': self.data_value,
+            'data_timestamp': self.data_timestamp,
+            'quality_score': self.quality_score
+        }
+
+# 변환 단계: 이벤트를 받아 수정된 이벤트 또는 None(폐기) 반환 (동기/비동기 모두 허용)
+Transform = Callable[[DataEvent], Union[Optional[DataEvent], Awaitable[Optional[DataEvent]]]]
+# 품질 점수 계산: 0~1 점수 반환 (동기/비동기 모두 허용)
+Scorer = Callable[[DataEvent], Union[float, Awaitable[float]]]
+
+class DataSource(ABC):
+    """파이프라인 소스 인터페이스 (events() 가 이벤트를 비동기로 생성)"""
+
+    name = 'source'
+
+    @abstractmethod
+    def events(self) -> AsyncIterator[DataEvent]:
+        pass
+
+class PollingSource(DataSource):
+    """fetch() 를 interval 마다 호출해 반환된 이벤트들을 내보내는 소스"""
+
+    def __init__(self, name: str, fetch: Callable[[], Awaitable[List[DataEvent]]],
+                 interval: float = 60.0, error_delay: float = 5.0):
+        self.name = name
+        self.fetch = fetch
+        self.interval = interval
+        self.error_delay = error_delay
+
+    async def events(self) -> AsyncIterator[DataEvent]:
+        while True:
+            started = time.monotonic()
+            try:
+                batch = await self.fetch()
+            except Exception as e:
+                logger.error(f"Source {self.name} fetch error: {e}")
+                await asyncio.sleep(self.error_delay)
+                continue
+            for event in batch:
+                yield event
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+class RSSFeedSource(PollingSource):
+    """RSS/Atom 뉴스 피드 소스 (aiohttp, feedparser 필요)"""
+
+    def __init__(self, name: str, source_id: str, url: str, interval: float = 300.0):
+        super().__init__(name, self._fetch_feed, interval)
+        self.source_id = source_id
+        self.url = url
+        self._session = None
+
+    async def _fetch_feed(self) -> List[DataEvent]:
+        import aiohttp
+        import feedparser
+
+        if self._session is None:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30))
+        async with self._session.get(self.url) as response:
+            response.raise_for_status()
+            body = await response.read()
+
+        feed = await asyncio.to_thread(feedparser.parse, body)
+        events = []
+        for entry in feed.entries:
+            published = entry.get('published_parsed') or entry.get('updated_parsed')
+            events.append(DataEvent(
+                source_id=self.source_id,
+                data_key=entry.get('id') or entry.get('link', ''),
+                data_value={
+                    'title': entry.get('title'),
+                    'summary': entry.get('summary'),
+                    'link': entry.get('link')
+                },
+                data_timestamp=(
+                    datetime(*published[:6], tzinfo=timezone.utc) if published else datetime.now(timezone.utc)
+                )
+            ))
+        return events
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+
+class RealTimeDataPipeline:
+    """실시간 외부 데이터 수집 파이프라인
+
+    소스 태스크 → [raw 큐] → 변환/점수 워커 → [sink 큐] → 마이크로배치 sink → save_external_data
+
+    큐는 모두 크기가 제한되어 있어 DB 쓰기가 느려지면 sink 큐, raw 큐 순으로 가득 차고
+    소스가 put 에서 대기하므로(backpressure) 메모리 사용량이 큐 크기와 배치 크기로 제한된다.
+    sink 는 source_id 별로 batch_size 또는 flush_interval 기준으로 모아 쓰고, 동시 쓰기 수는
+    sink_concurrency 로 제한된다. stop() 은 소스를 멈춘 뒤 큐에 남은 이벤트를 모두 기록하고 종료한다.
+    """
+
+    WRITE_LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(
+        self,
+        data_manager: ExternalDataManager,
+        transforms: Optional[List[Transform]] = None,
+        scorer: Optional[Scorer] = None,
+        queue_size: int = 10000,
+        transform_concurrency: int = 4,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        sink_concurrency: int = 2,
+        max_write_retries: int = 3,
+        retry_base_delay: float = 0.5,
+        dedup_window: int = 100000
+    ):
+        self.data_manager = data_manager
+        self.transforms = transforms or []
+        self.scorer = scorer
+        self.transform_concurrency = transform_concurrency
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_write_retries = max_write_retries
+        self.retry_base_delay = retry_base_delay
+        self.dedup_window = dedup_window
+
+        self._sources: List[DataSource] = []
+        self._raw_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._sink_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._write_slots = asyncio.Semaphore(sink_concurrency)
+        self._draining = asyncio.Event()
+        self._recent: OrderedDict = OrderedDict()
+
+        self._source_tasks: Set[asyncio.Task] = set()
+        self._transform_tasks: Set[asyncio.Task] = set()
+        self._write_tasks: Set[asyncio.Task] = set()
+        self._sink_task: Optional[asyncio.Task] = None
+
+        self.state = PipelineState.CREATED
+        self.write_latency_ms = Histogram(self.WRITE_LATENCY_BUCKETS_MS)
+        self.stats = {
+            'received': 0, 'dropped': 0, 'deduplicated': 0, 'transform_errors': 0,
+            'batches': 0, 'written': 0, 'inserted': 0, 'write_retries': 0, 'write_failed': 0,
+            'source_blocked_seconds': 0.0
+        }
+
+    def add_source(self, source: DataSource):
+        self._sources.append(source)
+        if self.state == PipelineState.RUNNING:
+            self._start_source(source)
+
+    async def start(self):
+        if self.state != PipelineState.CREATED:
+            raise RuntimeError(f"Pipeline already {self.state.value}")
+        self.state = PipelineState.RUNNING
+        self._sink_task = asyncio.ensure_future(self._sink_loop())
+        for i in range(self.transform_concurrency):
+            self._transform_tasks.add(asyncio.ensure_future(self._transform_loop()))
+        for source in self._sources:
+            self._start_source(source)
+        logger.info(f"Real-time data pipeline started with {len(self._sources)} sources")
+
+    async def stop(self, drain_timeout: Optional[float] = 30.0):
+        """소스 중지 후 큐에 남은 이벤트를 기록하고 종료 (drain_timeout 초과 시 남은 이벤트 폐기)"""
+        if self.state != PipelineState.RUNNING:
+            return
+        self.state = PipelineState.DRAINING
+        self._draining.set()
+
+        for task in self._source_tasks:
+            task.cancel()
+        await asyncio.gather(*self._source_tasks, return_exceptions=True)
+
+        try:
+            await asyncio.wait_for(self._drain(), drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Pipeline drain timed out with {self._raw_queue.qsize()} raw and "
+                f"{self._sink_queue.qsize()} pending events"
+            )
+
+        for task in [*self._transform_tasks, self._sink_task, *self._write_tasks]:
+            task.cancel()
+        await asyncio.gather(
+            *self._transform_tasks, self._sink_task, *self._write_tasks, return_exceptions=True
+        )
+        for source in self._sources:
+            close = getattr(source, 'close', None)
+            if close is not None:
+                await close()
+
+        self.state = PipelineState.STOPPED
+        logger.info(f"Real-time data pipeline stopped: {self.stats}")
+
+    async def _drain(self):
+        await self._raw_queue.join()
+        await self._sink_queue.join()
+
+    async def publish(self, event: DataEvent):
+        """외부에서 이벤트 직접 투입 (큐가 가득 차면 대기)"""
+        await self._enqueue(event)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'state': self.state.value,
+            'sources': len(self._sources),
+            'raw_queue': self._raw_queue.qsize(),
+            'sink_queue': self._sink_queue.qsize(),
+            'queue_capacity': self._raw_queue.maxsize,
+            'active_writes': len(self._write_tasks),
+            **{k: round(v, 3) if isinstance(v, float) else v for k, v in self.stats.items()},
+            'write_latency_ms': self.write_latency_ms.snapshot()
+        }
+
+    # ============= 소스 =============
+
+    def _start_source(self, source: DataSource):
+        task = asyncio.ensure_future(self._source_loop(source))
+        self._source_tasks.add(task)
+        task.add_done_callback(self._source_tasks.discard)
+
+    async def _source_loop(self, source: DataSource):
+        try:
+            async for event in source.events():
+                await self._enqueue(event)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Source {source.name} stopped with error: {e}")
+
+    async def _enqueue(self, event: DataEvent):
+        if self._raw_queue.full():
+            started = time.monotonic()
+            await self._raw_queue.put(event)
+            self.stats['source_blocked_seconds'] += time.monotonic() - started
+        else:
+            self._raw_queue.put_nowait(event)
+        self.stats['received'] += 1
+
+    # ============= 변환/점수 =============
+
+    async def _transform_loop(self):
+        while True:
+            event = await self._raw_queue.get()
+            try:
+                event = await self._process(event)
+                if event is not None:
+                    await self._sink_queue.put(event)
+            except Exception as e:
+                self.stats['transform_errors'] += 1
+                logger.error(f"Pipeline transform error ({event.data_key}): {e}")
+            finally:
+                self._raw_queue.task_done()
+
+    async def _process(self, event: DataEvent) -> Optional[DataEvent]:
+        for transform in self.transforms:
+            event = transform(event)
+            if asyncio.iscoroutine(event):
+                event = await event
+            if event is None:
+                self.stats['dropped'] += 1
+                return None
+
+        if self._is_duplicate(event):
+            self.stats['deduplicated'] += 1
+            return None
+
+        if self.scorer is not None and event.quality_score is None:
+            score = self.scorer(event)
+            if asyncio.iscoroutine(score):
+                score = await score
+            event.quality_score = max(0.0, min(1.0, float(score)))
+        return event
+
+    def _is_duplicate(self, event: DataEvent) -> bool:
+        if self.dedup_window <= 0:
+            return False
+        key = event.fingerprint()
+        if key in self._recent:
+            self._recent.move_to_end(key)
+            return True
+        self._recent[key] = None
+        if len(self._recent) > self.dedup_window:
+            self._recent.popitem(last=False)
+        return False
+
+    # ============= sink =============
+
+    async def _sink_loop(self):
+        pending: Dict[str, List[DataEvent]] = defaultdict(list)
+        oldest: Dict[str, float] = {}
+        # wait_for 취소로 꺼낸 이벤트를 잃지 않도록 get 태스크를 재사용
+        getter: Optional[asyncio.Task] = None
+        drain_waiter = asyncio.ensure_future(self._draining.wait())
+        try:
+            while True:
+                timeout = None
+                if oldest:
+                    timeout = max(0.0, min(oldest.values()) + self.flush_interval - time.monotonic())
+                if getter is None:
+                    getter = asyncio.ensure_future(self._sink_queue.get())
+                waiters = {getter} if drain_waiter.done() else {getter, drain_waiter}
+                done, _ = await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if getter in done:
+                    # 이미 큐에 쌓인 이벤트는 대기 없이 한꺼번에 꺼냄
+                    events, getter = [getter.result()], None
+                    while len(events) < self.batch_size and not self._sink_queue.empty():
+                        events.append(self._sink_queue.get_nowait())
+                    full = False
+                    for event in events:
+                        pending[event.source_id].append(event)
+                        oldest.setdefault(event.source_id, time.monotonic())
+                        full = full or len(pending[event.source_id]) >= self.batch_size
+                    # drain 중에는 큐가 비는 즉시 남은 배치를 기록
+                    if not full and (self.state == PipelineState.RUNNING or not self._sink_queue.empty()):
+                        continue
+
+                await self._flush(pending, oldest)
+        finally:
+            drain_waiter.cancel()
+            if getter is not None:
+                getter.cancel()
+
+    async def _flush(self, pending: Dict[str, List[DataEvent]], oldest: Dict[str, float]):
+
+        now = time.monotonic()
+        for source_id in list(pending):
+            events = pending[source_id]
+            due = now - oldest[source_id] >= self.flush_interval or self.state == PipelineState.DRAINING
+            # 한 번에 꺼낸 이벤트로 batch_size 를 넘길 수 있으므로 batch_size 단위로 나눠 기록
+            while len(events) >= self.batch_size or (events and due):
+                batch, events = events[:self.batch_size], events[self.batch_size:]
+                # 쓰기 슬롯이 없으면 여기서 대기하므로 sink 큐가 차면서 상류로 backpressure 전달
+                await self._write_slots.acquire()
+                task = asyncio.ensure_future(self._write(source_id, batch))
+                self._write_tasks.add(task)
+                task.add_done_callback(self._write_tasks.discard)
+            if events:
+                pending[source_id] = events
+            else:
+                del pending[source_id]
+                del oldest[source_id]
+
+    async def _write(self, source_id: str, batch: List[DataEvent]):
+        try:
+            entries = [event.to_entry() for event in batch]
+            for attempt in range(self.max_write_retries + 1):
+                started = time.perf_counter()
+                try:
+                    inserted = await self.data_manager.save_external_data(source_id, entries)
+                except Exception as e:
+                    if attempt == self.max_write_retries:
+                        self.stats['write_failed'] += len(batch)
+                        logger.error(f"Pipeline write failed for {len(batch)} events ({source_id}): {e}")
+                        return
+                    self.stats['write_retries'] += 1
+                    await asyncio.sleep(self.retry_base_delay * 2 ** attempt)
+                    continue
+
+                self.write_latency_ms.observe((time.perf_counter() - started) * 1000)
+                self.stats['batches'] += 1
+                self.stats['written'] += len(batch)
+                self.stats['inserted'] += inserted
+                return
+        finally:
+            self._write_slots.release()
+            for _ in batch:
+                self._sink_queue.task_done()
+
+# external_data_sources.update_frequency -> 폴링 간격(초)
+UPDATE_INTERVALS = {
+    'real_time': 60.0,
+    'hourly': 3600.0,
+    'daily': 86400.0
+}
+
+def build_sources(rows: List[Dict[str, Any]]) -> List[DataSource]:
+    """external_data_sources 행으로 파이프라인 소스 생성 (지원하지 않는 유형은 건너뜀)"""
+    sources: List[DataSource] = []
+    for row in rows:
+        if row['source_type'] == 'rss':
+            sources.append(RSSFeedSource(
+                name=row['source_name'],
+                source_id=str(row['id']),
+                url=row['api_endpoint'],
+                interval=UPDATE_INTERVALS.get(row['update_frequency'], 300.0)
+            ))
+        else:
+            logger.warning(f"Unsupported pipeline source type: {row['source_type']} ({row['source_name']})")
+    return sources
+
+async def main():
+    # 변환/점수기는 의도적으로 연결하지 않는다. 트리에 구현된 변환이나 점수기가 없어서,
+    # 이벤트는 원본 그대로(quality_score 없음) 저장된다
+    pipeline = RealTimeDataPipeline(
+        external_data_manager,
+        queue_size=int(os.getenv('PIPELINE_QUEUE_SIZE', '10000')),
+        transform_concurrency=int(os.getenv('PIPELINE_TRANSFORM_CONCURRENCY', '4')),
+        batch_size=int(os.getenv('PIPELINE_BATCH_SIZE', '500')),
+        flush_interval=float(os.getenv('PIPELINE_FLUSH_INTERVAL', '1.0')),
+        sink_concurrency=int(os.getenv('PIPELINE_SINK_CONCURRENCY', '2'))
+    )
+    stop_requested = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_requested.set)
+
+    await db_manager.initialize()
+    try:
+        for source in build_sources(await external_data_manager.get_active_sources()):
+            pipeline.add_source(source)
+        await pipeline.start()
+        await stop_requested.wait()
+    finally:
+        await pipeline.stop(drain_timeout=float(os.getenv('PIPELINE_DRAIN_TIMEOUT', '30')))
+        await db_manager.close()
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
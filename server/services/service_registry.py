@@ -0,0 +1,71 @@
+# server/services/service_registry.py
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict
+
+from ..database.database_manager import Histogram
+
+logger = logging.getLogger(__name__)
+
+class ServiceRegistry:
+    """애플리케이션 수명 동안 공유되는 서비스 싱글톤
+
+    시작 비용(서비스 생성)과 정상 상태 요청 지연을 따로 집계한다.
+    """
+
+    LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+    def __init__(self):
+        self._services: Dict[str, Any] = {}
+        self.startup_timings: Dict[str, float] = {}
+        self.request_latency_ms: Dict[str, Histogram] = {}
+        self.started = False
+
+    def get(self, name: str, factory: Callable[[], Any]) -> Any:
+        """서비스 싱글톤 조회 (없으면 생성)"""
+        service = self._services.get(name)
+        if service is None:
+            start = time.perf_counter()
+            service = self._services[name] = factory()
+            self.startup_timings[f"{name}_init_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        return service
+
+    async def startup(self, factories: Dict[str, Callable[[], Any]]):
+        """서비스 생성"""
+        start = time.perf_counter()
+        for name, factory in factories.items():
+            self.get(name, factory)
+        self.startup_timings['total_ms'] = round((time.perf_counter() - start) * 1000, 3)
+        self.started = True
+        logger.info(f"Services started in {self.startup_timings['total_ms']}ms")
+
+    async def shutdown(self):
+        for name, service in self._services.items():
+            close = getattr(service, 'close', None)
+            if close is None:
+                continue
+            try:
+                result = close()
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Service shutdown error ({name}): {e}")
+        self._services.clear()
+        self.started = False
+
+    def observe_request(self, label: str, latency_ms: float):
+        histogram = self.request_latency_ms.get(label)
+        if histogram is None:
+            histogram = self.request_latency_ms[label] = Histogram(self.LATENCY_BUCKETS_MS)
+        histogram.observe(latency_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'started': self.started,
+            'startup': self.startup_timings,
+            'steady_state': {
+                label: histogram.snapshot()
+                for label, histogram in self.request_latency_ms.items()
+            }
+        }
@@ -0,0 +1,39 @@
+# server/services/single_flight.py
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+class SingleFlight:
+    """동일 키 동시 호출 병합 (single-flight)
+
+    같은 키로 진행 중인 계산이 있으면 새로 시작하지 않고 그 결과를 함께 기다린다.
+    대기자는 asyncio.shield 로 기다리므로 한 대기자가 취소되어도 공유 작업은 계속 실행된다.
+    작업이 끝나면 키가 해제되어 다음 호출은 새로 계산한다.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.stats = {'executions': 0, 'coalesced': 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._release(key, done))
+            self.stats['executions'] += 1
+        else:
+            self.stats['coalesced'] += 1
+        return await asyncio.shield(task)
+
+    def _release(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # 모든 대기자가 취소된 경우에도 예외가 미처리 경고로 남지 않도록 회수
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"Single-flight task for {key} failed: {task.exception()}")
+
+    def inflight_count(self) -> int:
+        return len(self._inflight)
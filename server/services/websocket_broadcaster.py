@@ -0,0 +1,155 @@
+# server/services/websocket_broadcaster.py
+import asyncio
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+class Broadcaster:
+    """키별 공유 발행자
+
+    키마다 하나의 발행 태스크가 interval 간격으로 producer(key) 를 한 번 계산하고,
+    결과를 모든 구독자의 제한된 큐로 전달한다. 큐가 가득 찬 느린 구독자는 가장 오래된
+    값을 버리고 최신 값만 받는다(coalesce). 발행 태스크는 첫 구독 시 시작되고 마지막
+    구독 해제 시 종료된다. producer 예외는 구독자 큐로 전달된다.
+    """
+
+    def __init__(
+        self,
+        producer: Callable[[Hashable], Awaitable[Any]],
+        interval: float,
+        queue_size: int = 1
+    ):
+        self.producer = producer
+        self.interval = interval
+        self.queue_size = queue_size
+        self._subscribers: Dict[Hashable, Set[asyncio.Queue]] = {}
+        self._publishers: Dict[Hashable, asyncio.Task] = {}
+        self._latest: Dict[Hashable, Any] = {}
+
+    @asynccontextmanager
+    async def subscribe(self, key: Hashable):
+        """구독 컨텍스트 (값을 받을 asyncio.Queue 반환)"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        subscribers = self._subscribers.setdefault(key, set())
+        subscribers.add(queue)
+
+        if key in self._latest:
+            self._offer(queue, self._latest[key])
+        if key not in self._publishers:
+            self._publishers[key] = asyncio.ensure_future(self._publish(key))
+
+        try:
+            yield queue
+        finally:
+            subscribers.discard(queue)
+            if not subscribers:
+                self._stop(key)
+
+    def subscriber_count(self, key: Optional[Hashable] = None) -> int:
+        if key is not None:
+            return len(self._subscribers.get(key, ()))
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def _stop(self, key: Hashable):
+        self._subscribers.pop(key, None)
+        self._latest.pop(key, None)
+        publisher = self._publishers.pop(key, None)
+        if publisher and publisher is not asyncio.current_task():
+            publisher.cancel()
+
+    async def _publish(self, key: Hashable):
+        while self._subscribers.get(key):
+            try:
+                value = await self.producer(key)
+                self._latest[key] = value
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Broadcast producer error for {key}: {e}")
+                value = e
+
+            for queue in list(self._subscribers.get(key, ())):
+                self._offer(queue, value)
+            await asyncio.sleep(self.interval)
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, value: Any):
+        if queue.full():
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+        queue.put_nowait(value)
+
+def _escape_pointer(key: Any) -> str:
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+def json_diff(old: Any, new: Any, path: str = "") -> List[Dict[str, Any]]:
+    """JSON Patch(RFC 6902) 형식의 변경 목록 생성 (dict 는 재귀 비교, 그 외는 통째로 교체)"""
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops: List[Dict[str, Any]] = []
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape_pointer(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape_pointer(key)}"
+            if key not in old:
+                ops.append({"op": "add", "path": child, "value": value})
+            else:
+                ops.extend(json_diff(old[key], value, child))
+        return ops
+    if old == new and type(old) is type(new):
+        return []
+    return [{"op": "replace", "path": path, "value": new}]
+
+@dataclass
+class SnapshotFrame:
+    """한 틱의 직렬화된 스냅샷과 직전 버전 대비 델타"""
+    version: int
+    snapshot: str
+    delta: Optional[str] = None
+    base_version: Optional[int] = None
+
+class SnapshotDeltaEncoder:
+    """스냅샷을 버전 프레임으로 인코딩
+
+    변경이 없으면 직전 프레임을 그대로 반환하므로 버전이 유지된다. 직렬화는 틱당 한 번만 한다.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self._previous: Any = None
+        self._frame: Optional[SnapshotFrame] = None
+
+    def encode(self, snapshot: Any) -> SnapshotFrame:
+        if self._frame is not None:
+            ops = json_diff(self._previous, snapshot)
+            if not ops:
+                return self._frame
+        else:
+            ops = None
+
+        self.version += 1
+        frame = SnapshotFrame(
+            version=self.version,
+            snapshot=self._dumps({"type": "snapshot", "version": self.version, "data": snapshot})
+        )
+        if ops is not None:
+            frame.base_version = self._frame.version
+            frame.delta = self._dumps({
+                "type": "delta",
+                "version": self.version,
+                "base_version": frame.base_version,
+                "ops": ops
+            })
+        self._previous = snapshot
+        self._frame = frame
+        return frame
+
+    @staticmethod
+    def _dumps(payload: Any) -> str:
+        return json.dumps(payload, separators=(",", ":"), default=str)
@@ -0,0 +1,9 @@
+# server/tests/conftest.py
+import os
+import sys
+
+# 서비스 모듈은 server 패키지 상대 임포트를, 감정 인식 서버는 server 디렉터리 기준 임포트를 사용
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (SERVER_DIR, os.path.dirname(SERVER_DIR)):
+    if path not in sys.path:
+        sys.path.insert(0, path)
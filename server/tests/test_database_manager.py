@@ -0,0 +1,131 @@
+# server/tests/test_database_manager.py
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+pytest.importorskip("asyncpg")
+
+from server.database.database_manager import DatabaseConfig, DatabaseManager, TTLCache
+
+
+class FakeConnection:
+    """bulk_write 가 보내는 SQL 과 COPY 호출을 기록하는 연결"""
+
+    def __init__(self, in_transaction=False):
+        self.in_transaction = in_transaction
+        self.transactions = 0
+        self.copies = []
+        self.statements = []
+
+    def is_in_transaction(self):
+        return self.in_transaction
+
+    @asynccontextmanager
+    async def transaction(self):
+        self.transactions += 1
+        self.in_transaction = True
+        try:
+            yield
+        finally:
+            self.in_transaction = False
+
+    async def copy_records_to_table(self, table, records, columns):
+        self.copies.append((table, list(records), list(columns)))
+
+    async def execute(self, sql):
+        self.statements.append(" ".join(sql.split()))
+        return "INSERT 0 2"
+
+
+def bulk_write(conn, **kwargs):
+    manager = DatabaseManager(DatabaseConfig())
+    return asyncio.run(manager.bulk_write(conn, **kwargs))
+
+
+def test_bulk_write_without_conflict_copies_directly():
+    conn = FakeConnection()
+    written = bulk_write(
+        conn, table="prediction_results", columns=["job_id", "value"],
+        records=[("j1", 1.0), ("j1", 2.0)]
+    )
+
+    assert written == 2
+    assert conn.copies == [("prediction_results", [("j1", 1.0), ("j1", 2.0)], ["job_id", "value"])]
+    assert conn.statements == []
+    assert conn.transactions == 0
+
+
+def test_bulk_write_skips_empty_batches():
+    conn = FakeConnection()
+    assert bulk_write(conn, table="t", columns=["a"], records=[], conflict_columns=["a"]) == 0
+    assert conn.copies == [] and conn.statements == []
+
+
+def test_bulk_write_upsert_keeps_last_row_per_key():
+    conn = FakeConnection()
+    written = bulk_write(
+        conn, table="feature_importance", columns=["job_id", "feature_name", "score"],
+        records=[("j1", "price", 0.1), ("j1", "price", 0.2)],
+        conflict_columns=["job_id", "feature_name"], update_columns=["score"]
+    )
+
+    assert written == 2
+    assert conn.transactions == 1
+    assert conn.copies[0][0] == "_bulk_stage_feature_importance"
+    create, merge = conn.statements
+    assert "CREATE TEMP TABLE IF NOT EXISTS _bulk_stage_feature_importance" in create
+    assert "(LIKE feature_importance INCLUDING DEFAULTS) ON COMMIT DELETE ROWS" in create
+    assert "TRUNCATE _bulk_stage_feature_importance" in create
+    assert (
+        "INSERT INTO feature_importance (job_id, feature_name, score) "
+        "SELECT DISTINCT ON (job_id, feature_name) job_id, feature_name, score "
+        "FROM _bulk_stage_feature_importance "
+        "ORDER BY job_id, feature_name, ctid DESC "
+        "ON CONFLICT (job_id, feature_name) DO UPDATE SET score = EXCLUDED.score"
+    ) == merge
+
+
+def test_bulk_write_insert_only_keeps_first_row_per_key():
+    conn = FakeConnection(in_transaction=True)
+    bulk_write(
+        conn, table="key_topics", columns=["job_id", "topic"],
+        records=[("j1", "rates"), ("j1", "rates")], conflict_columns=["job_id", "topic"]
+    )
+
+    # 이미 트랜잭션 안이면 새 트랜잭션을 열지 않는다
+    assert conn.transactions == 0
+    merge = conn.statements[-1]
+    assert "ORDER BY job_id, topic, ctid ASC" in merge
+    assert merge.endswith("ON CONFLICT (job_id, topic) DO NOTHING")
+
+
+def test_ttl_cache_invalidate_discards_stale_generation():
+    cache = TTLCache(max_size=4, ttl=60.0)
+    generation = cache.generation
+    cache.set("events", ["old"], generation=generation)
+    assert cache.get("events") == ["old"]
+
+    # 무효화 전에 시작된 조회 결과는 다시 저장되지 않는다
+    started = cache.generation
+    cache.invalidate()
+    cache.set("events", ["stale"], generation=started)
+    assert cache.get("events") is None
+    assert len(cache) == 0
+
+    cache.set("events", ["fresh"], generation=cache.generation)
+    assert cache.get("events") == ["fresh"]
+
+
+def test_ttl_cache_expires_and_evicts_least_recently_used():
+    cache = TTLCache(max_size=2, ttl=60.0)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+    expired = TTLCache(ttl=0.0)
+    expired.set("a", 1)
+    assert expired.get("a") is None
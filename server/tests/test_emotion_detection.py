@@ -0,0 +1,155 @@
+# server/tests/test_emotion_detection.py
+import threading
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2")
+pytest.importorskip("flask_cors")
+
+import emotion_detection
+from emotion_backends import EMOTION_INPUT_SIZE
+from emotion_detection import InferenceBatcher, PerceptualHashCache, crop_face
+
+
+def fer_preprocess(gray_img, box, offsets=(10, 10), padding=40):
+    """FER 22.5.1 detect_emotions 의 얼굴 전처리 (이미지 전체 패딩 후 자르기)"""
+    bottom = gray_img[gray_img.shape[0] - 2:gray_img.shape[0], 0:gray_img.shape[1]]
+    mean = cv2.mean(bottom)[0]
+    padded = cv2.copyMakeBorder(
+        gray_img, padding, padding, padding, padding, cv2.BORDER_CONSTANT, value=[mean, mean, mean]
+    )
+    x, y, w, h = emotion_detection.to_square(box)
+    x1, x2 = x - offsets[0] + padding, x + w + offsets[0] + padding
+    y1, y2 = y - offsets[1] + padding, y + h + offsets[1] + padding
+    x1, y1 = max(x1, 0), max(y1, 0)
+    gray_face = padded[y1:y2, x1:x2]
+    if gray_face.size == 0:
+        return None
+    gray_face = cv2.resize(gray_face, EMOTION_INPUT_SIZE).astype('float32')
+    return ((gray_face / 255.0 - 0.5) * 2.0)[..., np.newaxis]
+
+
+@pytest.mark.parametrize("box", [
+    (60, 40, 50, 50),     # 안쪽
+    (2, 3, 40, 60),       # 왼쪽 위 가장자리 (직사각형)
+    (130, 90, 45, 30),    # 오른쪽 아래로 넘침
+    (-30, -20, 20, 20),   # 왼쪽 위 패딩 영역에만 걸침
+    (175, 130, 10, 10),   # 오른쪽 아래 패딩 영역에만 걸침
+    (0, 0, 160, 120),     # 이미지 전체
+])
+def test_crop_face_matches_fer_preprocessing(box):
+    rng = np.random.default_rng(0)
+    gray = rng.integers(0, 256, size=(120, 160), dtype=np.uint8)
+
+    expected = fer_preprocess(gray, box)
+    actual = crop_face(gray, box)
+    assert actual.shape == (*EMOTION_INPUT_SIZE, 1)
+    np.testing.assert_array_equal(actual, expected)
+
+
+def test_crop_face_returns_none_outside_padding():
+    gray = np.zeros((120, 160), dtype=np.uint8)
+    assert crop_face(gray, (400, 400, 20, 20)) is None
+    assert fer_preprocess(gray, (400, 400, 20, 20)) is None
+
+
+def faces_filled(value, count=1):
+    return np.full((count, *EMOTION_INPUT_SIZE, 1), value, dtype=np.float32)
+
+
+def test_batcher_groups_concurrent_requests_and_splits_results():
+    batch_sizes = []
+
+    def classify(faces):
+        batch_sizes.append(len(faces))
+        return faces.reshape(len(faces), -1)[:, :1]
+
+    batcher = InferenceBatcher(classify, max_batch_size=32, max_wait_ms=50)
+    results = {}
+
+    def submit(value):
+        results[value] = batcher.predict(faces_filled(value, count=value), timeout=5)
+
+    threads = [threading.Thread(target=submit, args=(value,)) for value in range(1, 6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for value, predictions in results.items():
+        assert predictions.shape == (value, 1)
+        assert (predictions == value).all()
+    assert sum(batch_sizes) == 15
+    assert len(batch_sizes) < 5
+    assert batcher.stats['requests'] == 5
+
+
+def test_batcher_respects_max_batch_size():
+    batch_sizes = []
+
+    def classify(faces):
+        batch_sizes.append(len(faces))
+        time.sleep(0.01)
+        return np.zeros((len(faces), 7))
+
+    batcher = InferenceBatcher(classify, max_batch_size=4, max_wait_ms=50)
+    threads = [
+        threading.Thread(target=batcher.predict, args=(faces_filled(0, count=2), 5))
+        for _ in range(6)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(batch_sizes) == 12
+    assert max(batch_sizes) <= 4
+
+
+def test_batcher_propagates_classifier_errors():
+    def classify(faces):
+        raise RuntimeError("model crashed")
+
+    batcher = InferenceBatcher(classify, max_wait_ms=1)
+    with pytest.raises(RuntimeError, match="model crashed"):
+        batcher.predict(faces_filled(1), timeout=5)
+
+
+def gradient_face(reverse=False):
+    row = np.linspace(-1.0, 1.0, EMOTION_INPUT_SIZE[0], dtype=np.float32)
+    face = np.tile(row[::-1] if reverse else row, (EMOTION_INPUT_SIZE[1], 1))
+    return face[..., np.newaxis]
+
+
+def test_dhash_cache_hits_similar_faces_only():
+    cache = PerceptualHashCache(max_size=8, max_distance=4, ttl=60.0)
+    face = gradient_face()
+    face_hash = PerceptualHashCache.hash_face(face)
+    noisy = face + np.random.default_rng(1).normal(0, 0.01, face.shape).astype(np.float32)
+    other_hash = PerceptualHashCache.hash_face(gradient_face(reverse=True))
+
+    assert cache.get(face_hash) is None
+    cache.put(face_hash, {'happy': 0.9}, cost_ms=12.0)
+
+    assert cache.get(PerceptualHashCache.hash_face(noisy)) == {'happy': 0.9}
+    assert bin(face_hash ^ other_hash).count('1') > 4
+    assert cache.get(other_hash) is None
+
+    snapshot = cache.snapshot()
+    assert snapshot['hits'] == 1 and snapshot['misses'] == 2
+    assert snapshot['estimated_saved_ms'] == 12.0
+
+
+def test_dhash_cache_expires_and_evicts():
+    cache = PerceptualHashCache(max_size=2, max_distance=0, ttl=60.0)
+    for face_hash in (1, 2, 3):
+        cache.put(face_hash, {'neutral': 1.0}, cost_ms=1.0)
+    assert cache.get(1) is None
+    assert cache.get(3) == {'neutral': 1.0}
+
+    expiring = PerceptualHashCache(ttl=0.0)
+    expiring.put(5, {'sad': 1.0}, cost_ms=1.0)
+    assert expiring.get(5) is None
+    assert expiring.snapshot()['size'] == 0
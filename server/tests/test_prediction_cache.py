@@ -0,0 +1,101 @@
+# server/tests/test_prediction_cache.py
+import asyncio
+
+import pytest
+
+pytest.importorskip("asyncpg")
+pytest.importorskip("pydantic")
+
+from server.services.prediction_cache import PredictionCache, prediction_fingerprint
+
+
+class FakeRequest:
+    """prediction_fingerprint 가 사용하는 PredictionRequest 의 dict() 만 흉내 냄"""
+
+    def __init__(self, shipper_id="S1", variables=None):
+        self.shipper_id = shipper_id
+        self.variables = variables or []
+
+    def dict(self):
+        return {'shipper_id': self.shipper_id, 'variables': [dict(var) for var in self.variables]}
+
+
+def test_fingerprint_ignores_variable_order():
+    a = {'name': 'fuel', 'type': 'economic'}
+    b = {'name': 'rates', 'type': 'market'}
+    assert prediction_fingerprint(FakeRequest(variables=[a, b])) == \
+        prediction_fingerprint(FakeRequest(variables=[b, a]))
+    assert prediction_fingerprint(FakeRequest("S1")) != prediction_fingerprint(FakeRequest("S2"))
+
+
+def test_stale_entry_is_served_while_refreshing_once():
+    async def scenario():
+        cache = PredictionCache(ttl=0.05, stale_ttl=10.0)
+        request = FakeRequest()
+        calls = 0
+        release = asyncio.Event()
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            if calls > 1:
+                await release.wait()
+            return {'version': calls}
+
+        assert await cache.get_or_compute(request, compute) == {'version': 1}
+        assert await cache.get_or_compute(request, compute) == {'version': 1}
+        assert cache.stats['hits'] == 1
+
+        await asyncio.sleep(0.06)
+        # 오래된 값은 바로 반환되고 재계산은 키당 한 번만 시작된다
+        assert await cache.get_or_compute(request, compute) == {'version': 1}
+        assert await cache.get_or_compute(request, compute) == {'version': 1}
+        await asyncio.sleep(0)
+        assert calls == 2
+        assert cache.stats['stale_hits'] == 2
+
+        release.set()
+        await asyncio.sleep(0.01)
+        assert await cache.get_or_compute(request, compute) == {'version': 2}
+        assert cache.stats['refreshes'] == 1
+
+    asyncio.run(scenario())
+
+
+def test_failed_refresh_keeps_stale_value():
+    async def scenario():
+        cache = PredictionCache(ttl=0.01, stale_ttl=10.0)
+        request = FakeRequest()
+
+        async def first():
+            return {'version': 1}
+
+        async def failing():
+            raise RuntimeError("model unavailable")
+
+        await cache.get_or_compute(request, first)
+        await asyncio.sleep(0.02)
+        assert await cache.get_or_compute(request, failing) == {'version': 1}
+        await asyncio.sleep(0.01)
+
+        assert cache.stats['refresh_errors'] == 1
+        assert cache.snapshot()['size'] == 1
+
+    asyncio.run(scenario())
+
+
+def test_expired_entry_is_recomputed():
+    async def scenario():
+        cache = PredictionCache(ttl=0.01, stale_ttl=0.02)
+        request = FakeRequest()
+        versions = iter(range(1, 10))
+
+        async def compute():
+            return {'version': next(versions)}
+
+        await cache.get_or_compute(request, compute)
+        await asyncio.sleep(0.03)
+        assert await cache.get_or_compute(request, compute) == {'version': 2}
+        assert cache.stats['misses'] == 2
+
+    asyncio.run(scenario())
@@ -0,0 +1,104 @@
+# server/tests/test_real_time_data_pipeline.py
+import asyncio
+
+import pytest
+
+pytest.importorskip("asyncpg")
+
+from server.services.real_time_data_pipeline import (
+    DataEvent, DataSource, PipelineState, RealTimeDataPipeline
+)
+
+
+class RecordingDataManager:
+    """save_external_data 호출을 기록하는 외부 데이터 저장소"""
+
+    def __init__(self, delay=0.0, failures=0):
+        self.delay = delay
+        self.failures = failures
+        self.batches = []
+
+    async def save_external_data(self, source_id, entries):
+        await asyncio.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("database unavailable")
+        self.batches.append((source_id, entries))
+        return len(entries)
+
+
+class ListSource(DataSource):
+    name = 'list'
+
+    def __init__(self, events):
+        self._events = events
+
+    async def events(self):
+        for event in self._events:
+            yield event
+        await asyncio.Event().wait()
+
+
+def make_event(i, source_id='s1'):
+    return DataEvent(source_id=source_id, data_key=f'k{i}', data_value={'i': i})
+
+
+def test_stop_drains_queued_events_before_flush_interval():
+    async def scenario():
+        data_manager = RecordingDataManager(delay=0.01)
+        pipeline = RealTimeDataPipeline(
+            data_manager, queue_size=10, batch_size=50, flush_interval=60.0, sink_concurrency=1
+        )
+        events = [make_event(i, source_id=f's{i % 2}') for i in range(120)]
+        pipeline.add_source(ListSource(events))
+        await pipeline.start()
+        await asyncio.sleep(0.05)
+        await pipeline.stop(drain_timeout=5.0)
+
+        assert pipeline.state == PipelineState.STOPPED
+        written = [entry['data_key'] for _, entries in data_manager.batches for entry in entries]
+        assert sorted(written) == sorted(event.data_key for event in events)
+        assert all(len(entries) <= 50 for _, entries in data_manager.batches)
+        assert pipeline.stats['received'] == 120
+        assert pipeline.stats['written'] == 120
+
+    asyncio.run(scenario())
+
+
+def test_duplicates_and_dropped_events_are_not_written():
+    async def scenario():
+        data_manager = RecordingDataManager()
+        pipeline = RealTimeDataPipeline(
+            data_manager,
+            transforms=[lambda event: None if event.data_value['i'] == 0 else event],
+            scorer=lambda event: 2.0,
+            flush_interval=60.0
+        )
+        await pipeline.start()
+        duplicate = make_event(1)
+        for event in (make_event(0), duplicate, duplicate, make_event(2)):
+            await pipeline.publish(event)
+        await pipeline.stop(drain_timeout=5.0)
+
+        entries = [entry for _, batch in data_manager.batches for entry in batch]
+        assert [entry['data_key'] for entry in entries] == ['k1', 'k2']
+        assert all(entry['quality_score'] == 1.0 for entry in entries)
+        assert pipeline.stats['dropped'] == 1
+        assert pipeline.stats['deduplicated'] == 1
+
+    asyncio.run(scenario())
+
+
+def test_write_is_retried_after_failure():
+    async def scenario():
+        data_manager = RecordingDataManager(failures=1)
+        pipeline = RealTimeDataPipeline(data_manager, flush_interval=60.0, retry_base_delay=0.0)
+        await pipeline.start()
+        await pipeline.publish(make_event(1))
+        await pipeline.stop(drain_timeout=5.0)
+
+        assert len(data_manager.batches) == 1
+        assert pipeline.stats['write_retries'] == 1
+        assert pipeline.stats['write_failed'] == 0
+
+    asyncio.run(scenario())
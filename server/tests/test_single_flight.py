@@ -0,0 +1,81 @@
+# server/tests/test_single_flight.py
+import asyncio
+
+import pytest
+
+from server.services.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    async def scenario():
+        flight = SingleFlight()
+        calls = 0
+        release = asyncio.Event()
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return "result"
+
+        waiters = [asyncio.ensure_future(flight.do("key", compute)) for _ in range(5)]
+        await asyncio.sleep(0)
+        assert flight.inflight_count() == 1
+        release.set()
+        results = await asyncio.gather(*waiters)
+
+        assert results == ["result"] * 5
+        assert calls == 1
+        assert flight.stats == {'executions': 1, 'coalesced': 4}
+        assert flight.inflight_count() == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_does_not_cancel_shared_work():
+    async def scenario():
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def compute():
+            await release.wait()
+            return 42
+
+        first = asyncio.ensure_future(flight.do("key", compute))
+        second = asyncio.ensure_future(flight.do("key", compute))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await second == 42
+        assert first.cancelled()
+
+    asyncio.run(scenario())
+
+
+def test_exception_reaches_every_waiter_and_releases_key():
+    async def scenario():
+        flight = SingleFlight()
+        release = asyncio.Event()
+        calls = 0
+
+        async def failing():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            raise ValueError("boom")
+
+        waiters = [asyncio.ensure_future(flight.do("key", failing)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+        assert flight.inflight_count() == 0
+
+        # 실패한 키는 다음 호출에서 새로 계산된다
+        with pytest.raises(ValueError):
+            await flight.do("key", failing)
+        assert calls == 2
+
+    asyncio.run(scenario())
@@ -0,0 +1,78 @@
+# server/tests/test_websocket_broadcaster.py
+import asyncio
+import json
+
+from server.services.websocket_broadcaster import Broadcaster, SnapshotDeltaEncoder, json_diff
+
+
+def test_slow_subscriber_receives_only_latest_value():
+    async def scenario():
+        produced = 0
+
+        async def producer(key):
+            nonlocal produced
+            produced += 1
+            return produced
+
+        broadcaster = Broadcaster(producer, interval=0.005, queue_size=1)
+        async with broadcaster.subscribe("shipper") as slow:
+            await asyncio.sleep(0.05)
+            assert produced > 2
+            # 읽지 않은 동안 쌓인 값은 최신 값 하나로 합쳐진다
+            assert slow.qsize() == 1
+            assert slow.get_nowait() == produced
+
+            async with broadcaster.subscribe("shipper") as late:
+                assert broadcaster.subscriber_count("shipper") == 2
+                # 늦게 들어온 구독자는 마지막 값을 즉시 받는다
+                assert late.get_nowait() >= produced - 1
+
+        await asyncio.sleep(0.02)
+        stopped_at = produced
+        await asyncio.sleep(0.02)
+        assert produced == stopped_at
+        assert broadcaster.subscriber_count() == 0
+
+    asyncio.run(scenario())
+
+
+def test_producer_error_is_delivered_to_subscribers():
+    async def scenario():
+        async def producer(key):
+            raise RuntimeError("upstream down")
+
+        broadcaster = Broadcaster(producer, interval=1.0)
+        async with broadcaster.subscribe("shipper") as queue:
+            value = await asyncio.wait_for(queue.get(), 1.0)
+        assert isinstance(value, RuntimeError)
+
+    asyncio.run(scenario())
+
+
+def test_json_diff_escapes_pointer_tokens():
+    old = {"a/b": 1, "m~n": {"x": 1}, "gone": True}
+    new = {"a/b": 2, "m~n": {"x": 1, "y/z": 3}, "new": [1]}
+
+    assert json_diff(old, new) == [
+        {"op": "remove", "path": "/gone"},
+        {"op": "replace", "path": "/a~1b", "value": 2},
+        {"op": "add", "path": "/m~0n/y~1z", "value": 3},
+        {"op": "add", "path": "/new", "value": [1]},
+    ]
+
+
+def test_json_diff_replaces_on_type_change():
+    assert json_diff({"v": 1}, {"v": 1.0}) == [{"op": "replace", "path": "/v", "value": 1.0}]
+    assert json_diff({"v": 1}, {"v": 1}) == []
+
+
+def test_encoder_emits_delta_against_previous_version():
+    encoder = SnapshotDeltaEncoder()
+    first = encoder.encode({"index": 50})
+    assert first.version == 1 and first.delta is None
+
+    assert encoder.encode({"index": 50}) is first
+
+    second = encoder.encode({"index": 55})
+    assert second.base_version == 1
+    assert json.loads(second.delta)["ops"] == [{"op": "replace", "path": "/index", "value": 55}]